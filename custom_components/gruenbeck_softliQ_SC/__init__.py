@@ -2,16 +2,29 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from typing import Any
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.const import CONF_HOST
-
-from .const import DOMAIN, CURRENT_VERSION
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    CONF_MODEL,
+    CONF_SW_VERSION,
+    CONSUMPTION_STORAGE_VERSION,
+    DATA_FLEET,
+    DOMAIN,
+    CURRENT_VERSION,
+)
 from .coordinator import SoftQLinkDataUpdateCoordinator
-from .softQLinkMuxClient import SoftQLinkMuxClient
+from .entity import get_device_identifier
+from .fleet import SoftQLinkFleet
+from .softQLinkMuxClient import SoftQLinkClientError, SoftQLinkMuxClient
 
 _LOGGER = logging.getLogger(__name__)
 # For your initial PR, limit it to 1 platform.
@@ -27,20 +40,94 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Gruenbeck Water softener local from a config entry."""
 
     hass.data.setdefault(DOMAIN, {})
-    websession = async_get_clientsession(hass)
-    muxClient = await SoftQLinkMuxClient.create(entry.data[CONF_HOST], websession)
-    coordinator = SoftQLinkDataUpdateCoordinator(hass, entry, muxClient)
-    await coordinator.async_config_entry_first_refresh()
+    fleet: SoftQLinkFleet = hass.data[DOMAIN].setdefault(DATA_FLEET, SoftQLinkFleet())
+    muxClient = SoftQLinkMuxClient(
+        entry.data[CONF_HOST], retry_budget=fleet.retry_budget
+    )
+    # A cached identity is refreshed once the entry is set up.
+    identity_cached = CONF_MODEL in entry.data
+    if identity_cached:
+        muxClient.model = entry.data[CONF_MODEL]
+        muxClient.sw_version = entry.data.get(CONF_SW_VERSION, "")
+        muxClient.connected = True
+    consumption_store: Store[dict[str, Any]] = Store(
+        hass, CONSUMPTION_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.consumption"
+    )
+    coordinator = SoftQLinkDataUpdateCoordinator(
+        hass, entry, muxClient, fleet=fleet, consumption_store=consumption_store
+    )
+    entry.async_on_unload(fleet.async_add_member(entry.entry_id))
+    try:
+        if identity_cached:
+            await coordinator.async_restore_consumption()
+        else:
+            # The device info of the entities needs the identity.
+            await asyncio.gather(
+                coordinator.async_restore_consumption(),
+                _async_fetch_identity(coordinator),
+            )
+        await coordinator.async_config_entry_first_refresh()
+    except BaseException:
+        await muxClient.async_close()
+        raise
     hass.data[DOMAIN][entry.entry_id] = coordinator
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    if identity_cached:
+        entry.async_create_background_task(
+            hass,
+            _async_refresh_identity(hass, coordinator),
+            f"{DOMAIN} identity refresh {entry.title}",
+        )
 
     return True
 
 
+async def _async_fetch_identity(coordinator: SoftQLinkDataUpdateCoordinator) -> None:
+    """Fetch the device identity, which setup cannot do without."""
+    try:
+        await coordinator.async_update_identity()
+    except SoftQLinkClientError as err:
+        raise ConfigEntryNotReady(
+            f"Unable to identify SoftQLink at {coordinator.client.host}"
+        ) from err
+
+
+async def _async_refresh_identity(
+    hass: HomeAssistant, coordinator: SoftQLinkDataUpdateCoordinator
+) -> None:
+    """Refresh the cached identity, e.g. after a firmware update."""
+    try:
+        changed = await coordinator.async_update_identity(probe=True)
+    except SoftQLinkClientError as err:
+        _LOGGER.debug("Keeping the cached identity of %s: %s", coordinator.name, err)
+        return
+    if not changed:
+        return
+    device_registry = dr.async_get(hass)
+    if device := device_registry.async_get_device(
+        identifiers={(DOMAIN, get_device_identifier(coordinator))}
+    ):
+        device_registry.async_update_device(
+            device.id,
+            model=coordinator.client.model,
+            sw_version=coordinator.client.sw_version,
+        )
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options without reloading the entry."""
+    coordinator: SoftQLinkDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator.async_apply_options(entry.options)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        # A reload restores the total, which must include the pending save.
+        await coordinator.async_save_consumption()
+        await coordinator.client.async_close()
 
     return unload_ok
 
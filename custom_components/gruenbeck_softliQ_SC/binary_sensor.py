@@ -11,23 +11,27 @@ from homeassistant.components.binary_sensor import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import DOMAIN, POLL_TIER_FAST, POLL_TIER_NORMAL
 from .coordinator import SoftQLinkDataUpdateCoordinator
-from .entity import build_device_info, get_entity_unique_id_prefix
+from .entity import SoftQLinkEntity, build_device_info, get_entity_unique_id_prefix
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, kw_only=True)
 class SoftQLinkBinarySensorEntityDescription(BinarySensorEntityDescription):
     """Class describing SoftQLink binary sensor entities."""
 
+    mux_key: str
+    poll_tier: str = POLL_TIER_NORMAL
+
 
 BINARY_SENSOR_DESCRIPTIONS: tuple[SoftQLinkBinarySensorEntityDescription, ...] = (
     SoftQLinkBinarySensorEntityDescription(
         key="regeneration_running",
         translation_key="regeneration_running",
         icon="mdi:water-sync",
+        mux_key="D_B_1",
+        poll_tier=POLL_TIER_FAST,
     ),
 )
 
@@ -47,9 +51,7 @@ async def async_setup_entry(
     )
 
 
-class SoftQLinkBinarySensor(
-    CoordinatorEntity[SoftQLinkDataUpdateCoordinator], BinarySensorEntity
-):
+class SoftQLinkBinarySensor(SoftQLinkEntity, BinarySensorEntity):
     """Representation of a SoftQLink binary sensor."""
 
     entity_description: SoftQLinkBinarySensorEntityDescription
@@ -63,6 +65,7 @@ class SoftQLinkBinarySensor(
         """Initialize the binary sensor."""
         super().__init__(coordinator)
         self.entity_description = description
+        self._poll_keys = {description.mux_key: description.poll_tier}
         unique_id_prefix = get_entity_unique_id_prefix(coordinator)
         self._attr_unique_id = f"{unique_id_prefix}-{description.key}".lower()
         self._attr_device_info = build_device_info(coordinator)
@@ -71,14 +74,21 @@ class SoftQLinkBinarySensor(
     @property
     def available(self) -> bool:
         """Return if the entity is available."""
-        return super().available and "D_B_1" in self.coordinator.data
+        return (
+            super().available
+            and self.entity_description.mux_key in self.coordinator.data
+        )
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
+        if not self._should_write_state():
+            return
         self._update_attrs()
         self.async_write_ha_state()
 
     def _update_attrs(self) -> None:
         """Update the entity state from coordinator data."""
-        self._attr_is_on = self.coordinator.data.get("D_B_1") == "1"
+        self._attr_is_on = (
+            self.coordinator.data.get(self.entity_description.mux_key) == "1"
+        )
@@ -10,11 +10,11 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import DOMAIN, POLL_TIER_FAST
 from .coordinator import SoftQLinkDataUpdateCoordinator
-from .entity import build_device_info, get_entity_unique_id_prefix
+from .entity import SoftQLinkEntity, build_device_info, get_entity_unique_id_prefix
+from .query import ERROR_MEMORY_KEYS
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -53,9 +53,7 @@ async def async_setup_entry(
     )
 
 
-class SoftQLinkButtonEntity(
-    CoordinatorEntity[SoftQLinkDataUpdateCoordinator], ButtonEntity
-):
+class SoftQLinkButtonEntity(SoftQLinkEntity, ButtonEntity):
     """Representation of a SoftQLink button."""
 
     entity_description: SoftQLinkButtonEntityDescription
@@ -69,6 +67,9 @@ class SoftQLinkButtonEntity(
         """Initialize."""
         super().__init__(coordinator)
         self.entity_description = description
+        if description.key == "manual_regeneration":
+            # Manual regeneration is only offered while the device is idle.
+            self._poll_keys = {"D_B_1": POLL_TIER_FAST}
         unique_id_prefix = get_entity_unique_id_prefix(coordinator)
         self._attr_unique_id = f"{unique_id_prefix}-{description.key}".lower()
         self._attr_device_info = build_device_info(coordinator)
@@ -93,12 +94,12 @@ class SoftQLinkButtonEntity(
                 if self.coordinator.data.get("D_B_1") != "0":
                     raise HomeAssistantError("Manual regeneration is already running")
                 self.coordinator.set_active_button_action(self.entity_description.key)
-                await self.coordinator.client.start_manual_regeneration()
-                await self.coordinator.async_request_refresh()
+                values = await self.coordinator.client.start_manual_regeneration()
+                self.coordinator.async_apply_values(values)
             elif self.entity_description.key == "reset_error_memory":
                 self.coordinator.set_active_button_action(self.entity_description.key)
-                await self.coordinator.client.reset_error_memory()
-                await self.coordinator.async_request_refresh()
+                values = await self.coordinator.client.reset_error_memory()
+                self.coordinator.async_apply_values(values, ERROR_MEMORY_KEYS)
         except Exception as e:
             _LOGGER.error("Gruenbeck button press failed: %s", e)
             raise
@@ -2,22 +2,43 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from types import MappingProxyType
 from typing import Any
 
-import aiohttp
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_NAME
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigFlow, ConfigFlowResult, OptionsFlow
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResultType
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN, CURRENT_VERSION
-from .softQLinkMuxClient import SoftQLinkClientError, SoftQLinkMuxClient
+from .const import (
+    CONF_MAX_ATTEMPTS,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    CONF_MODEL,
+    CONF_REQUEST_TIMEOUT,
+    CONF_SW_VERSION,
+    CONF_TIER_INTERVALS,
+    CURRENT_VERSION,
+    DATA_DISCOVERY,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_POLL_TIER_INTERVALS,
+    DOMAIN,
+    MAX_ATTEMPTS,
+    MAX_POLL_INTERVAL,
+    REQUEST_TIMEOUT,
+    UPDATE_INTERVAL,
+)
+from .discovery import DiscoveredDevice, SoftQLinkDiscovery, async_get_scan_networks
+from .softQLinkMuxClient import (
+    SoftQLinkClientError,
+    SoftQLinkIdentity,
+    SoftQLinkMuxClient,
+)
 
 _LOGGER = logging.getLogger(__name__)
 OLD_DOMAIN = "gruenbeck_softliQ_SC"
@@ -30,16 +51,21 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
 )
 
 
-async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> bool:
+async def validate_input(
+    hass: HomeAssistant, data: dict[str, Any]
+) -> SoftQLinkIdentity:
     """Validate the user input allows us to connect.
     Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
     """
 
-    websession: aiohttp.ClientSession = async_get_clientsession(hass)
-    mux_client = await SoftQLinkMuxClient.create(data[CONF_HOST], websession)
-    if not mux_client.connected:
+    mux_client = SoftQLinkMuxClient(data[CONF_HOST])
+    try:
+        identity = await mux_client.async_probe()
+    finally:
+        await mux_client.async_close()
+    if not identity.model:
         raise CannotConnect
-    return True
+    return identity
 
 
 class GruenBeckConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -47,20 +73,99 @@ class GruenBeckConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = CURRENT_VERSION
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Create the options flow."""
+        return GruenBeckOptionsFlow()
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._discovered: dict[str, DiscoveredDevice] = {}
+        self._scan_task: asyncio.Task[None] | None = None
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
         """Handle the initial step."""
-        if user_input is None:
-            if old_entries := self.hass.config_entries.async_entries(OLD_DOMAIN):
-                return await self._async_migrate_old_entry(old_entries[0])
+        if old_entries := self.hass.config_entries.async_entries(OLD_DOMAIN):
+            return await self._async_migrate_old_entry(old_entries[0])
+        return self.async_show_menu(
+            step_id="user", menu_options=["discovery", "manual"]
+        )
+
+    async def async_step_discovery(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Search the network for SoftQLinks while showing the progress."""
+        if self._scan_task is None:
+            self._scan_task = self.hass.async_create_task(self._async_scan())
+        if not self._scan_task.done():
+            return self.async_show_progress(
+                step_id="discovery",
+                progress_action="scan",
+                progress_task=self._scan_task,
+            )
+        try:
+            await self._scan_task
+        finally:
+            self._scan_task = None
+        return self.async_show_progress_done(next_step_id="pick_device")
+
+    async def _async_scan(self) -> None:
+        """Find the SoftQLinks on the network that are not configured yet."""
+        discovery: SoftQLinkDiscovery = self.hass.data.setdefault(
+            DOMAIN, {}
+        ).setdefault(DATA_DISCOVERY, SoftQLinkDiscovery())
+        configured = {
+            entry.data.get(CONF_HOST, "").lower()
+            for entry in self.hass.config_entries.async_entries(DOMAIN)
+        }
+        networks = await async_get_scan_networks(self.hass)
+        self._discovered = {
+            device.host: device
+            for device in await discovery.async_scan_networks(networks)
+            if device.host.lower() not in configured
+        }
 
+    async def async_step_pick_device(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Let the user pick one of the SoftQLinks found on the network."""
+        if user_input is not None:
+            device = self._discovered[user_input[CONF_HOST]]
+            await self.async_set_unique_id(device.host.lower())
+            self._abort_if_unique_id_configured()
+            return self._async_create_device_entry(
+                user_input[CONF_NAME], device.host, device.identity
+            )
+        if not self._discovered:
+            return self.async_abort(reason="no_devices_found")
+
+        first = next(iter(self._discovered.values()))
+        data_schema = vol.Schema(
+            {
+                vol.Required(CONF_HOST, default=first.host): vol.In(
+                    {
+                        host: f"{device.identity.model} ({host})"
+                        for host, device in self._discovered.items()
+                    }
+                ),
+                vol.Required(CONF_NAME, default=first.identity.model): str,
+            }
+        )
+        return self.async_show_form(step_id="pick_device", data_schema=data_schema)
+
+    async def async_step_manual(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Handle a host entered by the user."""
         errors: dict[str, str] = {}
         if user_input is not None:
             try:
                 await self.async_set_unique_id(user_input[CONF_HOST].lower())
                 self._abort_if_unique_id_configured()
-                await validate_input(self.hass, user_input)
+                identity = await validate_input(self.hass, user_input)
             except CannotConnect:
                 errors["base"] = "cannot_connect"
             except SoftQLinkClientError as err:
@@ -74,11 +179,25 @@ class GruenBeckConfigFlow(ConfigFlow, domain=DOMAIN):
                 _LOGGER.exception("Unexpected exception: %s", str(e))
                 errors["base"] = "unknown"
             else:
-                return self.async_create_entry(
-                    title=user_input[CONF_NAME], data=user_input
+                return self._async_create_device_entry(
+                    user_input[CONF_NAME], user_input[CONF_HOST], identity
                 )
         return self.async_show_form(
-            step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+            step_id="manual", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+        )
+
+    def _async_create_device_entry(
+        self, name: str, host: str, identity: SoftQLinkIdentity
+    ) -> ConfigFlowResult:
+        """Create the entry, caching the identity the device reported."""
+        return self.async_create_entry(
+            title=name,
+            data={
+                CONF_NAME: name,
+                CONF_HOST: host,
+                CONF_MODEL: identity.model,
+                CONF_SW_VERSION: identity.sw_version,
+            },
         )
 
     async def _async_migrate_old_entry(
@@ -92,7 +211,7 @@ class GruenBeckConfigFlow(ConfigFlow, domain=DOMAIN):
                 old_entry.entry_id,
             )
             return self.async_show_form(
-                step_id="user",
+                step_id="manual",
                 data_schema=STEP_USER_DATA_SCHEMA,
             )
 
@@ -124,5 +243,59 @@ class GruenBeckConfigFlow(ConfigFlow, domain=DOMAIN):
         )
 
 
+class GruenBeckOptionsFlow(OptionsFlow):
+    """Handle the options of a Gruenbeck softliQ SC entry."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage polling, timeout and retry options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if user_input[CONF_MIN_INTERVAL] > user_input[CONF_MAX_INTERVAL]:
+                errors["base"] = "invalid_interval_bounds"
+            else:
+                return self.async_create_entry(
+                    data={**self.config_entry.options, **user_input}
+                )
+
+        options = {**self.config_entry.options, **(user_input or {})}
+        return self.async_show_form(
+            step_id="init", data_schema=_options_schema(options), errors=errors
+        )
+
+
+def _options_schema(options: dict[str, Any]) -> vol.Schema:
+    """Return the options schema, defaulting to the current options."""
+    defaults: dict[str, Any] = {
+        CONF_MIN_INTERVAL: UPDATE_INTERVAL,
+        CONF_MAX_INTERVAL: DEFAULT_MAX_INTERVAL,
+        CONF_REQUEST_TIMEOUT: REQUEST_TIMEOUT,
+        CONF_MAX_ATTEMPTS: MAX_ATTEMPTS,
+        **{
+            option: DEFAULT_POLL_TIER_INTERVALS[tier]
+            for tier, option in CONF_TIER_INTERVALS.items()
+        },
+    } | options
+    for option in (CONF_MIN_INTERVAL, CONF_MAX_INTERVAL):
+        defaults[option] = min(defaults[option], MAX_POLL_INTERVAL)
+    # Flow samples further apart than the consumption gap are lost.
+    interval = vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_POLL_INTERVAL))
+    tier_interval = vol.All(vol.Coerce(int), vol.Range(min=10, max=86400))
+    validators: dict[str, Any] = {
+        CONF_MIN_INTERVAL: interval,
+        CONF_MAX_INTERVAL: interval,
+        CONF_REQUEST_TIMEOUT: vol.All(vol.Coerce(float), vol.Range(min=0.5, max=60)),
+        CONF_MAX_ATTEMPTS: vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+        **{option: tier_interval for option in CONF_TIER_INTERVALS.values()},
+    }
+    return vol.Schema(
+        {
+            vol.Required(option, default=defaults[option]): validator
+            for option, validator in validators.items()
+        }
+    )
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
@@ -7,3 +7,102 @@ UPDATE_INTERVAL: Final = 5
 TOTAL_CONSUMPTION = "total_consumption"
 CURRENT_VERSION = 2
 REQUEST_TIMEOUT = 5
+MAX_ATTEMPTS: Final = 5
+# A probe is a single, quick attempt to tell whether a host is a SoftQLink.
+PROBE_TIMEOUT: Final = 2.0
+PROBE_CONNECT_TIMEOUT: Final = 1.0
+# Times edits may take the device over from a read before the read gives up.
+MAX_PREEMPTIONS: Final = 3
+# Time budget for a whole coordinator refresh, including retries.
+REFRESH_TIMEOUT: Final = 15
+RETRY_BASE_DELAY: Final = 0.5
+RETRY_MAX_DELAY: Final = 8.0
+# Failed requests in a row before the device is given a rest.
+CIRCUIT_FAILURE_THRESHOLD: Final = 3
+CIRCUIT_RESET_TIMEOUT: Final = 60.0
+# Retries across all devices are capped to this share of the requests, with
+# a reserve for when few requests are made.
+RETRY_BUDGET_RATIO: Final = 0.2
+RETRY_BUDGET_RESERVE: Final = 10
+# A full poll response is about 1 KiB; anything far larger is a broken device.
+MAX_BODY_SIZE: Final = 64 * 1024
+# The device serves few clients at once; keep a small pool of kept-alive
+# connections and drop idle ones before the device does.
+CONNECTION_LIMIT: Final = 2
+KEEPALIVE_TIMEOUT: Final = 10
+DNS_CACHE_TTL: Final = 300
+# Disconnects in a row after which connections are no longer kept alive.
+DISCONNECT_LIMIT: Final = 3
+
+POLL_TIER_FAST: Final = "fast"
+POLL_TIER_NORMAL: Final = "normal"
+POLL_TIER_SLOW: Final = "slow"
+POLL_TIER_STATIC: Final = "static"
+# Ordered from the most to the least frequently polled tier.
+POLL_TIERS: Final = (POLL_TIER_FAST, POLL_TIER_NORMAL, POLL_TIER_SLOW, POLL_TIER_STATIC)
+DEFAULT_POLL_TIER_INTERVALS: Final[dict[str, int]] = {
+    POLL_TIER_FAST: UPDATE_INTERVAL,
+    POLL_TIER_NORMAL: 60,
+    POLL_TIER_SLOW: 900,
+    POLL_TIER_STATIC: 3600,
+}
+# Longest time a sensor holds back a change that stays within its deadband.
+DEADBAND_MAX_SILENCE: Final = 300
+# Flow samples further apart than this are not integrated into the total.
+CONSUMPTION_MAX_GAP: Final = 120
+# Longest poll interval whose samples stay within the consumption gap, even
+# when the fleet moves a refresh by half an interval and it runs until its
+# timeout.
+MAX_POLL_INTERVAL: Final = int(CONSUMPTION_MAX_GAP / 1.5 - REFRESH_TIMEOUT)
+CONSUMPTION_STORAGE_VERSION: Final = 1
+# Delay before the total consumption is written to storage after a change.
+CONSUMPTION_SAVE_DELAY: Final = 60
+# Flow samples kept in memory, about five hours at the fastest poll interval.
+HISTORY_CAPACITY: Final = 4096
+# Periods, in seconds, the flow history is rolled up into.
+HISTORY_MINUTE: Final = 60
+HISTORY_HOUR: Final = 3600
+HISTORY_DAY: Final = 86400
+HISTORY_RESOLUTIONS: Final = (HISTORY_MINUTE, HISTORY_HOUR, HISTORY_DAY)
+# Prefix of the pseudo keys reported as changed with a rollup of the flow
+# history, one per resolution.
+FLOW_HISTORY = "flow_history"
+
+# Device identity cached in the entry data, so setup needs no round trip for it.
+CONF_MODEL: Final = "model"
+CONF_SW_VERSION: Final = "sw_version"
+
+# Options bounding the adaptive poll interval, in seconds.
+CONF_MIN_INTERVAL: Final = "min_interval"
+CONF_MAX_INTERVAL: Final = "max_interval"
+DEFAULT_MAX_INTERVAL: Final = 60
+CONF_REQUEST_TIMEOUT: Final = "request_timeout"
+CONF_MAX_ATTEMPTS: Final = "max_attempts"
+# Options holding the period of each tier polled less often than every refresh.
+CONF_TIER_INTERVALS: Final[dict[str, str]] = {
+    POLL_TIER_NORMAL: "normal_interval",
+    POLL_TIER_SLOW: "slow_interval",
+    POLL_TIER_STATIC: "static_interval",
+}
+# Growth of the poll interval per refresh while the softener is idle.
+IDLE_BACKOFF_FACTOR: Final = 1.5
+# Growth of the poll interval per refresh while the device is struggling.
+SLOW_BACKOFF_FACTOR: Final = 2.0
+# A refresh taking longer than this counts as the device struggling.
+SLOW_REFRESH_THRESHOLD: Final = 2.0
+
+# Key of the fleet shared by all entries in hass.data[DOMAIN].
+DATA_FLEET: Final = "fleet"
+# Refreshes in flight across all devices.
+FLEET_MAX_CONCURRENCY: Final = 4
+
+# Key of the discovery shared by config flows in hass.data[DOMAIN].
+DATA_DISCOVERY: Final = "discovery"
+# Discovery probes many hosts that are mostly not there: probe them side by
+# side, give up on them quickly and skip them for a while afterwards.
+DISCOVERY_CONCURRENCY: Final = 32
+DISCOVERY_TIMEOUT: Final = 1.0
+DISCOVERY_CONNECT_TIMEOUT: Final = 0.5
+DISCOVERY_NEGATIVE_TTL: Final = 600
+# Largest network scanned around each address of the host, as a prefix length.
+DISCOVERY_MIN_PREFIX: Final = 24
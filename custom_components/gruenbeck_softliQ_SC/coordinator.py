@@ -1,14 +1,46 @@
 """DataUpdateCoordinator for the Gruenbeck integration."""
 
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from contextlib import nullcontext
+from dataclasses import replace
 from datetime import timedelta
 import logging
+import math
+import time
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .const import UPDATE_INTERVAL
+from .const import (
+    CONF_MAX_ATTEMPTS,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    CONF_MODEL,
+    CONF_REQUEST_TIMEOUT,
+    CONF_SW_VERSION,
+    CONF_TIER_INTERVALS,
+    CONSUMPTION_SAVE_DELAY,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_POLL_TIER_INTERVALS,
+    IDLE_BACKOFF_FACTOR,
+    MAX_POLL_INTERVAL,
+    POLL_TIER_FAST,
+    POLL_TIERS,
+    REFRESH_TIMEOUT,
+    SLOW_BACKOFF_FACTOR,
+    SLOW_REFRESH_THRESHOLD,
+    TOTAL_CONSUMPTION,
+)
+from .consumption import ConsumptionIntegrator
+from .fleet import SoftQLinkFleet
+from .history import FlowHistory, rollup_key
+from .query import CURRENT_VALUE_KEYS, ERROR_MEMORY_KEYS
+from .snapshot import SoftQLinkSnapshot
 from .softQLinkMuxClient import SoftQLinkClientError, SoftQLinkMuxClient
 
 _LOGGER = logging.getLogger(__name__)
@@ -22,33 +54,289 @@ class SoftQLinkDataUpdateCoordinator(DataUpdateCoordinator):
         hass: HomeAssistant,
         config_entry: ConfigEntry,
         mux_client: SoftQLinkMuxClient,
+        tier_intervals: Mapping[str, int] | None = None,
+        fleet: SoftQLinkFleet | None = None,
+        consumption_store: Store[dict[str, Any]] | None = None,
     ) -> None:
-        """Initialize."""
+        """Initialize.
+
+        The total consumption is persisted in ``consumption_store``, if given.
+        """
         self.config_entry = config_entry
-        self.datacache: dict[str, Any] = {}
+        self.datacache = SoftQLinkSnapshot()
         self.client = mux_client
+        self.fleet = fleet
         self.button_action_in_progress = False
         self.active_button_key: str | None = None
+        self.tier_intervals = DEFAULT_POLL_TIER_INTERVALS | dict(tier_intervals or {})
+        # The fast tier is polled with every refresh, whose interval adapts
+        # between these bounds.
+        self.min_interval: float = self.tier_intervals[POLL_TIER_FAST]
+        self.max_interval: float = DEFAULT_MAX_INTERVAL
+        # The adapted interval; the update interval is nudged to the turn
+        # the fleet gives this entry.
+        self.poll_interval: float = self.min_interval
+        self.refresh_timeout: float = REFRESH_TIMEOUT
+        self.poll_tiers: dict[str, str] = {}
+        self._poll_key_refs: dict[str, Counter[str]] = {}
+        self._new_poll_keys: set[str] = set()
+        self._tier_polled_at: dict[str, float] = {}
+        self._applied_options: dict[str, Any] | None = None
+        # Keys whose value changed with the last update, None if unknown.
+        self.changed_keys: frozenset[str] | None = None
+        # Entity state writes skipped because nothing changed, per update.
+        self.skipped_state_writes = 0
+        self.consumption = ConsumptionIntegrator()
+        self.history = FlowHistory()
+        self._consumption_store = consumption_store
         super().__init__(
             hass,
             _LOGGER,
             config_entry=config_entry,
             name=config_entry.title,
-            update_interval=timedelta(seconds=UPDATE_INTERVAL),
+            update_interval=timedelta(seconds=self.min_interval),
         )
+        self.async_apply_options(config_entry.options)
+
+    @callback
+    def async_apply_options(self, options: Mapping[str, Any]) -> None:
+        """Apply the entry options to the running coordinator and client.
+
+        Options equal to the applied ones are ignored, so updates of the entry
+        data do not reset the adapted interval.
+        """
+        if options == self._applied_options:
+            return
+        self._applied_options = dict(options)
+        # Options saved before the interval was capped may exceed the cap.
+        self.min_interval = min(
+            options.get(CONF_MIN_INTERVAL, self.min_interval), MAX_POLL_INTERVAL
+        )
+        self.max_interval = min(
+            max(self.min_interval, options.get(CONF_MAX_INTERVAL, self.max_interval)),
+            MAX_POLL_INTERVAL,
+        )
+        for tier, option in CONF_TIER_INTERVALS.items():
+            self.tier_intervals[tier] = options.get(option, self.tier_intervals[tier])
+        policy = self.client.retry_policy
+        self.client.retry_policy = replace(
+            policy,
+            max_attempts=options.get(CONF_MAX_ATTEMPTS, policy.max_attempts),
+            attempt_timeout=options.get(CONF_REQUEST_TIMEOUT, policy.attempt_timeout),
+        )
+        # Start over from the lower bound; the next refresh adapts it again.
+        self.poll_interval = self.min_interval
+        self.update_interval = timedelta(seconds=self.min_interval)
 
     @callback
     def set_active_button_action(self, button_key: str | None) -> None:
         """Update the transient button-action state and notify entities."""
         self.button_action_in_progress = button_key is not None
         self.active_button_key = button_key
+        self.changed_keys = None
         self.async_update_listeners()
 
-    async def _async_update_data(self) -> dict[str, Any]:
-        try:
-            self.datacache = (await self.client.get_current_values()) | (
-                await self.client.get_error_memory_values()
+    async def async_update_identity(self, probe: bool = False) -> bool:
+        """Fetch the model and software version and cache them in the entry.
+
+        A ``probe`` makes a single quick attempt instead of retrying. Return
+        whether the identity changed since it was last cached.
+        """
+        client = self.client
+        if probe:
+            await client.async_probe()
+        else:
+            await client.async_update_identity(
+                deadline=time.monotonic() + self.refresh_timeout
+            )
+        identity = {CONF_MODEL: client.model, CONF_SW_VERSION: client.sw_version}
+        data = self.config_entry.data
+        if all(data.get(key) == value for key, value in identity.items()):
+            return False
+        self.hass.config_entries.async_update_entry(
+            self.config_entry, data={**data, **identity}
+        )
+        return True
+
+    async def async_restore_consumption(self) -> None:
+        """Continue the total consumption from where it was last saved."""
+        if self._consumption_store is None:
+            return
+        if data := await self._consumption_store.async_load():
+            self.consumption.restore(data)
+
+    async def async_save_consumption(self) -> None:
+        """Save the total consumption now, replacing a delayed save."""
+        if self._consumption_store is not None:
+            await self._consumption_store.async_save(self.consumption.as_dict())
+
+    @callback
+    def async_apply_values(
+        self, values: Mapping[str, Any], stale_keys: Iterable[str] = ()
+    ) -> None:
+        """Merge values echoed by an edit and notify entities.
+
+        ``stale_keys`` are values the edit invalidated without echoing; they
+        are fetched again with the next poll.
+        """
+        self._new_poll_keys.update(key for key in stale_keys if key in self.poll_tiers)
+        self._merge_values(values)
+        self.async_set_updated_data(self.datacache)
+
+    @callback
+    def async_add_poll_key(self, key: str, tier: str) -> CALLBACK_TYPE:
+        """Poll ``key`` in ``tier`` until the returned callback is called."""
+        self._poll_key_refs.setdefault(key, Counter())[tier] += 1
+        if key not in self.poll_tiers and key not in self.datacache:
+            self._new_poll_keys.add(key)
+        self._update_poll_tier(key)
+
+        @callback
+        def _remove_poll_key() -> None:
+            refs = self._poll_key_refs[key]
+            refs[tier] -= 1
+            if refs[tier] <= 0:
+                del refs[tier]
+            if not refs:
+                del self._poll_key_refs[key]
+                self._new_poll_keys.discard(key)
+            self._update_poll_tier(key)
+
+        return _remove_poll_key
+
+    def _update_poll_tier(self, key: str) -> None:
+        """Poll a key in the fastest tier any of its entities asked for."""
+        if refs := self._poll_key_refs.get(key):
+            self.poll_tiers[key] = min(refs, key=POLL_TIERS.index)
+        else:
+            self.poll_tiers.pop(key, None)
+
+    def _due_poll_keys(self, now: float) -> tuple[list[str], list[str]]:
+        """Return the mux keys and tiers due for polling at ``now``."""
+        if not self._tier_polled_at:
+            # Entities are added after the first refresh, so it fetches
+            # everything they may need.
+            return list(CURRENT_VALUE_KEYS + ERROR_MEMORY_KEYS), list(POLL_TIERS)
+
+        due_tiers = [
+            tier
+            for tier in POLL_TIERS
+            if tier == POLL_TIER_FAST
+            or (polled_at := self._tier_polled_at.get(tier)) is None
+            or now - polled_at >= self.tier_intervals[tier]
+        ]
+        due_keys = [
+            key
+            for key, tier in self.poll_tiers.items()
+            if tier in due_tiers or key in self._new_poll_keys
+        ]
+        return due_keys, due_tiers
+
+    def _merge_values(self, values: Mapping[str, Any]) -> None:
+        """Merge ``values`` into the cache and record which keys changed."""
+        datacache, changed_keys = self.datacache.merge(values)
+        self.changed_keys = changed_keys if self.datacache else None
+        self.skipped_state_writes = 0
+        self.datacache = datacache
+
+    def _integrate_consumption(self, values: dict[str, Any], sampled_at: float) -> None:
+        """Add the polled flow to the total consumption."""
+        if (flow := values.get("D_A_1_1")) is not None:
+            started = time.perf_counter()
+            self.consumption.add_sample(flow, sampled_at)
+            values[TOTAL_CONSUMPTION] = self.consumption.total
+            self.client.metrics.integration_time.record(time.perf_counter() - started)
+
+    def _record_history(self) -> None:
+        """Add the polled flow to the history and flag changed rollups."""
+        data = self.datacache
+        if (flow := data.get("D_A_1_1")) is None:
+            return
+        total = data.get(TOTAL_CONSUMPTION)
+        meter = data.get("D_K_2")
+        revisions = dict(self.history.revisions)
+        now = dt_util.now()
+        offset = now.utcoffset()
+        self.history.add_sample(
+            float(flow),
+            now.timestamp() + (offset.total_seconds() if offset else 0),
+            math.nan if total is None else float(total),
+            math.nan if meter is None else float(meter),
+        )
+        if self.changed_keys is not None:
+            self.changed_keys |= {
+                rollup_key(resolution)
+                for resolution, revision in self.history.revisions.items()
+                if revision != revisions[resolution]
+            }
+
+    @property
+    def device_active(self) -> bool:
+        """Return whether water flows or a regeneration runs."""
+        data = self.datacache
+        flow = data.get("D_A_1_1")
+        return (
+            (flow is not None and flow > 0)
+            or data.get("D_B_1") == "1"
+            or data.get("D_Y_5") not in (None, "0")
+        )
+
+    def _adapt_update_interval(self, struggling: bool) -> None:
+        """Poll at the lower bound while the softener is active.
+
+        While it is idle the interval grows towards the upper bound, and it
+        grows faster while the device answers slowly or not at all, or while
+        the fleet's retry budget is used up.
+        """
+        current = self.poll_interval
+        if struggling or (self.fleet is not None and self.fleet.congested):
+            interval = current * SLOW_BACKOFF_FACTOR
+        elif self.device_active:
+            interval = self.min_interval
+        else:
+            interval = current * IDLE_BACKOFF_FACTOR
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        if interval != current:
+            _LOGGER.debug("Polling %s every %.1f s", self.name, interval)
+        self.poll_interval = interval
+        if self.fleet is not None:
+            interval = self.fleet.stagger(
+                self.config_entry.entry_id, interval, self.hass.loop.time()
             )
+        self.update_interval = timedelta(seconds=interval)
+
+    async def _async_update_data(self) -> SoftQLinkSnapshot:
+        now = time.monotonic()
+        keys, tiers = self._due_poll_keys(now)
+        timeouts = self.client.metrics.timeouts
+        # A failed update changes no values, only entity availability.
+        self.changed_keys = frozenset()
+        try:
+            async with self.fleet.slot() if self.fleet else nullcontext():
+                values = await self.client.get_values(
+                    keys, deadline=now + self.refresh_timeout
+                )
         except SoftQLinkClientError as error:
+            self._adapt_update_interval(struggling=True)
             raise UpdateFailed(error) from error
+        finished = time.monotonic()
+        self._integrate_consumption(values, finished)
+        self._merge_values(values)
+        if "D_A_1_1" in values:
+            self._record_history()
+        if (
+            self._consumption_store is not None
+            and TOTAL_CONSUMPTION in values
+            and (self.changed_keys is None or TOTAL_CONSUMPTION in self.changed_keys)
+        ):
+            self._consumption_store.async_delay_save(
+                self.consumption.as_dict, CONSUMPTION_SAVE_DELAY
+            )
+        self._new_poll_keys.difference_update(keys)
+        for tier in tiers:
+            self._tier_polled_at[tier] = now
+        self._adapt_update_interval(
+            struggling=self.client.metrics.timeouts > timeouts
+            or finished - now > SLOW_REFRESH_THRESHOLD
+        )
         return self.datacache
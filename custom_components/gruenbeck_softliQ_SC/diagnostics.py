@@ -0,0 +1,56 @@
+"""Diagnostics support for the Gruenbeck SoftliQ SC integration."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import SoftQLinkDataUpdateCoordinator
+from .query import compile_read_query, plan_read_queries
+
+TO_REDACT = {CONF_HOST}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: SoftQLinkDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    client = coordinator.client
+    data = coordinator.data.as_dict() if coordinator.data else {}
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "device": {"model": client.model, "sw_version": client.sw_version},
+        "connection": {
+            "circuit_state": client.circuit_breaker.state,
+            "retry_policy": {
+                "max_attempts": client.retry_policy.max_attempts,
+                "attempt_timeout": client.retry_policy.attempt_timeout,
+            },
+            "metrics": client.metrics.as_dict(),
+        },
+        "polling": {
+            "update_interval": coordinator.update_interval.total_seconds(),
+            "interval_bounds": [coordinator.min_interval, coordinator.max_interval],
+            "device_active": coordinator.device_active,
+            "tier_intervals": coordinator.tier_intervals,
+            "poll_tiers": coordinator.poll_tiers,
+            "requests": [
+                compile_read_query(query, client.client_id).decode("ascii")
+                for query in plan_read_queries(coordinator.poll_tiers)
+            ],
+            "skipped_state_writes": coordinator.skipped_state_writes,
+            "fleet": coordinator.fleet.as_dict() if coordinator.fleet else None,
+        },
+        "history": coordinator.history.as_dict(),
+        "data": {
+            key: str(value) if isinstance(value, Decimal) else value
+            for key, value in data.items()
+        },
+    }
@@ -0,0 +1,131 @@
+"""Discovery of SoftQLink devices on the local network."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from ipaddress import IPv4Network
+import logging
+import time
+
+from aiohttp import ClientSession, TCPConnector
+from homeassistant.components import network
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DISCOVERY_CONCURRENCY,
+    DISCOVERY_CONNECT_TIMEOUT,
+    DISCOVERY_MIN_PREFIX,
+    DISCOVERY_NEGATIVE_TTL,
+    DISCOVERY_TIMEOUT,
+)
+from .softQLinkMuxClient import (
+    SoftQLinkClientError,
+    SoftQLinkIdentity,
+    SoftQLinkMuxClient,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class DiscoveredDevice:
+    """A SoftQLink that answered a probe."""
+
+    host: str
+    identity: SoftQLinkIdentity
+
+
+async def async_get_scan_networks(hass: HomeAssistant) -> list[IPv4Network]:
+    """Return the networks of the enabled adapters, at most a /24 each."""
+    networks: dict[IPv4Network, None] = {}
+    for adapter in await network.async_get_adapters(hass):
+        if not adapter["enabled"]:
+            continue
+        for address in adapter["ipv4"]:
+            prefix = max(address["network_prefix"], DISCOVERY_MIN_PREFIX)
+            networks[IPv4Network(f"{address['address']}/{prefix}", strict=False)] = None
+    return [net for net in networks if not net.is_loopback]
+
+
+class SoftQLinkDiscovery:
+    """Find SoftQLink devices by probing the hosts of a network.
+
+    Up to ``concurrency`` hosts are probed at a time with the identity
+    probe. Hosts that are no SoftQLink are remembered for ``negative_ttl``
+    seconds and skipped by later scans.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = DISCOVERY_CONCURRENCY,
+        timeout: float = DISCOVERY_TIMEOUT,
+        connect_timeout: float = DISCOVERY_CONNECT_TIMEOUT,
+        negative_ttl: float = DISCOVERY_NEGATIVE_TTL,
+        port: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize."""
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.negative_ttl = negative_ttl
+        self.port = port
+        self._clock = clock
+        # Hosts that are no SoftQLink, with when to probe them again.
+        self._negative: dict[str, float] = {}
+        self.probes = 0
+
+    def _is_negative(self, host: str, now: float) -> bool:
+        if (expires := self._negative.get(host)) is None:
+            return False
+        if expires > now:
+            return True
+        del self._negative[host]
+        return False
+
+    async def async_scan_networks(
+        self, networks: Iterable[IPv4Network]
+    ) -> list[DiscoveredDevice]:
+        """Probe every host of ``networks``."""
+        return await self.async_scan(
+            str(address) for net in networks for address in net.hosts()
+        )
+
+    async def async_scan(self, addresses: Iterable[str]) -> list[DiscoveredDevice]:
+        """Probe ``addresses`` and return the SoftQLinks among them."""
+        now = self._clock()
+        hosts = [
+            f"{address}:{self.port}" if self.port else address
+            for address in dict.fromkeys(addresses)
+        ]
+        hosts = [host for host in hosts if not self._is_negative(host, now)]
+        if not hosts:
+            return []
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = TCPConnector(limit=self.concurrency, force_close=True)
+        async with ClientSession(connector=connector) as session:
+
+            async def probe(host: str) -> DiscoveredDevice | None:
+                async with semaphore:
+                    return await self._async_probe(session, host)
+
+            found = await asyncio.gather(*(probe(host) for host in hosts))
+        return [device for device in found if device is not None]
+
+    async def _async_probe(
+        self, session: ClientSession, host: str
+    ) -> DiscoveredDevice | None:
+        """Probe a single host, remembering it if it is no SoftQLink."""
+        self.probes += 1
+        client = SoftQLinkMuxClient(host, session)
+        try:
+            identity = await client.async_probe(self.timeout, self.connect_timeout)
+        except SoftQLinkClientError as err:
+            _LOGGER.debug("No SoftQLink at %s: %s", host, err)
+            identity = None
+        if identity is None or not identity.model:
+            self._negative[host] = self._clock() + self.negative_ttl
+            return None
+        return DiscoveredDevice(host, identity)
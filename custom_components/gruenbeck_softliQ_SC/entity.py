@@ -2,7 +2,11 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping
+
+from homeassistant.core import callback
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import SoftQLinkDataUpdateCoordinator
@@ -28,3 +32,46 @@ def build_device_info(coordinator: SoftQLinkDataUpdateCoordinator) -> DeviceInfo
         model=coordinator.client.model,
         sw_version=coordinator.client.sw_version,
     )
+
+
+class SoftQLinkEntity(CoordinatorEntity[SoftQLinkDataUpdateCoordinator]):
+    """Base entity that has its mux keys polled only while it is added.
+
+    State is only written when one of the entity's keys or its availability
+    changed with a coordinator update.
+    """
+
+    # Mux keys this entity reads, mapped to their poll tier.
+    _poll_keys: Mapping[str, str] = {}
+    # Coordinator data keys the state is derived from, the poll keys if None.
+    _state_keys: frozenset[str] | None = None
+    _written_available: bool | None = None
+
+    def _should_write_state(self) -> bool:
+        """Return whether the last coordinator update affects this entity."""
+        available = self.available
+        changed_keys = self.coordinator.changed_keys
+        state_keys = self._state_keys
+        if state_keys is None:
+            state_keys = frozenset(self._poll_keys)
+        if (
+            available == self._written_available
+            and changed_keys is not None
+            and changed_keys.isdisjoint(state_keys)
+        ):
+            self.coordinator.skipped_state_writes += 1
+            return False
+        self._written_available = available
+        return True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state if the coordinator update affects this entity."""
+        if self._should_write_state():
+            self.async_write_ha_state()
+
+    async def async_added_to_hass(self) -> None:
+        """Register the mux keys with the coordinator."""
+        await super().async_added_to_hass()
+        for key, tier in self._poll_keys.items():
+            self.async_on_remove(self.coordinator.async_add_poll_key(key, tier))
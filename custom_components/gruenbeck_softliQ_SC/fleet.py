@@ -0,0 +1,100 @@
+"""Polling shared by all SoftQLink devices of a Home Assistant instance."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from itertools import count
+import math
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+from .const import FLEET_MAX_CONCURRENCY
+from .retry import SoftQLinkRetryBudget
+
+# Spreads the turns of any number of members evenly over an interval.
+_GOLDEN_RATIO = (math.sqrt(5) - 1) / 2
+
+
+class SoftQLinkFleet:
+    """Spread the refreshes of many devices and share their network budget.
+
+    Each member takes its turn at its own phase of the poll interval, so
+    members polling at the same interval do not burst together. A
+    semaphore caps the refreshes in flight across all members, and their
+    clients draw retries from one budget.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = FLEET_MAX_CONCURRENCY,
+        retry_budget: SoftQLinkRetryBudget | None = None,
+    ) -> None:
+        """Initialize."""
+        self.max_concurrency = max_concurrency
+        self.retry_budget = retry_budget or SoftQLinkRetryBudget()
+        self._refreshes = asyncio.Semaphore(max_concurrency)
+        self._phases: dict[str, float] = {}
+        self._slots: dict[str, int] = {}
+        # Refreshes that had to wait for another member to finish.
+        self.waits = 0
+
+    def __len__(self) -> int:
+        """Return the number of members."""
+        return len(self._phases)
+
+    @property
+    def congested(self) -> bool:
+        """Return whether the members failed so much the retries ran out."""
+        return self.retry_budget.exhausted
+
+    @callback
+    def async_add_member(self, entry_id: str) -> CALLBACK_TYPE:
+        """Give ``entry_id`` a turn until the returned callback is called."""
+        taken = set(self._slots.values())
+        slot = next(slot for slot in count() if slot not in taken)
+        self._slots[entry_id] = slot
+        self._phases[entry_id] = slot * _GOLDEN_RATIO % 1
+
+        @callback
+        def _remove_member() -> None:
+            self._slots.pop(entry_id, None)
+            self._phases.pop(entry_id, None)
+
+        return _remove_member
+
+    def stagger(self, entry_id: str, interval: float, now: float) -> float:
+        """Return ``interval`` nudged so the next refresh lands on its turn.
+
+        Home Assistant schedules a refresh ``interval`` after the whole second
+        of the event loop time ``now``, plus a jitter below half a second of
+        its own. The turns therefore fall on whole seconds, and members whose
+        turns share a second are spread by that jitter alone. The refresh
+        moves to the nearest turn, so the result lies between about half and
+        one and a half times ``interval``.
+        """
+        if (phase := self._phases.get(entry_id)) is None or len(self) < 2:
+            return interval
+        start = int(now)
+        offset = phase * interval
+        turn = round((start + interval - offset) / interval) * interval + offset
+        return max(round(turn) - start, 1)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the refreshes allowed in flight."""
+        if self._refreshes.locked():
+            self.waits += 1
+        async with self._refreshes:
+            yield
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the fleet state for diagnostics."""
+        return {
+            "members": len(self),
+            "max_concurrency": self.max_concurrency,
+            "waits": self.waits,
+            "retry_budget": self.retry_budget.balance,
+        }
@@ -0,0 +1,186 @@
+"""In-memory history of the water flow, with rollups per period."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+import math
+from typing import Any
+
+from .const import FLOW_HISTORY, HISTORY_CAPACITY, HISTORY_RESOLUTIONS
+
+# Decimal places of the reported volumes, as for the total consumption.
+VOLUME_DIGITS = 4
+# Decimal places of the reported mean flow.
+MEAN_DIGITS = 3
+
+
+def rollup_key(resolution: int) -> str:
+    """Return the pseudo key reported as changed with the rollup of ``resolution``."""
+    return f"{FLOW_HISTORY}_{resolution}"
+
+
+@dataclass(slots=True)
+class FlowRollup:
+    """Aggregate of the flow samples taken in one period.
+
+    The flows are in m³/h and ``start`` is in the seconds of the samples'
+    timestamps. The volume in m³ is the growth of the total consumption
+    since ``base``, the total before the period, NaN until one is known.
+    """
+
+    start: float
+    base: float = math.nan
+    samples: int = 0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+    flow_sum: float = 0.0
+    volume: float = 0.0
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean flow, None without samples."""
+        return self.flow_sum / self.samples if self.samples else None
+
+    def add(self, flow: float, total: float = math.nan) -> bool:
+        """Add a sample and return whether a reported value moved.
+
+        The volume and mean only count as moved once they change in the
+        reported digits.
+        """
+        mean = self.mean
+        volume = self.volume
+        if not math.isnan(total):
+            if math.isnan(self.base):
+                self.base = total
+            volume = total - self.base
+        self.samples += 1
+        self.flow_sum += flow
+        changed = (
+            flow < self.minimum
+            or flow > self.maximum
+            or round(volume, VOLUME_DIGITS) != round(self.volume, VOLUME_DIGITS)
+            or mean is None
+            or round(self.flow_sum / self.samples, MEAN_DIGITS)
+            != round(mean, MEAN_DIGITS)
+        )
+        self.minimum = min(self.minimum, flow)
+        self.maximum = max(self.maximum, flow)
+        self.volume = volume
+        return changed
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the rollup for diagnostics."""
+        return {
+            "start": self.start,
+            "samples": self.samples,
+            "min": self.minimum if self.samples else None,
+            "max": self.maximum if self.samples else None,
+            "mean": self.mean,
+            "volume": self.volume,
+        }
+
+
+class FlowHistory:
+    """Keep the latest flow samples and roll them up per period.
+
+    Samples are kept in a ring of ``capacity`` entries, together with the
+    total consumption and the soft water meter at the time, NaN if unknown.
+    Each resolution, in seconds, keeps the rollup of the period in progress
+    and of the one before it. Both are updated with every sample, so reading
+    them costs nothing.
+
+    Timestamps are local wall-clock seconds, so periods start at the full
+    minute, hour and day. The volumes are taken from the total consumption,
+    so they add up to its growth.
+    """
+
+    def __init__(
+        self,
+        capacity: int = HISTORY_CAPACITY,
+        resolutions: Iterable[int] = HISTORY_RESOLUTIONS,
+    ) -> None:
+        """Initialize."""
+        self.capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._flows = array("d", bytes(8 * capacity))
+        self._totals = array("d", bytes(8 * capacity))
+        self._meters = array("d", bytes(8 * capacity))
+        self._next = 0
+        self._length = 0
+        self._current: dict[int, FlowRollup | None] = dict.fromkeys(resolutions)
+        self._previous: dict[int, FlowRollup | None] = dict.fromkeys(resolutions)
+        # Bumped per resolution whenever a reported value of its rollup moved.
+        self.revisions: dict[int, int] = dict.fromkeys(self._current, 0)
+
+    def __len__(self) -> int:
+        """Return the number of samples kept."""
+        return self._length
+
+    def add_sample(
+        self,
+        flow: float,
+        timestamp: float,
+        total: float = math.nan,
+        meter: float = math.nan,
+    ) -> None:
+        """Add the flow in m³/h and the total in m³ measured at ``timestamp``."""
+        # A new period starts from the total of the sample before it.
+        base = self._totals[self._next - 1] if self._length else math.nan
+        index = self._next
+        self._times[index] = timestamp
+        self._flows[index] = flow
+        self._totals[index] = total
+        self._meters[index] = meter
+        self._next = (index + 1) % self.capacity
+        self._length = min(self._length + 1, self.capacity)
+
+        for resolution, rollup in self._current.items():
+            start = timestamp - timestamp % resolution
+            changed = False
+            if rollup is None or rollup.start != start:
+                self._previous[resolution] = rollup
+                rollup = self._current[resolution] = FlowRollup(start, base)
+                changed = True
+            if rollup.add(flow, total) or changed:
+                self.revisions[resolution] += 1
+
+    def current(self, resolution: int) -> FlowRollup | None:
+        """Return the rollup of the period in progress."""
+        return self._current[resolution]
+
+    def previous(self, resolution: int) -> FlowRollup | None:
+        """Return the rollup of the last completed period."""
+        return self._previous[resolution]
+
+    def samples(self) -> Iterator[tuple[float, float, float, float]]:
+        """Yield the timestamp, flow, total and meter of each sample, oldest first."""
+        first = (self._next - self._length) % self.capacity
+        for offset in range(self._length):
+            index = (first + offset) % self.capacity
+            yield (
+                self._times[index],
+                self._flows[index],
+                self._totals[index],
+                self._meters[index],
+            )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the rollups for diagnostics."""
+        return {
+            "samples": self._length,
+            "capacity": self.capacity,
+            "revisions": self.revisions,
+            "rollups": {
+                resolution: {
+                    "current": rollup.as_dict() if rollup else None,
+                    "previous": (
+                        previous.as_dict()
+                        if (previous := self._previous[resolution])
+                        else None
+                    ),
+                }
+                for resolution, rollup in self._current.items()
+            },
+        }
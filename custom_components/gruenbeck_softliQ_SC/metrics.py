@@ -0,0 +1,131 @@
+"""Runtime metrics of the SoftQLink mux client."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass, field, fields
+from typing import Any
+
+# Upper bounds of the histogram buckets in seconds; the last bucket is open.
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROCESSING_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 5e-3)
+# Number of most recent samples a histogram describes.
+HISTOGRAM_WINDOW = 500
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of the most recent durations."""
+
+    __slots__ = ("buckets", "counts", "total", "_window")
+
+    def __init__(
+        self,
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+        window: int = HISTOGRAM_WINDOW,
+    ) -> None:
+        """Initialize."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self._window: deque[tuple[int, float]] = deque(maxlen=window)
+
+    @property
+    def count(self) -> int:
+        """Return the number of samples in the window."""
+        return len(self._window)
+
+    def record(self, seconds: float) -> None:
+        """Add a sample, dropping the oldest one once the window is full."""
+        if len(self._window) == self._window.maxlen:
+            index, oldest = self._window[0]
+            self.counts[index] -= 1
+            self.total -= oldest
+        index = bisect_left(self.buckets, seconds)
+        self._window.append((index, seconds))
+        self.counts[index] += 1
+        self.total += seconds
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean duration in seconds."""
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q: float) -> float | None:
+        """Return the bucket upper bound at or above quantile ``q``."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                if index < len(self.buckets):
+                    return self.buckets[index]
+                return float("inf")
+        return float("inf")
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary for diagnostics."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": dict(zip((*map(str, self.buckets), "inf"), self.counts)),
+        }
+
+
+@dataclass(slots=True)
+class SoftQLinkMetrics:
+    """Counters describing how the device and its connections behave."""
+
+    requests: int = 0
+    retries: int = 0
+    timeouts: int = 0
+    # Requests that still failed after all retries.
+    failures: int = 0
+    # Requests rejected without being sent because the circuit was open.
+    circuit_rejections: int = 0
+    # Requests cut short because the caller's time budget ran out.
+    deadline_exceeded: int = 0
+    # Retries skipped because the shared retry budget ran dry.
+    retries_denied: int = 0
+    # Reads abandoned because an edit needed the device.
+    preemptions: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    server_disconnects: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    # End-to-end request latency, including queueing and retries, per class.
+    latency: dict[str, LatencyHistogram] = field(
+        default_factory=lambda: {"read": LatencyHistogram(), "edit": LatencyHistogram()}
+    )
+    # Duration of single HTTP attempts that got a response.
+    round_trip: LatencyHistogram = field(default_factory=LatencyHistogram)
+    parse_time: LatencyHistogram = field(
+        default_factory=lambda: LatencyHistogram(PROCESSING_BUCKETS)
+    )
+    integration_time: LatencyHistogram = field(
+        default_factory=lambda: LatencyHistogram(PROCESSING_BUCKETS)
+    )
+
+    @property
+    def connection_reuse_ratio(self) -> float:
+        """Return the share of requests that reused a pooled connection."""
+        connections = self.connections_created + self.connections_reused
+        return self.connections_reused / connections if connections else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all metrics for diagnostics."""
+        data: dict[str, Any] = {}
+        for metric in fields(self):
+            value = getattr(self, metric.name)
+            if isinstance(value, LatencyHistogram):
+                value = value.as_dict()
+            elif isinstance(value, dict):
+                value = {key: item.as_dict() for key, item in value.items()}
+            data[metric.name] = value
+        data["connection_reuse_ratio"] = self.connection_reuse_ratio
+        return data
@@ -0,0 +1,46 @@
+"""Parser for the flat XML documents returned by the mux interface."""
+
+from __future__ import annotations
+
+import re
+
+import defusedxml.ElementTree as defET
+
+# The mux answers with a flat ``<data><D_X_n>value</D_X_n>...</data>`` document.
+# Documents of exactly that shape carry no DTD, entity, comment or CDATA, so
+# they are parsed with two regular expressions instead of building a DOM.
+# The raw body bytes are matched directly; anything else, including non-ASCII
+# documents whose declared encoding matters, goes through defusedxml.
+_FLAT_DOCUMENT = re.compile(
+    rb"\s*(?:<\?xml[^<>?]*\?>\s*)?<(\w+)>((?:\s*<(\w+)>[^<&]*</\3>)*)\s*</\1>\s*"
+)
+_FLAT_ELEMENT = re.compile(rb"<(\w+)>([^<]*)</")
+
+IGNORED_TAGS = frozenset({"code"})
+
+
+def parse_mux_response(xml_data: bytes) -> dict[str, str]:
+    """Return the child elements of a mux response as a tag to text mapping.
+
+    Raises ``xml.etree.ElementTree.ParseError`` or a defusedxml exception if
+    the document is malformed or unsafe.
+    """
+    if not xml_data.isascii() or (
+        (document := _FLAT_DOCUMENT.fullmatch(xml_data)) is None
+    ):
+        return _parse_with_defusedxml(xml_data)
+    data: dict[str, str] = {}
+    for tag, text in _FLAT_ELEMENT.findall(document[2]):
+        if (name := tag.decode("ascii")) not in IGNORED_TAGS:
+            data[name] = text.strip().decode("ascii")
+    return data
+
+
+def _parse_with_defusedxml(xml_data: bytes | str) -> dict[str, str]:
+    """Parse any well-formed document the fast path does not handle."""
+    root = defET.fromstring(xml_data)
+    return {
+        elem.tag: (elem.text or "").strip()
+        for elem in root
+        if elem.tag not in IGNORED_TAGS
+    }
@@ -0,0 +1,125 @@
+"""Request planning for the SoftQLink mux interface."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Final
+
+ERROR_MEMORY_CODE: Final = "245"
+SYSTEM_DATA_CODE: Final = "290"
+RESET_ERROR_MEMORY_CODE: Final = "189"
+
+LAST_ERROR_CODE: Final = "D_K_10_1"
+
+# Identifies this client to the mux interface.
+MUX_CLIENT_ID: Final = 2444
+
+CURRENT_VALUE_KEYS: Final[tuple[str, ...]] = (
+    "D_A_1_1",
+    "D_A_1_2",
+    "D_A_1_3",
+    "D_C_5_1",
+    "D_A_1_7",
+    "D_A_2_1",
+    "D_A_2_2",
+    "D_A_2_3",
+    "D_A_3_1",
+    "D_A_3_2",
+    "D_Y_1",
+    "D_Y_3",
+    "D_Y_5",
+    "D_Y_6",
+    "D_Y_10_1",
+    "D_D_1",
+    "D_B_1",
+)
+
+ERROR_MEMORY_KEYS: Final[tuple[str, ...]] = (
+    "D_K_3",
+    "D_K_2",
+    "D_K_5",
+    "D_K_8",
+    "D_K_9",
+    LAST_ERROR_CODE,
+)
+
+# Software version and softener type, which identify the device.
+IDENTITY_KEYS: Final[tuple[str, ...]] = ("D_Y_6", "D_F_4")
+
+# Models by their softener type code (D_F_4).
+SOFTENER_MODELS: Final[dict[str, str]] = {"1": "softliQ:SC18", "2": "softliQ:SC23"}
+
+# Properties that are only returned when the request unlocks their area.
+MUX_CODES: Final[dict[str, str]] = {
+    **{key: ERROR_MEMORY_CODE for key in ERROR_MEMORY_KEYS},
+    "D_F_4": SYSTEM_DATA_CODE,
+    "D_M_3_3": RESET_ERROR_MEMORY_CODE,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class MuxReadQuery:
+    """A single planned round trip to the mux interface."""
+
+    code: str
+    props: tuple[str, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class MuxEditTemplate:
+    """Pre-encoded request for setting one property to varying values."""
+
+    prefix: bytes
+    suffix: bytes
+
+    def render(self, value: str) -> bytes:
+        """Return the request body setting the property to ``value``."""
+        return self.prefix + value.encode("ascii") + self.suffix
+
+
+def _query_head(client_id: int, code: str) -> str:
+    """Return the ``id=..&code=..`` start of a request."""
+    return f"id={client_id}&code={code}" if code else f"id={client_id}"
+
+
+def _query_show(props: Iterable[str]) -> str:
+    """Return the ``&show=a|b~`` end of a request."""
+    return f"&show={'|'.join(props)}~"
+
+
+@lru_cache(maxsize=64)
+def compile_read_query(query: MuxReadQuery, client_id: int = MUX_CLIENT_ID) -> bytes:
+    """Return the request body for ``query``, built once per poll group."""
+    body = _query_head(client_id, query.code) + _query_show(query.props)
+    return body.encode("ascii")
+
+
+@lru_cache(maxsize=16)
+def compile_edit_template(
+    prop: str,
+    props: tuple[str, ...] = (),
+    code: str = "",
+    client_id: int = MUX_CLIENT_ID,
+) -> MuxEditTemplate:
+    """Return a template that sets ``prop`` and shows it along with ``props``."""
+    show = props if prop in props else (*props, prop)
+    return MuxEditTemplate(
+        f"{_query_head(client_id, code)}&edit={prop}>".encode("ascii"),
+        _query_show(show).encode("ascii"),
+    )
+
+
+def plan_read_queries(props: Iterable[str]) -> list[MuxReadQuery]:
+    """Group properties into one mux round trip per access code.
+
+    A request carries at most one access code, and the device answers a
+    request whose code does not fit the properties shown with nothing but
+    ``<code>wrong</code>``. Properties without a code are therefore not mixed
+    into a coded request; they get one of their own.
+    """
+    groups: dict[str, dict[str, None]] = {}
+    for prop in props:
+        groups.setdefault(MUX_CODES.get(prop, ""), {})[prop] = None
+    return [MuxReadQuery(code, tuple(group)) for code, group in groups.items()]
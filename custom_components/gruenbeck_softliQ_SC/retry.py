@@ -0,0 +1,149 @@
+"""Retry and circuit-breaker policies for the SoftQLink mux client."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import StrEnum
+import random
+import time
+
+from .const import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    MAX_ATTEMPTS,
+    REQUEST_TIMEOUT,
+    RETRY_BASE_DELAY,
+    RETRY_BUDGET_RATIO,
+    RETRY_BUDGET_RESERVE,
+    RETRY_MAX_DELAY,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SoftQLinkRetryPolicy:
+    """How often and how fast a failed request is retried."""
+
+    max_attempts: int = MAX_ATTEMPTS
+    base_delay: float = RETRY_BASE_DELAY
+    max_delay: float = RETRY_MAX_DELAY
+    # Share of each delay that is randomized to spread out retries.
+    jitter: float = 0.5
+    attempt_timeout: float = REQUEST_TIMEOUT
+
+    def backoff(self, attempt: int) -> float:
+        """Return the delay after the given failed attempt (1-based)."""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay - random.uniform(0, delay * self.jitter)
+
+
+class CircuitState(StrEnum):
+    """States of the circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class SoftQLinkCircuitBreaker:
+    """Fail fast while the device keeps failing, then probe it again.
+
+    After ``failure_threshold`` failed requests in a row the circuit opens
+    and requests are rejected without touching the device. Once
+    ``reset_timeout`` seconds have passed a single probe request is let
+    through; its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_in_flight = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """Return the current state."""
+        if self._opened_at is None:
+            return CircuitState.CLOSED
+        if self._clock() - self._opened_at < self.reset_timeout:
+            return CircuitState.OPEN
+        return CircuitState.HALF_OPEN
+
+    def allow_request(self) -> bool:
+        """Return whether a request may be sent now."""
+        match self.state:
+            case CircuitState.CLOSED:
+                return True
+            case CircuitState.OPEN:
+                return False
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def release_probe(self) -> None:
+        """Let another probe through if the current one was abandoned."""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failed request and open the circuit if needed."""
+        self._failures += 1
+        self._probe_in_flight = False
+        if self._opened_at is not None or self._failures >= self.failure_threshold:
+            if self._opened_at is None:
+                self.times_opened += 1
+            self._opened_at = self._clock()
+
+
+class SoftQLinkRetryBudget:
+    """Cap the retries of all clients sharing it to a share of their requests.
+
+    Every request earns ``ratio`` of a retry and every retry spends one,
+    with at most ``reserve`` retries saved up. While the network is down
+    the budget runs dry and requests are no longer retried, instead of
+    every client retrying at once.
+    """
+
+    def __init__(
+        self, ratio: float = RETRY_BUDGET_RATIO, reserve: int = RETRY_BUDGET_RESERVE
+    ) -> None:
+        """Initialize."""
+        self.ratio = ratio
+        self.reserve = reserve
+        self._balance = float(reserve)
+
+    @property
+    def balance(self) -> float:
+        """Return the retries that may be made right now."""
+        return self._balance
+
+    @property
+    def exhausted(self) -> bool:
+        """Return whether no retry may be made."""
+        return self._balance < 1
+
+    def record_request(self) -> None:
+        """Earn a share of a retry for a request."""
+        self._balance = min(self.reserve, self._balance + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Spend a retry if the budget allows it."""
+        if self._balance < 1:
+            return False
+        self._balance -= 1
+        return True
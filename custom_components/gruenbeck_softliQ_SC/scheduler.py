@@ -0,0 +1,98 @@
+"""Prioritized request scheduling for the SoftQLink mux client."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Coroutine
+from enum import IntEnum
+import heapq
+import itertools
+from typing import Any, TypeVar
+
+_T = TypeVar("_T")
+
+
+class RequestPriority(IntEnum):
+    """Request classes, lower values are served first."""
+
+    EDIT = 0
+    READ = 1
+
+
+class SoftQLinkRequestScheduler:
+    """Serialize mux requests, letting edits jump ahead of queued reads.
+
+    Only one request talks to the device at a time. Waiting edits are served
+    before waiting reads, and an edit arriving while a read is in flight
+    abandons that read so the user's command is not stuck behind a slow or
+    retrying poll. The abandoned read is expected to queue up again.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._queue: list[tuple[RequestPriority, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+        self._busy = False
+        self._active_read: asyncio.Task[Any] | None = None
+
+    @property
+    def busy(self) -> bool:
+        """Return whether a request currently holds the device."""
+        return self._busy
+
+    async def acquire(self, priority: RequestPriority) -> None:
+        """Wait until the device is free for a request of ``priority``."""
+        if not self._busy and not self._queue:
+            self._busy = True
+            return
+        if priority is RequestPriority.EDIT and self._active_read is not None:
+            self._active_read.cancel()
+
+        entry = (
+            priority,
+            next(self._counter),
+            asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._queue, entry)
+        try:
+            await entry[2]
+        except asyncio.CancelledError:
+            if entry[2].done() and not entry[2].cancelled():
+                # The device was handed over just before the cancellation.
+                self.release()
+            else:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+            raise
+
+    def release(self) -> None:
+        """Hand the device to the next waiting request."""
+        self._active_read = None
+        while self._queue:
+            _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._busy = False
+
+    async def run_read(self, coro: Coroutine[Any, Any, _T]) -> _T:
+        """Run a read attempt that an incoming edit may abandon.
+
+        Raises ``RequestPreemptedError`` if an edit took over the device.
+        """
+        attempt = asyncio.ensure_future(coro)
+        self._active_read = attempt
+        try:
+            return await attempt
+        except asyncio.CancelledError:
+            task = asyncio.current_task()
+            if attempt.cancelled() and (task is None or not task.cancelling()):
+                raise RequestPreemptedError from None
+            raise
+        finally:
+            if self._active_read is attempt:
+                self._active_read = None
+
+
+class RequestPreemptedError(Exception):
+    """A read was abandoned in favour of an edit."""
@@ -2,22 +2,25 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from typing import Final
 
 from homeassistant.components.select import SelectEntity, SelectEntityDescription
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import DOMAIN, POLL_TIER_NORMAL
 from .coordinator import SoftQLinkDataUpdateCoordinator
-from .entity import build_device_info, get_entity_unique_id_prefix
+from .entity import SoftQLinkEntity, build_device_info, get_entity_unique_id_prefix
 
 
+@dataclass(frozen=True)
 class SoftQLinkSelectEntityDescription(SelectEntityDescription):
     """Base class for a Softliq select entity description."""
 
+    poll_tier: str = POLL_TIER_NORMAL
+
 
 SELECT_DESCRIPTIONS: Final = [
     SoftQLinkSelectEntityDescription(
@@ -42,9 +45,7 @@ async def async_setup_entry(
     async_add_entities(selects)
 
 
-class SoftQLinkSelectEntity(
-    CoordinatorEntity[SoftQLinkDataUpdateCoordinator], SelectEntity
-):
+class SoftQLinkSelectEntity(SoftQLinkEntity, SelectEntity):
     """Representation of a SoftQLink select entity."""
 
     entity_description: SoftQLinkSelectEntityDescription
@@ -58,6 +59,7 @@ class SoftQLinkSelectEntity(
         """Initialize a select."""
         super().__init__(coordinator)
         self.entity_description = description
+        self._poll_keys = {description.key: description.poll_tier}
         unique_id_prefix = get_entity_unique_id_prefix(coordinator)
         self._attr_unique_id = f"{unique_id_prefix}-{description.key}".lower()
         self._attr_device_info = build_device_info(coordinator)
@@ -65,12 +67,14 @@ class SoftQLinkSelectEntity(
 
     async def async_select_option(self, option: str) -> None:
         """Update the current selected option."""
-        await self.coordinator.client.set_mode(option)
-        await self.coordinator.async_request_refresh()
+        values = await self.coordinator.client.set_mode(option)
+        self.coordinator.async_apply_values(values)
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
+        if not self._should_write_state():
+            return
         self._handle_value_update()
         self.async_write_ha_state()
 
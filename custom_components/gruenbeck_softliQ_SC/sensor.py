@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
 from dataclasses import dataclass
+import time
+from typing import Any
 
 from homeassistant.components.sensor.const import SensorStateClass, SensorDeviceClass
 from homeassistant.components.sensor import (
@@ -18,17 +21,32 @@ from homeassistant.const import (
     UnitOfVolume,
     UnitOfVolumeFlowRate,
     UnitOfElectricCurrent,
+    UnitOfInformation,
 )
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.typing import StateType
 
 from .coordinator import SoftQLinkDataUpdateCoordinator
-from .const import DOMAIN, TOTAL_CONSUMPTION
+from .const import (
+    DEADBAND_MAX_SILENCE,
+    DOMAIN,
+    HISTORY_DAY,
+    HISTORY_HOUR,
+    POLL_TIER_FAST,
+    POLL_TIER_NORMAL,
+    POLL_TIER_SLOW,
+    POLL_TIER_STATIC,
+    TOTAL_CONSUMPTION,
+)
 from .entity import (
+    SoftQLinkEntity,
     build_device_info,
     get_entity_unique_id_prefix,
 )
+from .history import MEAN_DIGITS, VOLUME_DIGITS, FlowHistory, FlowRollup, rollup_key
+from .metrics import LatencyHistogram, SoftQLinkMetrics
+
 PARALLEL_UPDATES = 1
 
 
@@ -36,6 +54,15 @@ PARALLEL_UPDATES = 1
 class SoftQLinkSensorEntityDescription(SensorEntityDescription):
     """Class describing SoftQLink sensor entities."""
 
+    # Mux key the value is read or derived from, if it differs from ``key``.
+    mux_key: str | None = None
+    poll_tier: str = POLL_TIER_NORMAL
+    # Changes smaller than the absolute deadband, or than the relative share
+    # of the reported value, are held back for up to ``max_silence`` seconds.
+    deadband: float | None = None
+    relative_deadband: float | None = None
+    max_silence: float = DEADBAND_MAX_SILENCE
+
 
 SENSOR_TYPES: tuple[SoftQLinkSensorEntityDescription, ...] = (
     # current flow
@@ -45,6 +72,8 @@ SENSOR_TYPES: tuple[SoftQLinkSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfVolumeFlowRate.CUBIC_METERS_PER_HOUR,
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=None,
+        poll_tier=POLL_TIER_FAST,
+        deadband=0.02,
     ),
     # calculated by current flow
     SoftQLinkSensorEntityDescription(
@@ -54,6 +83,8 @@ SENSOR_TYPES: tuple[SoftQLinkSensorEntityDescription, ...] = (
         state_class=SensorStateClass.TOTAL_INCREASING,
         device_class=SensorDeviceClass.WATER,
         entity_category=None,
+        mux_key="D_A_1_1",
+        poll_tier=POLL_TIER_FAST,
     ),
     # remaining capacity
     SoftQLinkSensorEntityDescription(
@@ -62,6 +93,7 @@ SENSOR_TYPES: tuple[SoftQLinkSensorEntityDescription, ...] = (
         native_unit_of_measurement="m³*°dH",
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
+        relative_deadband=0.01,
     ),
     # Capacity number
     SoftQLinkSensorEntityDescription(
@@ -80,6 +112,8 @@ SENSOR_TYPES: tuple[SoftQLinkSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.VOLUME_FLOW_RATE,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        poll_tier=POLL_TIER_FAST,
+        deadband=0.02,
     ),
     # Remaining time/quantity regeneration step
     SoftQLinkSensorEntityDescription(
@@ -88,6 +122,7 @@ SENSOR_TYPES: tuple[SoftQLinkSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfTime.MINUTES,
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
+        poll_tier=POLL_TIER_FAST,
     ),
     # days until the next maintenance
     SoftQLinkSensorEntityDescription(
@@ -96,6 +131,7 @@ SENSOR_TYPES: tuple[SoftQLinkSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfTime.DAYS,
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
+        poll_tier=POLL_TIER_SLOW,
     ),
     # Salt range in days
     SoftQLinkSensorEntityDescription(
@@ -104,6 +140,7 @@ SENSOR_TYPES: tuple[SoftQLinkSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfTime.DAYS,
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
+        poll_tier=POLL_TIER_SLOW,
     ),
     # Last regeneration
     SoftQLinkSensorEntityDescription(
@@ -120,6 +157,8 @@ SENSOR_TYPES: tuple[SoftQLinkSensorEntityDescription, ...] = (
         native_unit_of_measurement=PERCENTAGE,
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
+        poll_tier=POLL_TIER_FAST,
+        deadband=1,
     ),
     # Raw water hardness
     SoftQLinkSensorEntityDescription(
@@ -128,6 +167,7 @@ SENSOR_TYPES: tuple[SoftQLinkSensorEntityDescription, ...] = (
         native_unit_of_measurement="°dH",
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
+        poll_tier=POLL_TIER_STATIC,
     ),
     # Soft water volume meter
     SoftQLinkSensorEntityDescription(
@@ -137,6 +177,7 @@ SENSOR_TYPES: tuple[SoftQLinkSensorEntityDescription, ...] = (
         state_class=SensorStateClass.TOTAL_INCREASING,
         entity_category=EntityCategory.DIAGNOSTIC,
         device_class=SensorDeviceClass.WATER,
+        poll_tier=POLL_TIER_SLOW,
     ),
     # Flow peak value
     SoftQLinkSensorEntityDescription(
@@ -145,6 +186,7 @@ SENSOR_TYPES: tuple[SoftQLinkSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfVolumeFlowRate.CUBIC_METERS_PER_HOUR,
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
+        poll_tier=POLL_TIER_SLOW,
     ),
     # Chlorstrom
     SoftQLinkSensorEntityDescription(
@@ -153,6 +195,7 @@ SENSOR_TYPES: tuple[SoftQLinkSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfElectricCurrent.MILLIAMPERE,
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
+        poll_tier=POLL_TIER_SLOW,
     ),
     # Consumption capacity rate
     SoftQLinkSensorEntityDescription(
@@ -161,6 +204,7 @@ SENSOR_TYPES: tuple[SoftQLinkSensorEntityDescription, ...] = (
         native_unit_of_measurement="m³*°dH",
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
+        poll_tier=POLL_TIER_SLOW,
     ),
     # Average consumption over the last 3 day
     SoftQLinkSensorEntityDescription(
@@ -169,12 +213,14 @@ SENSOR_TYPES: tuple[SoftQLinkSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfVolume.CUBIC_METERS,
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
+        poll_tier=POLL_TIER_SLOW,
     ),
     # Last error code
     SoftQLinkSensorEntityDescription(
         key="D_K_10_1",
         translation_key="D_K_10_1",
         entity_category=EntityCategory.DIAGNOSTIC,
+        poll_tier=POLL_TIER_SLOW,
     ),
     # Last error code days old
     SoftQLinkSensorEntityDescription(
@@ -183,6 +229,8 @@ SENSOR_TYPES: tuple[SoftQLinkSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfTime.HOURS,
         entity_category=EntityCategory.DIAGNOSTIC,
+        mux_key="D_K_10_1",
+        poll_tier=POLL_TIER_SLOW,
     ),
     # Water consumption yesterday
     SoftQLinkSensorEntityDescription(
@@ -191,6 +239,7 @@ SENSOR_TYPES: tuple[SoftQLinkSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfVolume.LITERS,
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
+        poll_tier=POLL_TIER_SLOW,
     ),
     # Salt consumption per year
     SoftQLinkSensorEntityDescription(
@@ -200,16 +249,21 @@ SENSOR_TYPES: tuple[SoftQLinkSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=False,
+        poll_tier=POLL_TIER_SLOW,
     ),
     # Current regeneration step
     SoftQLinkSensorEntityDescription(
-        key="D_Y_5", translation_key="D_Y_5", entity_category=EntityCategory.DIAGNOSTIC
+        key="D_Y_5",
+        translation_key="D_Y_5",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        poll_tier=POLL_TIER_FAST,
     ),
     # software version
     SoftQLinkSensorEntityDescription(
         key="D_Y_6",
         translation_key="D_Y_6",
         entity_category=EntityCategory.DIAGNOSTIC,
+        poll_tier=POLL_TIER_STATIC,
     ),
     # remaining capacity
     SoftQLinkSensorEntityDescription(
@@ -218,6 +272,156 @@ SENSOR_TYPES: tuple[SoftQLinkSensorEntityDescription, ...] = (
         native_unit_of_measurement=PERCENTAGE,
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
+        deadband=1,
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class SoftQLinkMetricSensorEntityDescription(SensorEntityDescription):
+    """Class describing sensors for the metrics of the device connection."""
+
+    value_fn: Callable[[SoftQLinkMetrics], StateType]
+
+
+def _mean(histogram: LatencyHistogram, scale: float) -> float | None:
+    """Return the mean of ``histogram`` in units of ``1 / scale`` seconds."""
+    mean = histogram.mean
+    return None if mean is None else round(mean * scale, 3)
+
+
+def _p95(histogram: LatencyHistogram, scale: float) -> float | None:
+    """Return the 95th percentile bucket of ``histogram``."""
+    p95 = histogram.quantile(0.95)
+    return None if p95 is None or p95 == float("inf") else p95 * scale
+
+
+METRIC_SENSOR_TYPES: tuple[SoftQLinkMetricSensorEntityDescription, ...] = (
+    SoftQLinkMetricSensorEntityDescription(
+        key="request_latency",
+        translation_key="request_latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: _mean(metrics.round_trip, 1000),
+    ),
+    SoftQLinkMetricSensorEntityDescription(
+        key="request_latency_p95",
+        translation_key="request_latency_p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: _p95(metrics.round_trip, 1000),
+    ),
+    SoftQLinkMetricSensorEntityDescription(
+        key="command_latency",
+        translation_key="command_latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: _mean(metrics.latency["edit"], 1000),
+    ),
+    SoftQLinkMetricSensorEntityDescription(
+        key="request_retries",
+        translation_key="request_retries",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.retries,
+    ),
+    SoftQLinkMetricSensorEntityDescription(
+        key="request_timeouts",
+        translation_key="request_timeouts",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.timeouts,
+    ),
+    SoftQLinkMetricSensorEntityDescription(
+        key="request_failures",
+        translation_key="request_failures",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.failures,
+    ),
+    SoftQLinkMetricSensorEntityDescription(
+        key="bytes_received",
+        translation_key="bytes_received",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.bytes_received,
+    ),
+    SoftQLinkMetricSensorEntityDescription(
+        key="bytes_sent",
+        translation_key="bytes_sent",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.bytes_sent,
+    ),
+    SoftQLinkMetricSensorEntityDescription(
+        key="parse_time",
+        translation_key="parse_time",
+        native_unit_of_measurement=UnitOfTime.MICROSECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: _mean(metrics.parse_time, 1e6),
+    ),
+    SoftQLinkMetricSensorEntityDescription(
+        key="integration_time",
+        translation_key="integration_time",
+        native_unit_of_measurement=UnitOfTime.MICROSECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: _mean(metrics.integration_time, 1e6),
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class SoftQLinkHistorySensorEntityDescription(SensorEntityDescription):
+    """Class describing sensors for the rollups of the flow history."""
+
+    resolution: int
+    value_fn: Callable[[FlowRollup], float | None]
+
+
+HISTORY_SENSOR_TYPES: tuple[SoftQLinkHistorySensorEntityDescription, ...] = (
+    SoftQLinkHistorySensorEntityDescription(
+        key="consumption_hour",
+        translation_key="consumption_hour",
+        native_unit_of_measurement=UnitOfVolume.CUBIC_METERS,
+        device_class=SensorDeviceClass.WATER,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=3,
+        resolution=HISTORY_HOUR,
+        value_fn=lambda rollup: round(rollup.volume, VOLUME_DIGITS),
+    ),
+    SoftQLinkHistorySensorEntityDescription(
+        key="consumption_today",
+        translation_key="consumption_today",
+        native_unit_of_measurement=UnitOfVolume.CUBIC_METERS,
+        device_class=SensorDeviceClass.WATER,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=3,
+        resolution=HISTORY_DAY,
+        value_fn=lambda rollup: round(rollup.volume, VOLUME_DIGITS),
+    ),
+    SoftQLinkHistorySensorEntityDescription(
+        key="peak_flow_hour",
+        translation_key="peak_flow_hour",
+        native_unit_of_measurement=UnitOfVolumeFlowRate.CUBIC_METERS_PER_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+        resolution=HISTORY_HOUR,
+        value_fn=lambda rollup: rollup.maximum,
+    ),
+    SoftQLinkHistorySensorEntityDescription(
+        key="mean_flow_hour",
+        translation_key="mean_flow_hour",
+        native_unit_of_measurement=UnitOfVolumeFlowRate.CUBIC_METERS_PER_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=3,
+        entity_registry_enabled_default=False,
+        resolution=HISTORY_HOUR,
+        value_fn=lambda rollup: (
+            None if (mean := rollup.mean) is None else round(mean, MEAN_DIGITS)
+        ),
     ),
 )
 
@@ -228,38 +432,187 @@ async def async_setup_entry(
     """Set up SoftQLink sensor entities based on a config entry."""
 
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    sensors = []
+    sensors: list[SensorEntity] = []
     for description in SENSOR_TYPES:
         sensors.append(SoftQLinkSensor(coordinator, description))
+    for metric_description in METRIC_SENSOR_TYPES:
+        sensors.append(SoftQLinkMetricSensor(coordinator, metric_description))
+    for history_description in HISTORY_SENSOR_TYPES:
+        sensors.append(SoftQLinkHistorySensor(coordinator, history_description))
 
     async_add_entities(sensors, False)
 
 
-class SoftQLinkSensor(CoordinatorEntity[SoftQLinkDataUpdateCoordinator], SensorEntity):  # type: ignore
+class SoftQLinkSensor(SoftQLinkEntity, SensorEntity):  # type: ignore
     """Define an SoftQLink sensor."""
 
     def __init__(
         self,
         coordinator: SoftQLinkDataUpdateCoordinator,
-        description: SensorEntityDescription,
+        description: SoftQLinkSensorEntityDescription,
     ) -> None:
         """Initialize."""
         super().__init__(coordinator)
         self.entity_description = description  # type: ignore[assignment]
+        self._poll_keys = {
+            description.mux_key or description.key: description.poll_tier
+        }
+        self._state_keys = frozenset({description.key})
         self._attr_device_info = build_device_info(coordinator)
         unique_id_prefix = get_entity_unique_id_prefix(coordinator)
         self._attr_unique_id = f"{unique_id_prefix}-{description.key}".lower()
         self._attr_attribution = "Data from SoftQLink"
         self._attr_has_entity_name = True
+        self._reported_at: float | None = None
+        # Whether a change within the deadband is waiting to be reported.
+        self._held_back = False
         self._update_native_value()
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        self._update_native_value()
+        available_changed = self.available != self._written_available
+        if self._heartbeat_due():
+            # The held back value may not change again, so report it now.
+            self._written_available = self.available
+        elif not self._should_write_state():
+            return
+        if not self._update_native_value() and not available_changed:
+            self.coordinator.skipped_state_writes += 1
+            return
         self.async_write_ha_state()
 
-    def _update_native_value(self) -> None:
-        """Update the current native value from coordinator data."""
+    def _update_native_value(self) -> bool:
+        """Update the current native value from coordinator data.
+
+        Return False if the change was held back by the deadband.
+        """
         val = self.coordinator.data.get(self.entity_description.key)
-        self._attr_native_value = None if val in (None, "-") else val
+        value = None if val in (None, "-") else val
+        now = time.monotonic()
+        if self._within_deadband(value, now):
+            self._held_back = value != self._attr_native_value
+            return False
+        self._attr_native_value = value
+        self._reported_at = now
+        self._held_back = False
+        return True
+
+    def _heartbeat_due(self) -> bool:
+        """Return whether a held back change has waited for ``max_silence``."""
+        return (
+            self._held_back
+            and self._reported_at is not None
+            and time.monotonic() - self._reported_at
+            >= self.entity_description.max_silence
+        )
+
+    def _within_deadband(self, value: Any, now: float) -> bool:
+        """Return whether ``value`` is too close to the reported value."""
+        description = self.entity_description
+        if description.deadband is None and description.relative_deadband is None:
+            return False
+        if self._reported_at is None or (
+            now - self._reported_at >= description.max_silence
+        ):
+            return False
+        try:
+            new = float(value)
+            old = float(self._attr_native_value)  # type: ignore[arg-type]
+        except (TypeError, ValueError):
+            return False
+        if new == 0 or old == 0:
+            # Starting or stopping, e.g. the water flow, is always reported.
+            return new == old
+        threshold = max(
+            description.deadband or 0,
+            (description.relative_deadband or 0) * abs(old),
+        )
+        return abs(new - old) < threshold
+
+
+class SoftQLinkMetricSensor(SoftQLinkEntity, SensorEntity):
+    """Sensor exposing a metric of the connection to the device."""
+
+    entity_description: SoftQLinkMetricSensorEntityDescription
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: SoftQLinkDataUpdateCoordinator,
+        description: SoftQLinkMetricSensorEntityDescription,
+    ) -> None:
+        """Initialize."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_device_info = build_device_info(coordinator)
+        unique_id_prefix = get_entity_unique_id_prefix(coordinator)
+        self._attr_unique_id = f"{unique_id_prefix}-{description.key}".lower()
+        self._written_value: StateType = None
+
+    def _should_write_state(self) -> bool:
+        """Return whether the metric or the availability changed.
+
+        Metrics are no coordinator data, so the value itself is compared.
+        """
+        available = self.available
+        value = self.native_value
+        if available == self._written_available and value == self._written_value:
+            self.coordinator.skipped_state_writes += 1
+            return False
+        self._written_available = available
+        self._written_value = value
+        return True
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the current value of the metric."""
+        return self.entity_description.value_fn(self.coordinator.client.metrics)
+
+
+class SoftQLinkHistorySensor(SoftQLinkEntity, SensorEntity):
+    """Sensor exposing a rollup of the flow history.
+
+    The state is only written when the rollup of the sensor's resolution
+    changed, and then only if the sensor's own value did.
+    """
+
+    entity_description: SoftQLinkHistorySensorEntityDescription
+    _attr_has_entity_name = True
+    _poll_keys = {"D_A_1_1": POLL_TIER_FAST}
+
+    def __init__(
+        self,
+        coordinator: SoftQLinkDataUpdateCoordinator,
+        description: SoftQLinkHistorySensorEntityDescription,
+    ) -> None:
+        """Initialize."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._state_keys = frozenset({rollup_key(description.resolution)})
+        self._attr_device_info = build_device_info(coordinator)
+        unique_id_prefix = get_entity_unique_id_prefix(coordinator)
+        self._attr_unique_id = f"{unique_id_prefix}-{description.key}".lower()
+        self._written_value: StateType = None
+
+    def _should_write_state(self) -> bool:
+        """Return whether the availability or the value changed."""
+        available = self._written_available
+        if not super()._should_write_state():
+            return False
+        value = self.native_value
+        if available == self._written_available and value == self._written_value:
+            self.coordinator.skipped_state_writes += 1
+            return False
+        self._written_value = value
+        return True
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the value of the rollup of the period in progress."""
+        history: FlowHistory = self.coordinator.history
+        if (rollup := history.current(self.entity_description.resolution)) is None:
+            return None
+        return self.entity_description.value_fn(rollup)
@@ -0,0 +1,111 @@
+"""Compact, typed view of the values polled from a SoftQLink device."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from typing import Any, Final
+
+from .const import TOTAL_CONSUMPTION
+from .query import CURRENT_VALUE_KEYS, ERROR_MEMORY_KEYS, LAST_ERROR_CODE
+
+SNAPSHOT_KEYS: Final[tuple[str, ...]] = (
+    *CURRENT_VALUE_KEYS,
+    *ERROR_MEMORY_KEYS,
+    f"{LAST_ERROR_CODE}_Hours",
+    "D_F_4",
+    "D_M_3_3",
+    TOTAL_CONSUMPTION,
+)
+
+# Values that are codes or text rather than measurements.
+STRING_KEYS: Final = frozenset(
+    {"D_B_1", "D_C_5_1", "D_Y_5", "D_Y_6", LAST_ERROR_CODE, "D_F_4", "D_M_3_3"}
+)
+
+_INDEX: Final = {key: index for index, key in enumerate(SNAPSHOT_KEYS)}
+_NUMERIC: Final = tuple(key not in STRING_KEYS for key in SNAPSHOT_KEYS)
+_MISSING: Final = object()
+
+
+def to_number(text: str) -> int | float | None:
+    """Convert a mux value like ``"12"`` or ``"0.62"``, None if it is no number."""
+    text = text.strip()
+    if text.isascii() and text.isdigit():
+        return int(text)
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+class SoftQLinkSnapshot:
+    """The latest value of every polled key, converted once when polled.
+
+    Known keys are stored by position in a list; measurements are kept as
+    numbers and unavailable ones (``"-"``) as None. Keys outside the known
+    layout are kept as received.
+    """
+
+    __slots__ = ("_values", "_extra")
+
+    def __init__(
+        self, values: list[Any] | None = None, extra: dict[str, Any] | None = None
+    ) -> None:
+        """Initialize."""
+        self._values = values if values is not None else [_MISSING] * len(_INDEX)
+        self._extra = extra
+
+    def merge(
+        self, values: Mapping[str, Any]
+    ) -> tuple[SoftQLinkSnapshot, frozenset[str]]:
+        """Return a snapshot updated with ``values`` and the keys that changed."""
+        merged = self._values.copy()
+        extra = self._extra
+        changed: list[str] = []
+        for key, value in values.items():
+            if (index := _INDEX.get(key)) is None:
+                if extra is None or extra.get(key, _MISSING) != value:
+                    if extra is self._extra:
+                        extra = dict(extra or {})
+                    extra[key] = value
+                    changed.append(key)
+                continue
+            if _NUMERIC[index] and isinstance(value, str):
+                value = to_number(value)
+            if merged[index] is _MISSING or merged[index] != value:
+                merged[index] = value
+                changed.append(key)
+        return SoftQLinkSnapshot(merged, extra), frozenset(changed)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value of ``key``, or ``default`` if it was never polled."""
+        if (index := _INDEX.get(key)) is None:
+            return default if self._extra is None else self._extra.get(key, default)
+        value = self._values[index]
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key: str) -> Any:
+        """Return the value of ``key``."""
+        if (value := self.get(key, _MISSING)) is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        """Return whether ``key`` was polled."""
+        return isinstance(key, str) and self.get(key, _MISSING) is not _MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the polled keys."""
+        for key, value in zip(SNAPSHOT_KEYS, self._values):
+            if value is not _MISSING:
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        """Return the number of polled keys."""
+        return sum(1 for _ in self)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the polled values as a dictionary."""
+        return {key: self[key] for key in self}
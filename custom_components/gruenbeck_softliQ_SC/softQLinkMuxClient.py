@@ -1,19 +1,69 @@
 """MUX interface of Gruenbeck SoftQLink Water Softener."""
 
 import asyncio
+from collections.abc import AsyncIterator, Iterable, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 import logging
+import time
 from decimal import Decimal
-from typing import TypeAlias
-
-from aiohttp import ClientError, ClientSession, ClientTimeout, ServerDisconnectedError
-import defusedxml.ElementTree as defET
-import homeassistant.util.dt as dt_util
+from typing import Any, TypeAlias
+
+from aiohttp import (
+    ClientError,
+    ClientResponse,
+    ClientSession,
+    ClientTimeout,
+    ServerDisconnectedError,
+    TCPConnector,
+    TraceConfig,
+)
+from defusedxml import DefusedXmlException
 from xml.etree.ElementTree import ParseError
 
-from .const import REQUEST_TIMEOUT, TOTAL_CONSUMPTION
+from .const import (
+    CONNECTION_LIMIT,
+    DISCONNECT_LIMIT,
+    DNS_CACHE_TTL,
+    KEEPALIVE_TIMEOUT,
+    MAX_BODY_SIZE,
+    MAX_PREEMPTIONS,
+    PROBE_CONNECT_TIMEOUT,
+    PROBE_TIMEOUT,
+)
+from .metrics import SoftQLinkMetrics
+from .mux_parser import parse_mux_response
+from .query import (
+    IDENTITY_KEYS,
+    LAST_ERROR_CODE,
+    MUX_CLIENT_ID,
+    RESET_ERROR_MEMORY_CODE,
+    SOFTENER_MODELS,
+    MuxReadQuery,
+    compile_edit_template,
+    compile_read_query,
+    plan_read_queries,
+)
+from .retry import (
+    CircuitState,
+    SoftQLinkCircuitBreaker,
+    SoftQLinkRetryBudget,
+    SoftQLinkRetryPolicy,
+)
+from .scheduler import (
+    RequestPreemptedError,
+    RequestPriority,
+    SoftQLinkRequestScheduler,
+)
 
 _LOGGER = logging.getLogger(__name__)
-SoftQLinkValue: TypeAlias = str | Decimal
+# None for derived values the device reported nothing for.
+SoftQLinkValue: TypeAlias = str | Decimal | None
+
+_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+_CLOSE_HEADERS = _HEADERS | {"Connection": "close"}
+# D_F_4 needs an access code and D_Y_6 none, so they take two round trips.
+_IDENTITY_QUERIES = tuple(plan_read_queries(IDENTITY_KEYS))
 
 
 class SoftQLinkClientError(Exception):
@@ -24,6 +74,14 @@ class SoftQLinkTimeoutError(SoftQLinkClientError):
     """The device did not answer within the request timeout."""
 
 
+class SoftQLinkDeadlineError(SoftQLinkTimeoutError):
+    """The caller's time budget ran out before the request could finish."""
+
+
+class SoftQLinkPreemptedError(SoftQLinkClientError):
+    """Edits kept taking the device over from a read."""
+
+
 class SoftQLinkResponseError(SoftQLinkClientError):
     """The device returned an invalid response."""
 
@@ -32,141 +90,202 @@ class SoftQLinkParseError(SoftQLinkClientError):
     """The device returned malformed XML."""
 
 
-class SoftQLinkMuxClient:
-    """Encapsulates the http communication to the SoftQLink."""
+class SoftQLinkCircuitOpenError(SoftQLinkClientError):
+    """The device failed repeatedly and is not queried for a while."""
+
+
+@dataclass(frozen=True, slots=True)
+class SoftQLinkIdentity:
+    """What a device tells about itself."""
+
+    model: str
+    sw_version: str
+
+    @classmethod
+    def from_values(cls, values: dict[str, SoftQLinkValue]) -> "SoftQLinkIdentity":
+        """Return the identity in the values of an identity query."""
+        software_value = values.get("D_Y_6")
+        type_value = values.get("D_F_4")
+        return cls(
+            model=SOFTENER_MODELS.get(type_value, "Unknown Device")
+            if isinstance(type_value, str)
+            else "",
+            sw_version=software_value if isinstance(software_value, str) else "",
+        )
+
+
+def _remaining(deadline: float | None) -> float | None:
+    """Return the seconds left until ``deadline``, if there is one."""
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
 
-    _timeout = ClientTimeout(total=REQUEST_TIMEOUT)
 
-    @staticmethod
-    async def create(host: str, session: ClientSession) -> "SoftQLinkMuxClient":
-        """Create generates a client and initialize the connection."""
-        client = SoftQLinkMuxClient(host, session)
-        await client._init()
-        return client
+class SoftQLinkMuxClient:
+    """Encapsulates the http communication to the SoftQLink."""
 
-    def __init__(self, host: str, session: ClientSession):
-        """Initialize."""
-        self.session = session
+    def __init__(
+        self,
+        host: str,
+        session: ClientSession | None = None,
+        max_body_size: int | None = MAX_BODY_SIZE,
+        retry_policy: SoftQLinkRetryPolicy | None = None,
+        circuit_breaker: SoftQLinkCircuitBreaker | None = None,
+        retry_budget: SoftQLinkRetryBudget | None = None,
+    ):
+        """Initialize.
+
+        Without a ``session`` the client owns a connection pool dedicated to
+        the device, which must be released with ``async_close``.
+        """
+        self._session = session
+        self._owns_session = session is None
+        self._force_close = False
+        self._disconnects_in_a_row = 0
+        self.retry_policy = retry_policy or SoftQLinkRetryPolicy()
+        self.circuit_breaker = circuit_breaker or SoftQLinkCircuitBreaker()
+        # Shared with other clients, if any, to keep them from retrying at once.
+        self.retry_budget = retry_budget
+        self.metrics = SoftQLinkMetrics()
         self.host = host
-        self.client_id = 2444
+        self.max_body_size = max_body_size
+        self.client_id = MUX_CLIENT_ID
         self.connected = False
-        self.total_consumption: Decimal = Decimal("0")
-        self.last_flow = ""
-        self.last_update = dt_util.utcnow()
-        self._lock = asyncio.Lock()
+        self._scheduler = SoftQLinkRequestScheduler()
         self.sw_version = ""
         self.model = ""
 
-    async def _init(self):
-        """Initialize Software Version and Model from the SoftQLink Device."""
-        self.sw_version = await self._get_software_version()
-        self.model = await self._get_softener_type()
+    @property
+    def session(self) -> ClientSession:
+        """Return the HTTP session, creating the device pool on first use."""
+        if self._session is None:
+            self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> ClientSession:
+        """Create a keep-alive session dedicated to this device."""
+        trace_config = TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_created)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+        connector = TCPConnector(
+            limit=CONNECTION_LIMIT,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=DNS_CACHE_TTL,
+        )
+        return ClientSession(connector=connector, trace_configs=[trace_config])
+
+    async def _on_connection_created(self, *_: Any) -> None:
+        self.metrics.connections_created += 1
+
+    async def _on_connection_reused(self, *_: Any) -> None:
+        self.metrics.connections_reused += 1
+
+    async def async_close(self) -> None:
+        """Close the connection pool if the client owns it."""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def async_update_identity(self, deadline: float | None = None) -> None:
+        """Fetch the software version and model."""
+        self._set_identity(
+            SoftQLinkIdentity.from_values(
+                await self.get_values(IDENTITY_KEYS, deadline=deadline)
+            )
+        )
+
+    async def async_probe(
+        self,
+        timeout: float = PROBE_TIMEOUT,
+        connect_timeout: float = PROBE_CONNECT_TIMEOUT,
+    ) -> SoftQLinkIdentity:
+        """Identify the device, with a single quick attempt per request.
+
+        Unlike other requests, a probe is not retried and neither consults
+        nor trips the circuit breaker, so it suits checking whether a host
+        is a reachable SoftQLink at all.
+        """
+        values: dict[str, SoftQLinkValue] = {}
+        for identity_query in _IDENTITY_QUERIES:
+            query = compile_read_query(identity_query, self.client_id)
+            async with self._slot(RequestPriority.READ, None):
+                body = await self._post_once(
+                    f"http://{self.host}/mux_http",
+                    query,
+                    True,
+                    timeout,
+                    connect_timeout,
+                )
+            values |= self._parse_xml_to_dict(body)
+        identity = SoftQLinkIdentity.from_values(values)
+        self._set_identity(identity)
+        return identity
+
+    def _set_identity(self, identity: SoftQLinkIdentity) -> None:
+        self.model = identity.model
+        self.sw_version = identity.sw_version
         if self.model:
             self.connected = True
 
-    async def _get_softener_type(self) -> str:
-        typecode = "D_F_4"
-        result = await self._execute_mux_query(props=[typecode], code="290")
-        type_value = result.get(typecode)
-        if isinstance(type_value, str):
-            match type_value:
-                case "1":
-                    return "softliQ:SC18"
-                case "2":
-                    return "softliQ:SC23"
-                case _:
-                    return "Unknown Device"
-        return ""
-
-    async def _get_software_version(self) -> str:
-        software_code = "D_Y_6"
-        result = await self._execute_mux_query(props=[software_code])
-        software_value = result.get(software_code)
-        if isinstance(software_value, str):
-            return software_value
-        return ""
-
-    async def get_error_memory_values(self) -> dict[str, SoftQLinkValue]:
-        """Get error-memory-related values from mux code 245."""
-        last_error_code = "D_K_10_1"
-        result = await self._execute_mux_query(
-            props=[
-                "D_K_3",
-                "D_K_2",
-                "D_K_5",
-                "D_K_8",
-                "D_K_9",
-                last_error_code,
-            ],
-            code="245",
-        )
-        self._split_error_code_and_age(result, last_error_code)
+    async def get_values(
+        self, props: Iterable[str], deadline: float | None = None
+    ) -> dict[str, SoftQLinkValue]:
+        """Get the given properties with one mux round trip per access code.
+
+        ``deadline`` is a ``time.monotonic()`` timestamp after which no
+        further attempt is started.
+        """
+        result: dict[str, SoftQLinkValue] = {}
+        for query in plan_read_queries(props):
+            result |= await self._execute_mux_query(
+                query.props, code=query.code, deadline=deadline
+            )
+        self._split_error_code_and_age(result, LAST_ERROR_CODE)
         return result
 
-    async def get_current_values(self) -> dict[str, SoftQLinkValue]:
-        """Get current values e.g D_A_?, D_Y_? and D_D_?."""
-        return await self._execute_mux_query(
-            props=[
-                "D_A_1_1",
-                "D_A_1_2",
-                "D_A_1_3",
-                "D_C_5_1",
-                "D_A_1_7",
-                "D_A_2_1",
-                "D_A_2_2",
-                "D_A_2_3",
-                "D_A_3_1",
-                "D_A_3_2",
-                "D_Y_1",
-                "D_Y_3",
-                "D_Y_5",
-                "D_Y_6",
-                "D_Y_10_1",
-                "D_D_1",
-                "D_B_1",
-            ]
-        )
-
     async def set_mode(self, mode: str) -> dict[str, SoftQLinkValue]:
         """Set the device mode."""
         return await self._execute_mux_query(
-            [],
-            edit_prop="D_C_5_1",
-            edit_value=mode,
-            edit_result = mode
+            [], edit_prop="D_C_5_1", edit_value=mode, edit_result=mode
         )
 
-    async def start_manual_regeneration(self) -> None:
+    async def start_manual_regeneration(self) -> dict[str, SoftQLinkValue]:
         """Trigger a manual regeneration cycle."""
-        await self._execute_mux_query(
-            ["D_B_1"],
-            edit_prop="D_B_1",
-            edit_value="1",
-            edit_result = "1"
+        return await self._execute_mux_query(
+            ["D_B_1"], edit_prop="D_B_1", edit_value="1", edit_result="1"
         )
 
-    async def reset_error_memory(self) -> None:
+    async def reset_error_memory(self) -> dict[str, SoftQLinkValue]:
         """Reset the error memory (Mux code 189)."""
-        await self._execute_mux_query(
+        return await self._execute_mux_query(
             ["D_M_3_3"],
-            code="189",
+            code=RESET_ERROR_MEMORY_CODE,
             edit_prop="D_M_3_3",
             edit_value="1",
-            edit_result = "0"
+            edit_result="0",
         )
-   
 
     async def _execute_mux_query(
         self,
-        props: list[str],
+        props: Sequence[str],
         code: str = "",
         edit_prop: str = "",
         edit_value: str = "",
-        edit_result: str = ""
+        edit_result: str = "",
+        deadline: float | None = None,
     ) -> dict[str, SoftQLinkValue]:
         """Execute a mux query and parse the XML response."""
-        query = self._generate_query(props, edit_prop, edit_value, code)
-        xml = await self._post_query(query, expect_xml=True)
+        if edit_prop:
+            template = compile_edit_template(
+                edit_prop, tuple(props), code, self.client_id
+            )
+            query = template.render(edit_value)
+        else:
+            query = compile_read_query(MuxReadQuery(code, tuple(props)), self.client_id)
+        xml = await self._post_query(
+            query,
+            expect_xml=True,
+            deadline=deadline,
+            priority=RequestPriority.EDIT if edit_prop else RequestPriority.READ,
+        )
         result = self._parse_xml_to_dict(xml)
         if edit_result:
             self._validate_expected_value(result, edit_prop, edit_result)
@@ -174,96 +293,216 @@ class SoftQLinkMuxClient:
 
     async def _post_query(
         self,
-        query: str,
+        query: bytes,
         *,
         expect_xml: bool,
-    ) -> str:
-        """POST a query to the device and return the raw body."""
-        async with self._lock:
-            url = f"http://{self.host}/mux_http"
-            max_retry = 5
-            for retry in range(1, max_retry + 1):
+        deadline: float | None = None,
+        priority: RequestPriority = RequestPriority.READ,
+    ) -> bytes:
+        """POST a query to the device and return the raw body.
+
+        Attempts are cut short, and retries skipped, so that the whole call
+        finishes by ``deadline``.
+        """
+        url = f"http://{self.host}/mux_http"
+        policy = self.retry_policy
+        breaker = self.circuit_breaker
+        if not breaker.allow_request():
+            self.metrics.circuit_rejections += 1
+            raise SoftQLinkCircuitOpenError(
+                f"SoftQLink {self.host} is failing, not sending requests"
+            )
+        # A half-open circuit only lets a single probe attempt through.
+        probing = breaker.state is CircuitState.HALF_OPEN
+        max_attempts = 1 if probing else policy.max_attempts
+        budget = self.retry_budget
+        if budget is not None:
+            budget.record_request()
+        started = time.monotonic()
+        attempt = 1
+        preemptions = 0
+        try:
+            while True:
                 try:
-                    async with self.session.post(
-                        url,
-                        timeout=self._timeout,
-                        data=query,
-                        headers={"Content-Type": "application/x-www-form-urlencoded"},
-                    ) as response:
-                        body = await response.text()
-                        if response.status != 200:
-                            raise SoftQLinkResponseError(
-                                f"Unexpected HTTP status {response.status}"
-                            )
-                        if expect_xml and not body:
-                            raise SoftQLinkResponseError(
-                                "Mux server returned an empty payload"
-                            )
-                        return body
-                except ServerDisconnectedError:
-                    last_error = SoftQLinkResponseError(
-                        "Device disconnected unexpectedly"
-                    )
-                except TimeoutError:
-                    last_error = SoftQLinkTimeoutError("Request to SoftQLink timed out")
-                except ClientError as err:
-                    last_error = SoftQLinkResponseError(str(err))
+                    async with self._slot(priority, deadline):
+                        body = await self._send(
+                            priority,
+                            url,
+                            query,
+                            expect_xml,
+                            self._attempt_timeout(policy.attempt_timeout, deadline),
+                        )
+                except RequestPreemptedError as err:
+                    # An edit took over the device; queue up again behind it.
+                    self.metrics.preemptions += 1
+                    preemptions += 1
+                    if preemptions > MAX_PREEMPTIONS:
+                        raise SoftQLinkPreemptedError(
+                            f"Edits kept preempting a read from {self.host}"
+                        ) from err
+                    continue
+                except SoftQLinkDeadlineError:
+                    # Running out of budget is not the device's fault.
+                    raise
                 except SoftQLinkClientError as err:
                     last_error = err
+                else:
+                    breaker.record_success()
+                    self.metrics.latency[priority.name.lower()].record(
+                        time.monotonic() - started
+                    )
+                    return body
                 _LOGGER.debug(
                     "Failed to execute '%s' on '%s' %s times: %s",
-                    query,
+                    query.decode("ascii", "replace"),
                     url,
-                    retry,
+                    attempt,
                     last_error,
                 )
-                if retry == max_retry:
-                    raise last_error
-            raise SoftQLinkResponseError("Mux server did not return a valid response")
+                if attempt == max_attempts:
+                    break
+                backoff = policy.backoff(attempt)
+                if deadline is not None and time.monotonic() + backoff >= deadline:
+                    self.metrics.deadline_exceeded += 1
+                    break
+                if budget is not None and not budget.try_spend():
+                    self.metrics.retries_denied += 1
+                    break
+                attempt += 1
+                self.metrics.retries += 1
+                # Back off without holding the device so other requests can run.
+                await asyncio.sleep(backoff)
+            self.metrics.failures += 1
+            breaker.record_failure()
+            raise last_error
+        finally:
+            # Only the probe may release it; requests sent before the circuit
+            # opened must not let a second probe through.
+            if probing:
+                breaker.release_probe()
+
+    @asynccontextmanager
+    async def _slot(
+        self, priority: RequestPriority, deadline: float | None
+    ) -> AsyncIterator[None]:
+        """Hold the device, waiting for it no longer than ``deadline``."""
+        try:
+            async with asyncio.timeout(_remaining(deadline)):
+                await self._scheduler.acquire(priority)
+        except TimeoutError as err:
+            self.metrics.deadline_exceeded += 1
+            raise SoftQLinkDeadlineError("Refresh deadline exceeded") from err
+        try:
+            yield
+        finally:
+            self._scheduler.release()
 
-    def _generate_query(
+    async def _send(
         self,
-        props: list[str],
-        edit_prop: str,
-        edit_value: str,
-        code: str,
-    ) -> str:
-        show_props = list(props)
-        if edit_prop and edit_prop not in show_props:
-            show_props.append(edit_prop)
-
-        clientId = f"id={self.client_id}"
-        show = f"&show={'|'.join(show_props)}"
-        edit = ""
-        if code:
-            code = f"&code={code}"
-        if edit_prop:
-            edit = f"&edit={edit_prop}>{edit_value}"
-        query = f"{clientId}{code}{edit}{show}~"
-        return query
-
-    def _calculate_total(self, flow: str) -> None:
-        if self.last_flow:
-            now = dt_util.utcnow()
-            elapsed_time = (now - self.last_update).total_seconds()
-            area = Decimal(flow) * Decimal(elapsed_time)
-            self.total_consumption += area / (60 * 60)
-        self.last_flow = flow
-        self.last_update = dt_util.utcnow()
-
-    def _parse_xml_to_dict(self, xml_data: str) -> dict[str, SoftQLinkValue]:
+        priority: RequestPriority,
+        url: str,
+        query: bytes,
+        expect_xml: bool,
+        timeout: float,
+    ) -> bytes:
+        """Send one attempt; reads can be abandoned for an incoming edit."""
+        attempt = self._post_once(url, query, expect_xml, timeout)
+        if priority is RequestPriority.EDIT:
+            return await attempt
+        return await self._scheduler.run_read(attempt)
+
+    def _attempt_timeout(self, timeout: float, deadline: float | None) -> float:
+        """Shorten an attempt timeout so the attempt ends by ``deadline``."""
+        remaining = _remaining(deadline)
+        if remaining is None:
+            return timeout
+        if remaining <= 0:
+            self.metrics.deadline_exceeded += 1
+            raise SoftQLinkDeadlineError("Refresh deadline exceeded")
+        return min(timeout, remaining)
+
+    async def _post_once(
+        self,
+        url: str,
+        query: bytes,
+        expect_xml: bool,
+        timeout: float,
+        connect_timeout: float | None = None,
+    ) -> bytes:
+        """Send a single attempt, mapping transport errors to client errors."""
+        self.metrics.requests += 1
+        self.metrics.bytes_sent += len(query)
+        started = time.monotonic()
         try:
-            root = defET.fromstring(xml_data)
-        except ParseError as err:
+            async with self.session.post(
+                url,
+                timeout=ClientTimeout(total=timeout, sock_connect=connect_timeout),
+                data=query,
+                headers=_CLOSE_HEADERS if self._force_close else _HEADERS,
+            ) as response:
+                if response.status != 200:
+                    raise SoftQLinkResponseError(
+                        f"Unexpected HTTP status {response.status}"
+                    )
+                body = await self._read_body(response)
+                self.metrics.round_trip.record(time.monotonic() - started)
+                self.metrics.bytes_received += len(body)
+                if expect_xml and not body:
+                    raise SoftQLinkResponseError("Mux server returned an empty payload")
+        except ServerDisconnectedError as err:
+            # The broken socket is discarded, so the next attempt runs on a
+            # fresh connection.
+            self._on_server_disconnect()
+            raise SoftQLinkResponseError("Device disconnected unexpectedly") from err
+        except TimeoutError as err:
+            self.metrics.timeouts += 1
+            raise SoftQLinkTimeoutError("Request to SoftQLink timed out") from err
+        except ClientError as err:
+            raise SoftQLinkResponseError(str(err)) from err
+        self._disconnects_in_a_row = 0
+        return body
+
+    def _on_server_disconnect(self) -> None:
+        """Stop reusing connections if the device keeps dropping them."""
+        self.metrics.server_disconnects += 1
+        self._disconnects_in_a_row += 1
+        if not self._force_close and self._disconnects_in_a_row >= DISCONNECT_LIMIT:
+            _LOGGER.debug(
+                "SoftQLink %s keeps dropping kept-alive connections, "
+                "using a fresh connection per request",
+                self.host,
+            )
+            self._force_close = True
+
+    async def _read_body(self, response: ClientResponse) -> bytes:
+        """Read the raw response body, enforcing the optional size cap."""
+        max_size = self.max_body_size
+        if max_size is None:
+            return await response.read()
+        content_length = response.content_length
+        if content_length is not None:
+            if content_length > max_size:
+                raise SoftQLinkResponseError(
+                    f"Mux response of {content_length} bytes exceeds {max_size}"
+                )
+            return await response.read()
+
+        chunks: list[bytes] = []
+        size = 0
+        async for chunk in response.content.iter_any():
+            size += len(chunk)
+            if size > max_size:
+                raise SoftQLinkResponseError(f"Mux response exceeds {max_size} bytes")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _parse_xml_to_dict(self, xml_data: bytes) -> dict[str, SoftQLinkValue]:
+        started = time.perf_counter()
+        try:
+            data_dict: dict[str, SoftQLinkValue] = dict(parse_mux_response(xml_data))
+        except (ParseError, DefusedXmlException) as err:
             raise SoftQLinkParseError("Mux server returned malformed XML") from err
-
-        data_dict: dict[str, SoftQLinkValue] = {}
-        for elem in root:
-            if elem.tag != "code":
-                data_dict[elem.tag] = (elem.text or "").strip()
-                if elem.tag == "D_A_1_1":
-                    self._calculate_total(str(data_dict[elem.tag]))
-        data_dict[TOTAL_CONSUMPTION] = round(self.total_consumption, 4)
+        self.metrics.parse_time.record(time.perf_counter() - started)
         return data_dict
 
     def _validate_expected_value(
@@ -284,9 +523,16 @@ class SoftQLinkMuxClient:
         data: dict[str, SoftQLinkValue],
         error_code_key: str,
     ) -> None:
-        """Split a combined error code like ``E4_12h`` into code and age fields."""
+        """Split a combined error code like ``E4_12h`` into code and age fields.
+
+        The age is None for a code without one, so a cleared error memory
+        does not keep the age of the error before.
+        """
         error_code = data.get(error_code_key)
-        if not isinstance(error_code, str) or "_" not in error_code:
+        if not isinstance(error_code, str):
+            return
+        if "_" not in error_code:
+            data[f"{error_code_key}_Hours"] = None
             return
 
         code_and_age = error_code.split("_", maxsplit=1)
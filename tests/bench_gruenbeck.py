@@ -0,0 +1,711 @@
+"""Benchmarks for the Gruenbeck SoftliQ integration.
+
+Run from the repository root with ``python -m tests.bench_gruenbeck``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from itertools import count
+from datetime import UTC, datetime
+from decimal import Decimal
+import statistics
+import time
+import timeit
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from aiohttp import ClientSession, web
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_HOST
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.gruenbeck_softliQ_SC.binary_sensor import (
+    BINARY_SENSOR_DESCRIPTIONS,
+)
+from custom_components.gruenbeck_softliQ_SC import async_setup_entry
+from custom_components.gruenbeck_softliQ_SC.const import (
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    CONF_MODEL,
+    CONF_SW_VERSION,
+    DOMAIN,
+)
+from custom_components.gruenbeck_softliQ_SC.consumption import ConsumptionIntegrator
+from custom_components.gruenbeck_softliQ_SC.coordinator import (
+    SoftQLinkDataUpdateCoordinator,
+)
+from custom_components.gruenbeck_softliQ_SC.discovery import SoftQLinkDiscovery
+from custom_components.gruenbeck_softliQ_SC.fleet import SoftQLinkFleet
+from custom_components.gruenbeck_softliQ_SC.history import FlowHistory
+from custom_components.gruenbeck_softliQ_SC.mux_parser import (
+    _parse_with_defusedxml,
+    parse_mux_response,
+)
+from custom_components.gruenbeck_softliQ_SC import snapshot as snapshot_module
+from custom_components.gruenbeck_softliQ_SC.query import (
+    CURRENT_VALUE_KEYS,
+    ERROR_MEMORY_CODE,
+    ERROR_MEMORY_KEYS,
+    MuxReadQuery,
+    compile_read_query,
+)
+from custom_components.gruenbeck_softliQ_SC.retry import SoftQLinkRetryPolicy
+from custom_components.gruenbeck_softliQ_SC.sensor import SENSOR_TYPES
+from custom_components.gruenbeck_softliQ_SC.snapshot import (
+    STRING_KEYS,
+    SoftQLinkSnapshot,
+)
+from custom_components.gruenbeck_softliQ_SC.softQLinkMuxClient import (
+    SoftQLinkClientError,
+    SoftQLinkMuxClient,
+)
+from tests.fake_softqlink import (
+    CONDITIONS,
+    DEFAULT_VALUES,
+    LAN,
+    FakeSoftQLinkDevice,
+    LinkConditions,
+)
+from tests.flow_traces import MORNING, REGENERATION
+
+REFRESHES = 200
+POLL_KEYS = CURRENT_VALUE_KEYS + ERROR_MEMORY_KEYS
+PARSES = 20000
+LOAD_REFRESHES = 50
+LOAD_CLIENTS = 8
+# Trace seconds replayed per second, so a load run covers the whole morning.
+LOAD_TIME_SCALE = 600
+FLEET_RUN_SECONDS = 20
+FLEET_BENCH_INTERVAL = 5
+FLEET_BENCH_OPTIONS = {
+    CONF_MIN_INTERVAL: FLEET_BENCH_INTERVAL,
+    CONF_MAX_INTERVAL: FLEET_BENCH_INTERVAL,
+}
+LAG_PROBE_INTERVAL = 0.01
+STARTUPS = 20
+# A /24 on the loopback network: a few SoftQLinks, hosts that never answer,
+# web servers that are no SoftQLink, and closed ports everywhere else.
+DISCOVERY_NETWORK = "127.0.1"
+DISCOVERY_SOFTQLINKS = 4
+DISCOVERY_SILENT = 16
+DISCOVERY_OTHER = 8
+
+
+async def _legacy_refresh(client: SoftQLinkMuxClient) -> None:
+    # The two hand-written requests every refresh sent before planning.
+    (await client._execute_mux_query(CURRENT_VALUE_KEYS)) | (
+        await client._execute_mux_query(ERROR_MEMORY_KEYS, code=ERROR_MEMORY_CODE)
+    )
+
+
+async def _planned_refresh(client: SoftQLinkMuxClient) -> None:
+    await client.get_values(POLL_KEYS)
+
+
+async def _measure_refresh(
+    name: str,
+    refresh: Callable[[SoftQLinkMuxClient], Awaitable[None]],
+) -> None:
+    device = FakeSoftQLinkDevice()
+    host = await device.start()
+    try:
+        async with ClientSession() as session:
+            client = SoftQLinkMuxClient(host, session)
+            start = time.perf_counter()
+            for _ in range(REFRESHES):
+                await refresh(client)
+            elapsed = time.perf_counter() - start
+    finally:
+        await device.stop()
+    print(
+        f"{name:<24} round trips/refresh={device.request_count / REFRESHES:.2f} "
+        f"wall/refresh={elapsed / REFRESHES * 1000:.3f} ms"
+    )
+
+
+async def bench_refresh_round_trips() -> None:
+    """Compare the legacy two-request refresh with the planned poll."""
+    await _measure_refresh("legacy refresh", _legacy_refresh)
+    await _measure_refresh("planned refresh", _planned_refresh)
+
+
+def _measure_parse(
+    name: str, parse: Callable[[bytes], dict[str, str]], xml: bytes
+) -> None:
+    seconds = min(timeit.repeat(lambda: parse(xml), number=PARSES, repeat=3))
+    tracemalloc.start()
+    parse(xml)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<24} parse={seconds / PARSES * 1e6:.2f} us peak alloc/parse={peak} B")
+
+
+def _full_response() -> bytes:
+    return "<data><code>ok</code>{}</data>".format(
+        "".join(f"<{key}>{value}</{key}>" for key, value in DEFAULT_VALUES.items())
+    ).encode()
+
+
+def bench_parse() -> None:
+    """Compare the flat-document fast path with the defusedxml DOM parse."""
+    xml = _full_response()
+    _measure_parse("defusedxml parse", _parse_with_defusedxml, xml)
+    _measure_parse("fast path parse", parse_mux_response, xml)
+
+
+class _LegacyTotal:
+    """The former in-parser integration with Decimal and wall-clock time."""
+
+    def __init__(self) -> None:
+        self.total = Decimal(0)
+        self.last_flow = ""
+        self.last_update = datetime.now(UTC)
+
+    def integrate(self, flow: str) -> Decimal:
+        if self.last_flow:
+            elapsed = (datetime.now(UTC) - self.last_update).total_seconds()
+            self.total += Decimal(flow) * Decimal(elapsed) / (60 * 60)
+        self.last_flow = flow
+        self.last_update = datetime.now(UTC)
+        return round(self.total, 4)
+
+    def process(self, xml: bytes) -> dict[str, object]:
+        data: dict[str, object] = dict(parse_mux_response(xml))
+        if "D_A_1_1" in data:
+            data["total_consumption"] = self.integrate(str(data["D_A_1_1"]))
+        return data
+
+
+def _integrate(integrator: ConsumptionIntegrator, flow: str) -> Decimal:
+    integrator.add_sample(flow, time.monotonic())
+    return integrator.total
+
+
+def _process_with_integrator(
+    integrator: ConsumptionIntegrator, xml: bytes
+) -> dict[str, object]:
+    data: dict[str, object] = dict(parse_mux_response(xml))
+    if (flow := data.get("D_A_1_1")) is not None:
+        integrator.add_sample(str(flow), time.monotonic())
+        data["total_consumption"] = integrator.total
+    return data
+
+
+def _measure_cpu(name: str, process: Callable[[], object]) -> None:
+    start = time.process_time()
+    for _ in range(PARSES):
+        process()
+    elapsed = time.process_time() - start
+    print(f"{name:<24} cpu/poll={elapsed / PARSES * 1e6:.2f} us")
+
+
+def bench_consumption() -> None:
+    """Compare the per-poll CPU cost of the Decimal and fixed-point totals."""
+    xml = _full_response()
+    legacy = _LegacyTotal()
+    integrator = ConsumptionIntegrator()
+    _measure_cpu("Decimal integration", lambda: legacy.integrate("0.62"))
+    _measure_cpu("fixed-point integration", lambda: _integrate(integrator, "0.62"))
+    _measure_cpu("Decimal in parser", lambda: legacy.process(xml))
+    _measure_cpu("fixed-point stage", lambda: _process_with_integrator(integrator, xml))
+
+
+def _retained(build: Callable[[], object]) -> int:
+    tracemalloc.start()
+    kept = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def _scan_hour(samples: list[tuple[float, float]], now: float) -> tuple[float, ...]:
+    """Aggregate the last hour from raw samples, as a history query would."""
+    flows = [flow for timestamp, flow in samples if timestamp > now - 3600]
+    volume = sum(
+        (previous[1] + current[1]) / 2 * (current[0] - previous[0]) / 3600
+        for previous, current in zip(samples, samples[1:])
+        if current[0] > now - 3600
+    )
+    return min(flows), max(flows), sum(flows) / len(flows), volume
+
+
+def bench_history() -> None:
+    """Compare reading the hourly rollup with aggregating the raw samples.
+
+    A day of flow samples, one every five seconds, is recorded first.
+    """
+    history = FlowHistory()
+    samples = []
+    total = 0.0
+    for timestamp in range(0, 86400, 5):
+        flow = 0.6 if timestamp % 600 < 60 else 0.0
+        total += flow * 5 / 3600
+        history.add_sample(flow, timestamp, total)
+        samples.append((float(timestamp), flow))
+    clock = count(86400, 5)
+    _measure_cpu(
+        "history add_sample", lambda: history.add_sample(0.6, next(clock), total)
+    )
+    _measure_cpu("hourly rollup read", lambda: history.current(3600))
+    _measure_cpu("hourly scan of samples", lambda: _scan_hour(samples, 86400))
+    size = _retained(FlowHistory)
+    print(f"{'history ring':<24} retained={size / 1024:.0f} KiB")
+
+
+def bench_snapshot() -> None:
+    """Compare the raw dict cache with the typed snapshot.
+
+    Each cycle polls the fast tier. With the dict cache, every numeric sensor
+    re-interprets its string on each update; the snapshot converts the polled
+    values once while merging them.
+    """
+    values = dict(parse_mux_response(_full_response()))
+    fast = {
+        key: values[key]
+        for key in ("D_A_1_1", "D_A_1_7", "D_A_2_1", "D_A_3_2", "D_Y_5", "D_B_1")
+    }
+    numeric_sensors = [
+        description.key
+        for description in SENSOR_TYPES
+        if description.key in values and description.key not in STRING_KEYS
+    ]
+    print(
+        f"{'dict cache':<24} retained={_retained(lambda: {} | values)} B "
+        f"conversions/cycle={len(numeric_sensors)}"
+    )
+
+    conversions = 0
+    to_number = snapshot_module.to_number
+
+    def counting_to_number(text: str) -> int | float | None:
+        nonlocal conversions
+        conversions += 1
+        return to_number(text)
+
+    full, _ = SoftQLinkSnapshot().merge(values)
+    snapshot_module.to_number = counting_to_number
+    try:
+        full.merge(fast)
+    finally:
+        snapshot_module.to_number = to_number
+    retained = _retained(lambda: SoftQLinkSnapshot().merge(values)[0])
+    print(f"{'snapshot':<24} retained={retained} B conversions/cycle={conversions}")
+
+    def dict_cycle() -> None:
+        cache = values | fast
+        for key in numeric_sensors:
+            float(cache[key])
+
+    _measure_cpu("dict cache cycle", dict_cycle)
+    _measure_cpu("snapshot cycle", lambda: full.merge(fast))
+
+
+async def _measure_body_handling(
+    name: str, session: ClientSession, url: str, read_text: bool
+) -> None:
+    query = compile_read_query(MuxReadQuery("245", tuple(DEFAULT_VALUES)))
+    start = time.perf_counter()
+    for _ in range(REFRESHES):
+        async with session.post(url, data=query) as response:
+            if read_text:
+                # The former path: decode to str, then re-encode while parsing.
+                parse_mux_response((await response.text()).encode())
+            else:
+                parse_mux_response(await response.read())
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} wall/poll={elapsed / REFRESHES * 1000:.3f} ms")
+
+
+async def bench_body_handling() -> None:
+    """Compare str decoding of the response body with raw bytes handling."""
+    device = FakeSoftQLinkDevice()
+    host = await device.start()
+    url = f"http://{host}/mux_http"
+    try:
+        async with ClientSession() as session:
+            await _measure_body_handling("text() body", session, url, True)
+            await _measure_body_handling("read() body", session, url, False)
+    finally:
+        await device.stop()
+
+
+class _NullStore:
+    """Stands in for the consumption store, which needs a running Home Assistant."""
+
+    async def async_load(self) -> None:
+        return None
+
+    def async_delay_save(self, data_func: Callable[[], Any], delay: float) -> None:
+        data_func()
+
+
+def _load_device(conditions: LinkConditions) -> FakeSoftQLinkDevice:
+    return FakeSoftQLinkDevice(
+        conditions=conditions,
+        flow_trace=MORNING,
+        regeneration_trace=REGENERATION,
+        time_scale=LOAD_TIME_SCALE,
+    )
+
+
+def _load_client(host: str) -> SoftQLinkMuxClient:
+    # Short timeouts keep dropped requests from dominating the run.
+    return SoftQLinkMuxClient(
+        host, retry_policy=SoftQLinkRetryPolicy(base_delay=0.05, attempt_timeout=0.5)
+    )
+
+
+def _load_coordinator(
+    client: SoftQLinkMuxClient,
+    entry_id: str = "bench-entry",
+    options: dict[str, Any] | None = None,
+    fleet: SoftQLinkFleet | None = None,
+    tasks: list[asyncio.Task[None]] | None = None,
+) -> SoftQLinkDataUpdateCoordinator:
+    """Build a coordinator whose scheduled refreshes run as ``tasks``."""
+    tasks = [] if tasks is None else tasks
+    entry: Any = SimpleNamespace(
+        entry_id=entry_id,
+        title="Bench",
+        data={CONF_HOST: client.host},
+        options=options or {},
+        state=ConfigEntryState.LOADED,
+        pref_disable_polling=False,
+        async_on_unload=lambda _: None,
+        async_create_background_task=lambda hass, target, name, **_: tasks.append(
+            hass.loop.create_task(target, name=name)
+        ),
+    )
+    hass: Any = SimpleNamespace(loop=asyncio.get_running_loop(), is_stopping=False)
+    store: Any = _NullStore()
+    coordinator = SoftQLinkDataUpdateCoordinator(
+        hass, entry, client, fleet=fleet, consumption_store=store
+    )
+    for description in (*SENSOR_TYPES, *BINARY_SENSOR_DESCRIPTIONS):
+        coordinator.async_add_poll_key(
+            description.mux_key or description.key, description.poll_tier
+        )
+    return coordinator
+
+
+async def _measure_load(
+    name: str, refresh: Callable[[], Awaitable[object]], client: SoftQLinkMuxClient
+) -> None:
+    latencies = []
+    failures = 0
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    for _ in range(LOAD_REFRESHES):
+        started = time.perf_counter()
+        try:
+            await refresh()
+        except (SoftQLinkClientError, UpdateFailed):
+            failures += 1
+        latencies.append(time.perf_counter() - started)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    p50, p95 = (q * 1000 for q in statistics.quantiles(latencies, n=20)[9::9])
+    print(
+        f"{name:<24} p50={p50:.1f} ms p95={p95:.1f} ms "
+        f"refreshes/s={LOAD_REFRESHES / elapsed:.1f} "
+        f"cpu/refresh={cpu / LOAD_REFRESHES * 1000:.3f} ms failed={failures} "
+        f"retries={client.metrics.retries}"
+    )
+
+
+async def _measure_throughput(conditions: LinkConditions) -> None:
+    device = _load_device(conditions)
+    host = await device.start()
+    clients = [_load_client(host) for _ in range(LOAD_CLIENTS)]
+
+    async def poll(client: SoftQLinkMuxClient) -> None:
+        for _ in range(LOAD_REFRESHES):
+            try:
+                await client.get_values(POLL_KEYS)
+            except SoftQLinkClientError:
+                pass
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(poll(client) for client in clients))
+        elapsed = time.perf_counter() - start
+    finally:
+        for client in clients:
+            await client.async_close()
+        await device.stop()
+    print(
+        f"{f'{LOAD_CLIENTS} clients':<24} "
+        f"refreshes/s={LOAD_CLIENTS * LOAD_REFRESHES / elapsed:.1f} "
+        f"requests/s={device.request_count / elapsed:.1f}"
+    )
+
+
+async def bench_load() -> None:
+    """Measure client and coordinator refreshes under various link conditions.
+
+    The fake device replays a morning of water use and a regeneration, so
+    the refreshes see changing values.
+    """
+    for name, conditions in CONDITIONS.items():
+        print(f"-- {name} link")
+        device = _load_device(conditions)
+        host = await device.start()
+        try:
+            client = _load_client(host)
+            await _measure_load(
+                "client refresh", lambda: client.get_values(POLL_KEYS), client
+            )
+            await client.async_close()
+            client = _load_client(host)
+            coordinator = _load_coordinator(client)
+            await _measure_load(
+                "coordinator refresh", coordinator._async_update_data, client
+            )
+            await client.async_close()
+        finally:
+            await device.stop()
+    print("-- lan link, concurrent")
+    await _measure_throughput(CONDITIONS["lan"])
+
+
+def _time_refreshes(
+    coordinator: SoftQLinkDataUpdateCoordinator, spans: list[tuple[float, float]]
+) -> None:
+    """Record when each refresh of ``coordinator`` starts and ends."""
+    update = coordinator._async_update_data
+
+    async def timed_update() -> SoftQLinkSnapshot:
+        started = time.perf_counter()
+        try:
+            return await update()
+        finally:
+            spans.append((started, time.perf_counter()))
+
+    coordinator._async_update_data = timed_update  # type: ignore[method-assign]
+
+
+def _peak_in_flight(spans: list[tuple[float, float]]) -> int:
+    events = sorted(
+        [(start, 1) for start, _ in spans] + [(end, -1) for _, end in spans]
+    )
+    in_flight = peak = 0
+    for _, step in events:
+        in_flight += step
+        peak = max(peak, in_flight)
+    return peak
+
+
+async def _probe_loop_lag(until: float, lags: list[float]) -> None:
+    loop = asyncio.get_running_loop()
+    while (started := loop.time()) < until:
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        lags.append(loop.time() - started - LAG_PROBE_INTERVAL)
+
+
+async def _measure_fleet(devices: int, shared: bool) -> None:
+    fakes = [_load_device(LAN) for _ in range(devices)]
+    hosts = [await device.start() for device in fakes]
+    fleet = SoftQLinkFleet() if shared else None
+    clients = [_load_client(host) for host in hosts]
+    tasks: list[asyncio.Task[None]] = []
+    spans: list[tuple[float, float]] = []
+    coordinators = []
+    remove_members = []
+    for index, client in enumerate(clients):
+        entry_id = f"bench-{index}"
+        if fleet is not None:
+            client.retry_budget = fleet.retry_budget
+        coordinator = _load_coordinator(
+            client, entry_id, FLEET_BENCH_OPTIONS, fleet, tasks
+        )
+        _time_refreshes(coordinator, spans)
+        coordinators.append(coordinator)
+        # Join the fleet once the coordinator exists, as the setup does.
+        if fleet is not None:
+            remove_members.append(fleet.async_add_member(entry_id))
+    lags: list[float] = []
+    # Home Assistant schedules the refreshes once an entity listens.
+    remove_listeners = [item.async_add_listener(lambda: None) for item in coordinators]
+    try:
+        await _probe_loop_lag(
+            asyncio.get_running_loop().time() + FLEET_RUN_SECONDS, lags
+        )
+    finally:
+        for remove_listener in remove_listeners:
+            remove_listener()
+        await asyncio.gather(*tasks)
+        for remove_member in remove_members:
+            remove_member()
+        for client in clients:
+            await client.async_close()
+        for device in fakes:
+            await device.stop()
+    latencies = [end - start for start, end in spans]
+    # All members start together; the fleet spreads them from the next round.
+    first = min(start for start, _ in spans)
+    later = [span for span in spans if span[0] >= first + FLEET_BENCH_INTERVAL]
+    lag_p99 = statistics.quantiles(lags, n=100)[98] * 1000
+    latency_p95 = statistics.quantiles(latencies, n=20)[18] * 1000
+    print(
+        f"{f'{devices} devices, ' + ('fleet' if shared else 'independent'):<24} "
+        f"loop lag p99={lag_p99:.1f} ms max={max(lags) * 1000:.1f} ms "
+        f"refresh p50={statistics.median(latencies) * 1000:.1f} ms "
+        f"p95={latency_p95:.1f} ms in flight max={_peak_in_flight(spans)} "
+        f"after the first round={_peak_in_flight(later)}"
+    )
+
+
+async def bench_fleet() -> None:
+    """Compare independently timed devices with a shared fleet.
+
+    Every device is polled each five seconds over a LAN link, for a while.
+    The refreshes are scheduled by the coordinator of Home Assistant, which
+    starts them on whole seconds plus a jitter of its own per device.
+    """
+    for devices in (1, 10, 100):
+        await _measure_fleet(devices, shared=False)
+        await _measure_fleet(devices, shared=True)
+
+
+def _setup_hass() -> Any:
+    def update_entry(entry: Any, data: dict[str, Any]) -> None:
+        entry.data = data
+
+    async def forward_entry_setups(*_: Any) -> None:
+        pass
+
+    return SimpleNamespace(
+        loop=asyncio.get_running_loop(),
+        data={},
+        config_entries=SimpleNamespace(
+            async_forward_entry_setups=forward_entry_setups,
+            async_update_entry=update_entry,
+        ),
+    )
+
+
+async def _measure_startup(
+    name: str, conditions: LinkConditions, cached: dict[str, str]
+) -> None:
+    device = _load_device(conditions)
+    host = await device.start()
+    timings = []
+    try:
+        for _ in range(STARTUPS):
+            hass = _setup_hass()
+            tasks: list[asyncio.Future[None]] = []
+            entry: Any = SimpleNamespace(
+                entry_id="bench-entry",
+                title="Bench",
+                data={CONF_HOST: host, **cached},
+                options={},
+                state=ConfigEntryState.SETUP_IN_PROGRESS,
+                pref_disable_polling=False,
+                async_on_unload=lambda _: None,
+                add_update_listener=lambda _: None,
+                async_create_background_task=lambda hass, target, name: tasks.append(
+                    asyncio.ensure_future(target)
+                ),
+            )
+            requests = device.request_count
+            started = time.perf_counter()
+            with patch(
+                "custom_components.gruenbeck_softliQ_SC.Store",
+                return_value=_NullStore(),
+            ):
+                await async_setup_entry(hass, entry)
+            timings.append(time.perf_counter() - started)
+            requests = device.request_count - requests
+            await asyncio.gather(*tasks)
+            await hass.data[DOMAIN][entry.entry_id].client.async_close()
+    finally:
+        await device.stop()
+    print(
+        f"{name:<24} setup p50={statistics.median(timings) * 1000:.1f} ms "
+        f"max={max(timings) * 1000:.1f} ms round trips before entities={requests}"
+    )
+
+
+async def bench_startup() -> None:
+    """Compare setting up an entry without and with a cached identity."""
+    cached = {CONF_MODEL: "softliQ:SC18", CONF_SW_VERSION: "V02.02.00"}
+    for name in ("lan", "wifi"):
+        await _measure_startup(f"{name}, cold cache", CONDITIONS[name], {})
+        await _measure_startup(f"{name}, warm cache", CONDITIONS[name], cached)
+
+
+async def _start_discovery_network() -> tuple[int, list[Any]]:
+    """Start the hosts of the discovery network, all on one port."""
+    devices = [_load_device(LAN)]
+    port = int((await devices[0].start(f"{DISCOVERY_NETWORK}.1")).split(":")[1])
+    silent = LinkConditions(drop_rate=1)
+    for index in range(2, DISCOVERY_SOFTQLINKS + DISCOVERY_SILENT + 1):
+        device = _load_device(LAN if index <= DISCOVERY_SOFTQLINKS else silent)
+        await device.start(f"{DISCOVERY_NETWORK}.{index}", port)
+        devices.append(device)
+    runners = []
+    for index in range(DISCOVERY_OTHER):
+        runner = web.AppRunner(web.Application())
+        await runner.setup()
+        address = f"{DISCOVERY_NETWORK}.{100 + index}"
+        await web.TCPSite(runner, address, port).start()
+        runners.append(runner)
+    return port, [*devices, *runners]
+
+
+async def _measure_discovery(
+    name: str, discovery: SoftQLinkDiscovery, addresses: list[str]
+) -> None:
+    probes = discovery.probes
+    started = time.perf_counter()
+    found = await discovery.async_scan(addresses)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:<24} scan={elapsed * 1000:.0f} ms found={len(found)} "
+        f"probes={discovery.probes - probes}"
+    )
+
+
+async def bench_discovery() -> None:
+    """Compare scanning a /24 at several concurrencies, then rescanning."""
+    port, hosts = await _start_discovery_network()
+    addresses = [f"{DISCOVERY_NETWORK}.{index}" for index in range(1, 255)]
+    try:
+        for concurrency in (8, 32, 128):
+            discovery = SoftQLinkDiscovery(concurrency=concurrency, port=port)
+            await _measure_discovery(
+                f"concurrency {concurrency}, cold", discovery, addresses
+            )
+        await _measure_discovery(
+            f"concurrency {concurrency}, rescan", discovery, addresses
+        )
+    finally:
+        for host in hosts:
+            if isinstance(host, web.AppRunner):
+                await host.cleanup()
+            else:
+                await host.stop()
+
+
+async def main() -> None:
+    """Run all benchmarks."""
+    await bench_refresh_round_trips()
+    bench_parse()
+    bench_consumption()
+    bench_snapshot()
+    bench_history()
+    await bench_body_handling()
+    await bench_load()
+    await bench_fleet()
+    await bench_startup()
+    await bench_discovery()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
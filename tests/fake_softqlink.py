@@ -0,0 +1,179 @@
+"""Local fake SoftQLink device serving the mux interface over HTTP."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import random
+import time
+
+from aiohttp import web
+
+from custom_components.gruenbeck_softliQ_SC.query import MUX_CODES
+from tests.flow_traces import FlowTrace, RegenerationTrace, flow_at, step_at
+
+DEFAULT_VALUES: dict[str, str] = {
+    "D_A_1_1": "0.00",
+    "D_A_1_2": "12.3",
+    "D_A_1_3": "87",
+    "D_A_1_7": "0.00",
+    "D_A_2_1": "0",
+    "D_A_2_2": "120",
+    "D_A_2_3": "45",
+    "D_A_3_1": "23",
+    "D_A_3_2": "0",
+    "D_B_1": "0",
+    "D_C_5_1": "0",
+    "D_D_1": "21.5",
+    "D_F_4": "1",
+    "D_K_2": "812.4",
+    "D_K_3": "1.22",
+    "D_K_5": "150",
+    "D_K_8": "1.9",
+    "D_K_9": "0.10",
+    "D_K_10_1": "E4_12h",
+    "D_M_3_3": "0",
+    "D_Y_1": "180",
+    "D_Y_3": "42",
+    "D_Y_5": "0",
+    "D_Y_6": "V02.02.00",
+    "D_Y_10_1": "87",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class LinkConditions:
+    """Network conditions between the client and the fake device.
+
+    Each response is delayed by ``latency`` give or take ``jitter`` seconds.
+    A dropped request is never answered; a disconnected one has its
+    connection closed without a response.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    drop_rate: float = 0.0
+    disconnect_rate: float = 0.0
+
+
+IDEAL = LinkConditions()
+LAN = LinkConditions(latency=0.005, jitter=0.002)
+WIFI = LinkConditions(latency=0.04, jitter=0.03, disconnect_rate=0.01)
+FLAKY = LinkConditions(latency=0.1, jitter=0.08, drop_rate=0.02, disconnect_rate=0.05)
+CONDITIONS: dict[str, LinkConditions] = {
+    "ideal": IDEAL,
+    "lan": LAN,
+    "wifi": WIFI,
+    "flaky": FLAKY,
+}
+
+
+def parse_mux_request(body: str) -> dict[str, str]:
+    """Split a raw ``id=..&code=..&show=a|b~`` request into its fields."""
+    fields: dict[str, str] = {}
+    for part in body.rstrip("~").split("&"):
+        name, _, value = part.partition("=")
+        fields[name] = value
+    return fields
+
+
+class FakeSoftQLinkDevice:
+    """A SoftQLink mux server listening on a local port."""
+
+    def __init__(
+        self,
+        values: dict[str, str] | None = None,
+        conditions: LinkConditions = IDEAL,
+        flow_trace: FlowTrace | None = None,
+        regeneration_trace: RegenerationTrace | None = None,
+        time_scale: float = 1.0,
+        seed: int = 0,
+    ) -> None:
+        """Initialize.
+
+        The traces are replayed from ``start``, ``time_scale`` trace seconds
+        per second.
+        """
+        self.values = dict(DEFAULT_VALUES if values is None else values)
+        self.conditions = conditions
+        self.flow_trace = flow_trace
+        self.regeneration_trace = regeneration_trace
+        self.time_scale = time_scale
+        self.request_count = 0
+        self.dropped = 0
+        self.disconnected = 0
+        self._random = random.Random(seed)
+        self._started_at = 0.0
+        self._stopped = asyncio.Event()
+        self._runner: web.AppRunner | None = None
+        self.host = ""
+
+    async def start(self, address: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the ``host:port`` to point a client at."""
+        app = web.Application()
+        app.router.add_post("/mux_http", self._handle_mux)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, address, port).start()
+        port = self._runner.addresses[0][1]
+        self.host = f"{address}:{port}"
+        self._started_at = time.monotonic()
+        self._stopped.clear()
+        return self.host
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        self._stopped.set()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _replay_traces(self) -> None:
+        """Set the traced values to where the traces are now."""
+        seconds = (time.monotonic() - self._started_at) * self.time_scale
+        if self.flow_trace is not None:
+            self.values["D_A_1_1"] = f"{flow_at(self.flow_trace, seconds):.2f}"
+        if self.regeneration_trace is not None:
+            step = step_at(self.regeneration_trace, seconds)
+            self.values["D_Y_5"] = step
+            self.values["D_B_1"] = "0" if step == "0" else "1"
+
+    async def _handle_mux(self, request: web.Request) -> web.StreamResponse:
+        self.request_count += 1
+        fields = parse_mux_request(await request.text())
+        conditions = self.conditions
+        if conditions.latency or conditions.jitter:
+            await asyncio.sleep(
+                max(
+                    0.0,
+                    conditions.latency
+                    + self._random.uniform(-conditions.jitter, conditions.jitter),
+                )
+            )
+        if self._random.random() < conditions.drop_rate:
+            self.dropped += 1
+            await self._stopped.wait()
+            raise web.HTTPServiceUnavailable
+        if self._random.random() < conditions.disconnect_rate:
+            self.disconnected += 1
+            if request.transport is not None:
+                request.transport.close()
+            raise web.HTTPServiceUnavailable
+        self._replay_traces()
+        code = fields.get("code", "")
+        if edit := fields.get("edit"):
+            prop, _, value = edit.partition(">")
+            self.values[prop] = value
+        props = [prop for prop in fields.get("show", "").split("|") if prop]
+        if code and any(MUX_CODES.get(prop, "") != code for prop in props):
+            # As documented, a code that does not fit is answered with nothing.
+            return web.Response(
+                text="<data><code>wrong</code></data>", content_type="text/xml"
+            )
+        elements = ["<data><code>ok</code>"]
+        for prop in props:
+            if (not code and prop in MUX_CODES) or prop not in self.values:
+                continue
+            elements.append(f"<{prop}>{self.values[prop]}</{prop}>")
+        elements.append("</data>")
+        return web.Response(text="".join(elements), content_type="text/xml")
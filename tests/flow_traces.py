@@ -0,0 +1,111 @@
+"""Synthetic traces for replay in tests and benchmarks.
+
+The traces are made up to resemble a household with a SoftliQ:SC18; they
+are no recordings of a device. Each flow trace is a list of ``(seconds, flow
+in m³/h)`` points; the flow changes linearly between points, so the exact
+consumption is known. A regeneration trace lists the ``(seconds, step)`` at
+which each step starts.
+"""
+
+from __future__ import annotations
+
+import random
+
+FlowTrace = list[tuple[float, float]]
+
+# A morning: a shower, a few taps and a dishwasher filling in pulses.
+MORNING: FlowTrace = [
+    (0, 0.0),
+    (120, 0.0),
+    (124, 0.62),
+    (600, 0.58),
+    (604, 0.0),
+    (900, 0.0),
+    (902, 0.35),
+    (930, 0.33),
+    (932, 0.0),
+    (1500, 0.0),
+    (1503, 0.9),
+    (1560, 0.88),
+    (1563, 0.0),
+    (1800, 0.0),
+    (1801, 0.45),
+    (1846, 0.45),
+    (1847, 0.0),
+    (1900, 0.0),
+    (1901, 0.45),
+    (1946, 0.45),
+    (1947, 0.0),
+    (2000, 0.0),
+    (2001, 0.45),
+    (2046, 0.45),
+    (2047, 0.0),
+    (3600, 0.0),
+]
+
+# Garden irrigation: a long, slowly varying flow.
+GARDEN: FlowTrace = [
+    (0, 0.0),
+    (60, 0.0),
+    (75, 1.2),
+    (1200, 1.1),
+    (2400, 1.25),
+    (2415, 0.0),
+    (2700, 0.0),
+]
+
+TRACES: dict[str, FlowTrace] = {"morning": MORNING, "garden": GARDEN}
+
+RegenerationTrace = list[tuple[float, str]]
+
+# A regeneration started at night: brine intake, brining, slow rinse, fast
+# rinse and refill, then back to service.
+REGENERATION: RegenerationTrace = [
+    (0, "0"),
+    (60, "1"),
+    (180, "2"),
+    (1380, "3"),
+    (1860, "4"),
+    (2040, "5"),
+    (2280, "0"),
+]
+
+
+def flow_at(trace: FlowTrace, seconds: float) -> float:
+    """Return the flow of ``trace`` at ``seconds``."""
+    for (start, start_flow), (end, end_flow) in zip(trace, trace[1:]):
+        if start <= seconds <= end:
+            share = (seconds - start) / (end - start) if end > start else 0
+            return start_flow + (end_flow - start_flow) * share
+    return trace[-1][1]
+
+
+def step_at(trace: RegenerationTrace, seconds: float) -> str:
+    """Return the regeneration step of ``trace`` at ``seconds``."""
+    step = trace[0][1]
+    for start, start_step in trace:
+        if start > seconds:
+            break
+        step = start_step
+    return step
+
+
+def exact_consumption(trace: FlowTrace) -> float:
+    """Return the consumption of ``trace`` in m³."""
+    return sum(
+        (start_flow + end_flow) / 2 * (end - start) / 3600
+        for (start, start_flow), (end, end_flow) in zip(trace, trace[1:])
+    )
+
+
+def sample(
+    trace: FlowTrace, interval: float, jitter: float = 0.0, seed: int = 0
+) -> list[tuple[float, float]]:
+    """Poll ``trace`` every ``interval`` seconds, give or take ``jitter``."""
+    rng = random.Random(seed)
+    samples = []
+    seconds = 0.0
+    while seconds <= trace[-1][0]:
+        samples.append((seconds, round(flow_at(trace, seconds), 3)))
+        seconds += interval + rng.uniform(-jitter, jitter)
+    return samples
@@ -3,36 +3,123 @@
 from __future__ import annotations
 
 import asyncio
+import math
+import time
 import unittest
+from datetime import timedelta
+from decimal import Decimal
+from ipaddress import IPv4Network
 from types import SimpleNamespace
 from typing import Any, cast
-from unittest.mock import AsyncMock, Mock
+from unittest.mock import AsyncMock, Mock, patch
+from xml.etree.ElementTree import ParseError
 
 from aiohttp import ClientSession, ServerDisconnectedError
-from homeassistant.config_entries import ConfigEntry
+from defusedxml import DefusedXmlException
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
 from homeassistant.const import CONF_HOST, CONF_NAME
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResultType
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.update_coordinator import UpdateFailed
+import voluptuous as vol
 
+from custom_components.gruenbeck_softliQ_SC import (
+    async_setup_entry,
+    async_unload_entry,
+)
 from custom_components.gruenbeck_softliQ_SC.button import (
     SoftQLinkButtonEntity,
     SoftQLinkButtonEntityDescription,
 )
-from custom_components.gruenbeck_softliQ_SC.config_flow import GruenBeckConfigFlow
+from custom_components.gruenbeck_softliQ_SC.config_flow import (
+    GruenBeckConfigFlow,
+)
+from custom_components.gruenbeck_softliQ_SC.const import (
+    CONF_MAX_ATTEMPTS,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    CONF_MODEL,
+    CONF_REQUEST_TIMEOUT,
+    CONF_SW_VERSION,
+    DATA_DISCOVERY,
+    DOMAIN,
+    HISTORY_DAY,
+    HISTORY_HOUR,
+    HISTORY_MINUTE,
+    HISTORY_RESOLUTIONS,
+    MAX_POLL_INTERVAL,
+    MAX_PREEMPTIONS,
+    TOTAL_CONSUMPTION,
+)
+from custom_components.gruenbeck_softliQ_SC.consumption import (
+    ConsumptionIntegrator,
+    parse_flow,
+)
 from custom_components.gruenbeck_softliQ_SC.coordinator import (
     SoftQLinkDataUpdateCoordinator,
 )
+from custom_components.gruenbeck_softliQ_SC.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.gruenbeck_softliQ_SC.discovery import SoftQLinkDiscovery
+from custom_components.gruenbeck_softliQ_SC.fleet import SoftQLinkFleet
+from custom_components.gruenbeck_softliQ_SC.history import FlowHistory, rollup_key
+from custom_components.gruenbeck_softliQ_SC.metrics import (
+    LatencyHistogram,
+    SoftQLinkMetrics,
+)
+from custom_components.gruenbeck_softliQ_SC.mux_parser import (
+    _parse_with_defusedxml,
+    parse_mux_response,
+)
+from custom_components.gruenbeck_softliQ_SC.query import (
+    CURRENT_VALUE_KEYS,
+    ERROR_MEMORY_KEYS,
+    MuxReadQuery,
+    compile_edit_template,
+    compile_read_query,
+    plan_read_queries,
+)
+from custom_components.gruenbeck_softliQ_SC.retry import (
+    CircuitState,
+    SoftQLinkCircuitBreaker,
+    SoftQLinkRetryBudget,
+    SoftQLinkRetryPolicy,
+)
+from custom_components.gruenbeck_softliQ_SC.scheduler import (
+    RequestPriority,
+    SoftQLinkRequestScheduler,
+)
 from custom_components.gruenbeck_softliQ_SC.select import (
     SELECT_DESCRIPTIONS,
     SoftQLinkSelectEntity,
 )
+from custom_components.gruenbeck_softliQ_SC.sensor import (
+    HISTORY_SENSOR_TYPES,
+    METRIC_SENSOR_TYPES,
+    SENSOR_TYPES,
+    SoftQLinkHistorySensor,
+    SoftQLinkMetricSensor,
+    SoftQLinkSensor,
+)
+from custom_components.gruenbeck_softliQ_SC.snapshot import SoftQLinkSnapshot
 from custom_components.gruenbeck_softliQ_SC.softQLinkMuxClient import (
+    SoftQLinkCircuitOpenError,
+    SoftQLinkClientError,
+    SoftQLinkDeadlineError,
+    SoftQLinkIdentity,
     SoftQLinkMuxClient,
     SoftQLinkParseError,
+    SoftQLinkPreemptedError,
     SoftQLinkResponseError,
+    SoftQLinkTimeoutError,
 )
+from tests.fake_softqlink import FakeSoftQLinkDevice, LinkConditions
+from tests.flow_traces import MORNING, REGENERATION, TRACES, exact_consumption, sample
+
+
+NO_BACKOFF = SoftQLinkRetryPolicy(base_delay=0)
 
 
 def make_hass() -> HomeAssistant:
@@ -40,13 +127,18 @@ def make_hass() -> HomeAssistant:
     return cast(HomeAssistant, SimpleNamespace(loop=asyncio.get_running_loop()))
 
 
-def make_config_entry(title: str, host: str) -> ConfigEntry[Any]:
+def make_config_entry(
+    title: str, host: str, options: dict[str, Any] | None = None
+) -> ConfigEntry[Any]:
     """Build a typed config-entry test double."""
     return cast(
         ConfigEntry[Any],
         SimpleNamespace(
+            entry_id=f"{title}-entry",
             title=title,
             data={CONF_HOST: host},
+            options=options or {},
+            pref_disable_polling=False,
             async_on_unload=lambda _: None,
         ),
     )
@@ -54,7 +146,15 @@ def make_config_entry(title: str, host: str) -> ConfigEntry[Any]:
 
 def make_client_double(**kwargs: Any) -> SoftQLinkMuxClient:
     """Build a typed client test double."""
-    return cast(SoftQLinkMuxClient, SimpleNamespace(**kwargs))
+    return cast(
+        SoftQLinkMuxClient,
+        SimpleNamespace(
+            **(
+                {"metrics": SoftQLinkMetrics(), "retry_policy": SoftQLinkRetryPolicy()}
+                | kwargs
+            )
+        ),
+    )
 
 
 def make_coordinator_double(**kwargs: Any) -> SoftQLinkDataUpdateCoordinator:
@@ -67,10 +167,11 @@ class MockResponse:
 
     def __init__(self, status: int, body: str) -> None:
         self.status = status
-        self._body = body
+        self._body = body.encode()
+        self.content_length = len(self._body)
 
-    async def text(self) -> str:
-        """Return the mocked response text."""
+    async def read(self) -> bytes:
+        """Return the mocked response body."""
         return self._body
 
     async def __aenter__(self) -> "MockResponse":
@@ -93,12 +194,12 @@ class SoftQLinkClientTests(unittest.IsolatedAsyncioTestCase):
 
         result = await client._execute_mux_query(["D_Y_6"])
 
-        self.assertEqual(result["D_Y_6"], "1.0")
+        self.assertEqual(result, {"D_Y_6": "1.0"})
 
     async def test_execute_mux_query_rejects_empty_payload(self) -> None:
         session = AsyncMock(spec=ClientSession)
         session.post.return_value = MockResponse(200, "")
-        client = SoftQLinkMuxClient("waterbox", session)
+        client = SoftQLinkMuxClient("waterbox", session, retry_policy=NO_BACKOFF)
 
         with self.assertRaises(SoftQLinkResponseError):
             await client._execute_mux_query(["D_Y_6"])
@@ -106,7 +207,7 @@ class SoftQLinkClientTests(unittest.IsolatedAsyncioTestCase):
     async def test_execute_mux_query_rejects_non_200_response(self) -> None:
         session = AsyncMock(spec=ClientSession)
         session.post.return_value = MockResponse(503, "error")
-        client = SoftQLinkMuxClient("waterbox", session)
+        client = SoftQLinkMuxClient("waterbox", session, retry_policy=NO_BACKOFF)
 
         with self.assertRaises(SoftQLinkResponseError):
             await client._execute_mux_query(["D_Y_6"])
@@ -135,22 +236,1157 @@ class SoftQLinkClientTests(unittest.IsolatedAsyncioTestCase):
                 edit_result="1",
             )
 
+    async def test_values_are_read_with_one_request_per_code(self) -> None:
+        session = AsyncMock(spec=ClientSession)
+        session.post.return_value = MockResponse(
+            200,
+            "<data><D_A_1_1>0.5</D_A_1_1><D_K_10_1>E4_12h</D_K_10_1></data>",
+        )
+        client = SoftQLinkMuxClient("waterbox", session)
+
+        result = await client.get_values(CURRENT_VALUE_KEYS + ERROR_MEMORY_KEYS)
+
+        self.assertEqual(session.post.call_count, 2)
+        free, coded = (call.kwargs["data"] for call in session.post.call_args_list)
+        self.assertNotIn(b"&code=", free)
+        self.assertIn(b"D_A_1_1|", free)
+        self.assertIn(b"&code=245&", coded)
+        self.assertIn(b"|D_K_10_1~", coded)
+        self.assertNotIn(b"D_A_1_1", coded)
+        self.assertEqual(result["D_K_10_1"], "E4")
+        self.assertEqual(result["D_K_10_1_Hours"], "12")
+
+    async def test_cleared_error_memory_clears_the_error_age(self) -> None:
+        session = AsyncMock(spec=ClientSession)
+        session.post.return_value = MockResponse(
+            200, "<data><D_K_10_1>E4_12h</D_K_10_1></data>"
+        )
+        client = SoftQLinkMuxClient("waterbox", session)
+        coordinator = SoftQLinkDataUpdateCoordinator(
+            make_hass(), make_config_entry("Softener", "waterbox"), client
+        )
+        coordinator.async_add_poll_key("D_K_10_1", "fast")
+        await coordinator._async_update_data()
+        self.assertEqual(coordinator.datacache["D_K_10_1_Hours"], 12)
+
+        session.post.return_value = MockResponse(
+            200, "<data><D_K_10_1>0</D_K_10_1></data>"
+        )
+        await coordinator._async_update_data()
+
+        self.assertEqual(coordinator.datacache["D_K_10_1"], "0")
+        self.assertIsNone(coordinator.datacache["D_K_10_1_Hours"])
+
+    async def test_execute_mux_query_rejects_oversized_body(self) -> None:
+        session = AsyncMock(spec=ClientSession)
+        session.post.return_value = MockResponse(200, "<root><D_Y_6>1.0</D_Y_6></root>")
+        client = SoftQLinkMuxClient(
+            "waterbox", session, max_body_size=16, retry_policy=NO_BACKOFF
+        )
+
+        with self.assertRaises(SoftQLinkResponseError):
+            await client._execute_mux_query(["D_Y_6"])
+
     async def test_manual_regeneration_rejects_disconnect(self) -> None:
         session = AsyncMock(spec=ClientSession)
         session.post.side_effect = ServerDisconnectedError()
-        client = SoftQLinkMuxClient("waterbox", session)
+        client = SoftQLinkMuxClient("waterbox", session, retry_policy=NO_BACKOFF)
 
         with self.assertRaises(SoftQLinkResponseError):
             await client.start_manual_regeneration()
 
 
+class SoftQLinkMetricsTests(unittest.IsolatedAsyncioTestCase):
+    """Tests covering the client metrics and where they are exposed."""
+
+    def test_histogram_only_describes_the_latest_samples(self) -> None:
+        histogram = LatencyHistogram(window=3)
+        for seconds in (5.0, 0.01, 0.02, 0.03):
+            histogram.record(seconds)
+
+        self.assertEqual(histogram.count, 3)
+        self.assertAlmostEqual(histogram.mean or 0, 0.02)
+        self.assertEqual(histogram.quantile(0.5), 0.025)
+        self.assertEqual(histogram.quantile(0.95), 0.05)
+        self.assertEqual(histogram.as_dict()["buckets"]["10.0"], 0)
+
+    async def test_requests_record_bytes_latency_and_parse_time(self) -> None:
+        body = "<data><D_Y_6>1.0</D_Y_6></data>"
+        session = AsyncMock(spec=ClientSession)
+        session.post.return_value = MockResponse(200, body)
+        client = SoftQLinkMuxClient("waterbox", session)
+
+        await client.get_values(["D_Y_6"])
+
+        metrics = client.metrics
+        self.assertEqual(metrics.bytes_sent, len(b"id=2444&show=D_Y_6~"))
+        self.assertEqual(metrics.bytes_received, len(body))
+        self.assertEqual(metrics.round_trip.count, 1)
+        self.assertEqual(metrics.parse_time.count, 1)
+        self.assertEqual(metrics.as_dict()["latency"]["read"]["count"], 1)
+
+    async def test_metrics_are_exposed_as_sensors_and_diagnostics(self) -> None:
+        get_values = AsyncMock(return_value={"D_A_1_1": "0.5"})
+        client = make_client_double(
+            get_values=get_values,
+            model="softliQ:SC18",
+            sw_version="1.0",
+            client_id=2444,
+            circuit_breaker=SoftQLinkCircuitBreaker(),
+            retry_policy=SoftQLinkRetryPolicy(),
+        )
+        entry = make_config_entry("Softener", "waterbox")
+        hass = make_hass()
+        coordinator = SoftQLinkDataUpdateCoordinator(hass, entry, client)
+        coordinator.data = await coordinator._async_update_data()
+        coordinator.async_add_poll_key("D_A_1_1", "fast")
+        client.metrics.bytes_received = 512
+        sensors = {
+            description.key: SoftQLinkMetricSensor(coordinator, description)
+            for description in METRIC_SENSOR_TYPES
+        }
+
+        self.assertEqual(sensors["bytes_received"].native_value, 512)
+        self.assertIsNone(sensors["request_latency"].native_value)
+        self.assertIsNotNone(sensors["integration_time"].native_value)
+        self.assertFalse(sensors["bytes_received"].entity_registry_enabled_default)
+
+        hass.data = {DOMAIN: {entry.entry_id: coordinator}}
+        diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+        self.assertNotIn("waterbox", str(diagnostics["entry"]))
+        self.assertEqual(diagnostics["connection"]["metrics"]["bytes_received"], 512)
+        self.assertEqual(diagnostics["polling"]["requests"], ["id=2444&show=D_A_1_1~"])
+        self.assertEqual(diagnostics["data"]["D_A_1_1"], 0.5)
+
+    async def test_metric_sensors_write_state_only_when_the_metric_changes(
+        self,
+    ) -> None:
+        client = make_client_double(
+            get_values=AsyncMock(return_value={"D_A_1_1": "0.5"}),
+            model="softliQ:SC18",
+            sw_version="1.0",
+        )
+        coordinator = SoftQLinkDataUpdateCoordinator(
+            make_hass(), make_config_entry("Softener", "waterbox"), client
+        )
+        coordinator.data = await coordinator._async_update_data()
+        description = next(
+            item for item in METRIC_SENSOR_TYPES if item.key == "bytes_sent"
+        )
+        sensor = SoftQLinkMetricSensor(coordinator, description)
+        sensor.async_write_ha_state = Mock()
+
+        for _ in range(3):
+            coordinator.data = await coordinator._async_update_data()
+            sensor._handle_coordinator_update()
+        sensor.async_write_ha_state.assert_called_once()
+
+        client.metrics.bytes_sent += 100
+        sensor._handle_coordinator_update()
+        self.assertEqual(sensor.async_write_ha_state.call_count, 2)
+
+
+class SoftQLinkRetryTests(unittest.IsolatedAsyncioTestCase):
+    """Tests covering retry backoff and the circuit breaker."""
+
+    def test_backoff_grows_exponentially_with_bounded_jitter(self) -> None:
+        policy = SoftQLinkRetryPolicy(base_delay=1, max_delay=4, jitter=0.5)
+
+        for attempt, full_delay in ((1, 1), (2, 2), (3, 4), (4, 4)):
+            delay = policy.backoff(attempt)
+            self.assertLessEqual(delay, full_delay)
+            self.assertGreaterEqual(delay, full_delay / 2)
+
+    def test_circuit_opens_and_lets_a_single_probe_through(self) -> None:
+        now = [0.0]
+        breaker = SoftQLinkCircuitBreaker(
+            failure_threshold=2, reset_timeout=30, clock=lambda: now[0]
+        )
+
+        breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+        self.assertFalse(breaker.allow_request())
+
+        now[0] = 30
+        self.assertEqual(breaker.state, CircuitState.HALF_OPEN)
+        self.assertTrue(breaker.allow_request())
+        self.assertFalse(breaker.allow_request())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+
+        now[0] = 60
+        self.assertTrue(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+        self.assertEqual(breaker.times_opened, 1)
+
+    async def test_abandoned_request_keeps_the_probe_of_another(self) -> None:
+        now = [0.0]
+        breaker = SoftQLinkCircuitBreaker(
+            failure_threshold=1, reset_timeout=30, clock=lambda: now[0]
+        )
+        sent = asyncio.Event()
+
+        class HangingResponse:
+            async def __aenter__(self) -> None:
+                sent.set()
+                await asyncio.Event().wait()
+
+            async def __aexit__(self, *_: Any) -> None:
+                return None
+
+        session = AsyncMock(spec=ClientSession)
+        session.post.return_value = HangingResponse()
+        client = SoftQLinkMuxClient("waterbox", session, circuit_breaker=breaker)
+        read = asyncio.ensure_future(client.get_values(["D_Y_6"]))
+        await sent.wait()
+
+        # The circuit opens and lets a probe through while the read hangs.
+        breaker.record_failure()
+        now[0] = 30
+        self.assertTrue(breaker.allow_request())
+        read.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await read
+
+        self.assertFalse(breaker.allow_request())
+
+    async def test_open_circuit_fails_fast_without_requests(self) -> None:
+        session = AsyncMock(spec=ClientSession)
+        session.post.return_value = MockResponse(503, "error")
+        client = SoftQLinkMuxClient(
+            "waterbox",
+            session,
+            retry_policy=SoftQLinkRetryPolicy(max_attempts=2, base_delay=0),
+            circuit_breaker=SoftQLinkCircuitBreaker(failure_threshold=1),
+        )
+
+        with self.assertRaises(SoftQLinkResponseError):
+            await client.get_values(["D_A_1_1"])
+        with self.assertRaises(SoftQLinkCircuitOpenError):
+            await client.get_values(["D_A_1_1"])
+
+        self.assertEqual(session.post.call_count, 2)
+        self.assertEqual(client.metrics.retries, 1)
+        self.assertEqual(client.metrics.failures, 1)
+        self.assertEqual(client.metrics.circuit_rejections, 1)
+
+    async def test_shared_retry_budget_stops_retry_storms(self) -> None:
+        session = AsyncMock(spec=ClientSession)
+        session.post.return_value = MockResponse(503, "error")
+        budget = SoftQLinkRetryBudget(ratio=0, reserve=2)
+        clients = [
+            SoftQLinkMuxClient(
+                host, session, retry_policy=NO_BACKOFF, retry_budget=budget
+            )
+            for host in ("waterbox", "garage")
+        ]
+
+        for client in clients:
+            with self.assertRaises(SoftQLinkResponseError):
+                await client.get_values(["D_A_1_1"])
+
+        self.assertEqual(session.post.call_count, 4)
+        self.assertEqual([client.metrics.retries for client in clients], [2, 0])
+        self.assertEqual([client.metrics.retries_denied for client in clients], [1, 1])
+        self.assertTrue(budget.exhausted)
+        budget.ratio = 0.5
+        budget.record_request()
+        budget.record_request()
+        self.assertFalse(budget.exhausted)
+
+
+class SoftQLinkFleetTests(unittest.IsolatedAsyncioTestCase):
+    """Tests covering the fleet shared by all entries."""
+
+    def test_members_take_turns_spread_over_the_interval(self) -> None:
+        fleet = SoftQLinkFleet()
+        self.assertEqual(fleet.stagger("solo", 5, 100.0), 5)
+        removers = [fleet.async_add_member(f"entry-{index}") for index in range(4)]
+
+        turns = sorted(
+            (100.0 + fleet.stagger(f"entry-{index}", 8, 100.0)) % 8
+            for index in range(4)
+        )
+
+        # Four members polling every 8 s are at least a second apart.
+        gaps = [b - a for a, b in zip(turns, turns[1:] + [turns[0] + 8])]
+        self.assertGreaterEqual(min(gaps), 1)
+        for index in range(4):
+            self.assertTrue(4 <= fleet.stagger(f"entry-{index}", 8, 100.0) <= 12)
+        # A member on its turn keeps its interval.
+        turn = 100.0 + fleet.stagger("entry-1", 8, 100.0)
+        self.assertAlmostEqual(fleet.stagger("entry-1", 8, turn), 8)
+        # Home Assistant starts the interval at the whole second, so the
+        # turns do too.
+        self.assertEqual(fleet.stagger("entry-1", 8, turn + 0.7), 8)
+        self.assertEqual(fleet.stagger("entry-2", 8, 100.3), 6)
+
+        removers[1]()
+        fleet.async_add_member("entry-new")
+        self.assertEqual(fleet._slots["entry-new"], 1)
+        self.assertEqual(len(fleet), 4)
+
+    async def test_refreshes_in_flight_are_capped(self) -> None:
+        fleet = SoftQLinkFleet(max_concurrency=2)
+        in_flight = peak = 0
+
+        async def refresh() -> None:
+            nonlocal in_flight, peak
+            async with fleet.slot():
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+
+        await asyncio.gather(*(refresh() for _ in range(5)))
+
+        self.assertEqual(peak, 2)
+        self.assertEqual(fleet.waits, 3)
+
+    async def test_coordinator_backs_off_while_fleet_is_congested(self) -> None:
+        fleet = SoftQLinkFleet(retry_budget=SoftQLinkRetryBudget(reserve=0))
+        client = make_client_double(get_values=AsyncMock(return_value={}))
+        entry = make_config_entry("Softener", "waterbox")
+        coordinator = SoftQLinkDataUpdateCoordinator(
+            make_hass(), entry, client, fleet=fleet
+        )
+        fleet.async_add_member(entry.entry_id)
+
+        await coordinator._async_update_data()
+
+        self.assertTrue(fleet.congested)
+        self.assertEqual(coordinator.poll_interval, 10)
+
+
+class SoftQLinkDeadlineTests(unittest.IsolatedAsyncioTestCase):
+    """Tests covering the per-refresh time budget."""
+
+    async def test_retries_stop_when_the_budget_is_spent(self) -> None:
+        session = AsyncMock(spec=ClientSession)
+        session.post.return_value = MockResponse(503, "error")
+        client = SoftQLinkMuxClient(
+            "waterbox",
+            session,
+            retry_policy=SoftQLinkRetryPolicy(base_delay=10, jitter=0),
+        )
+
+        with self.assertRaises(SoftQLinkResponseError):
+            await client.get_values(["D_Y_6"], deadline=time.monotonic() + 5)
+
+        session.post.assert_called_once()
+        self.assertLessEqual(session.post.call_args.kwargs["timeout"].total, 5)
+        self.assertEqual(client.metrics.deadline_exceeded, 1)
+
+    async def test_waiting_for_the_device_is_bounded_by_the_deadline(self) -> None:
+        session = AsyncMock(spec=ClientSession)
+        client = SoftQLinkMuxClient("waterbox", session)
+
+        await client._scheduler.acquire(RequestPriority.READ)
+        with self.assertRaises(SoftQLinkDeadlineError):
+            await client.get_values(["D_Y_6"], deadline=time.monotonic() + 0.01)
+        client._scheduler.release()
+
+        session.post.assert_not_called()
+        self.assertEqual(client.circuit_breaker.state, CircuitState.CLOSED)
+
+    async def test_coordinator_passes_its_budget_to_the_client(self) -> None:
+        get_values = AsyncMock(return_value={})
+        client = make_client_double(get_values=get_values)
+        entry = make_config_entry("Softener", "waterbox")
+        coordinator = SoftQLinkDataUpdateCoordinator(make_hass(), entry, client)
+
+        before = time.monotonic()
+        await coordinator._async_update_data()
+
+        deadline = get_values.await_args.kwargs["deadline"]
+        self.assertGreaterEqual(deadline, before + coordinator.refresh_timeout)
+
+
+class StalledResponse(MockResponse):
+    """Response whose body never arrives."""
+
+    async def read(self) -> bytes:
+        """Wait forever."""
+        await asyncio.Event().wait()
+        return b""
+
+
+class SoftQLinkRequestSchedulerTests(unittest.IsolatedAsyncioTestCase):
+    """Tests covering the edit priority lane."""
+
+    async def test_queued_edits_are_served_before_queued_reads(self) -> None:
+        scheduler = SoftQLinkRequestScheduler()
+        order: list[str] = []
+        await scheduler.acquire(RequestPriority.EDIT)
+
+        async def request(name: str, priority: RequestPriority) -> None:
+            await scheduler.acquire(priority)
+            order.append(name)
+            scheduler.release()
+
+        read = asyncio.create_task(request("read", RequestPriority.READ))
+        await asyncio.sleep(0)
+        edit = asyncio.create_task(request("edit", RequestPriority.EDIT))
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.gather(read, edit)
+
+        self.assertEqual(order, ["edit", "read"])
+        self.assertFalse(scheduler.busy)
+
+    async def test_edit_preempts_an_in_flight_read(self) -> None:
+        session = AsyncMock(spec=ClientSession)
+        session.post.side_effect = [
+            StalledResponse(200, ""),
+            MockResponse(200, "<data><D_C_5_1>2</D_C_5_1></data>"),
+            MockResponse(200, "<data><D_Y_6>1.0</D_Y_6></data>"),
+        ]
+        client = SoftQLinkMuxClient("waterbox", session)
+
+        read = asyncio.create_task(client.get_values(["D_Y_6"]))
+        await asyncio.sleep(0.01)
+        await asyncio.wait_for(client.set_mode("2"), 1)
+
+        self.assertEqual((await asyncio.wait_for(read, 1))["D_Y_6"], "1.0")
+        self.assertEqual(client.metrics.preemptions, 1)
+        self.assertEqual(client.metrics.retries, 0)
+        self.assertEqual(client.metrics.latency["edit"].count, 1)
+        self.assertEqual(client.metrics.latency["read"].count, 1)
+
+    async def test_read_gives_up_after_repeated_preemption(self) -> None:
+        def respond(url: str, **kwargs: Any) -> MockResponse:
+            if b"edit=" in kwargs["data"]:
+                return MockResponse(200, "<data><D_C_5_1>2</D_C_5_1></data>")
+            return StalledResponse(200, "")
+
+        session = AsyncMock(spec=ClientSession)
+        session.post.side_effect = respond
+        client = SoftQLinkMuxClient("waterbox", session)
+
+        read = asyncio.create_task(client.get_values(["D_Y_6"]))
+        for _ in range(MAX_PREEMPTIONS + 1):
+            await asyncio.sleep(0.01)
+            await asyncio.wait_for(client.set_mode("2"), 1)
+
+        with self.assertRaises(SoftQLinkPreemptedError):
+            await asyncio.wait_for(read, 1)
+        self.assertEqual(client.metrics.preemptions, MAX_PREEMPTIONS + 1)
+        self.assertEqual(client.metrics.failures, 0)
+        self.assertEqual(client.circuit_breaker.state, CircuitState.CLOSED)
+
+
+class SoftQLinkConnectionPoolTests(unittest.IsolatedAsyncioTestCase):
+    """Tests covering the per-device connection pool against a fake device."""
+
+    async def asyncSetUp(self) -> None:
+        self.device = FakeSoftQLinkDevice()
+        self.host = await self.device.start()
+
+    async def asyncTearDown(self) -> None:
+        await self.device.stop()
+
+    async def test_client_reuses_kept_alive_connection(self) -> None:
+        client = SoftQLinkMuxClient(self.host)
+        try:
+            await client.async_update_identity()
+            await client.get_values(CURRENT_VALUE_KEYS)
+            await client.get_values(CURRENT_VALUE_KEYS)
+        finally:
+            await client.async_close()
+
+        self.assertEqual(client.model, "softliQ:SC18")
+        self.assertEqual(client.sw_version, "V02.02.00")
+        # The identity takes two round trips, as D_F_4 needs an access code.
+        self.assertEqual(client.metrics.requests, 4)
+        self.assertEqual(client.metrics.connections_created, 1)
+        self.assertEqual(client.metrics.connections_reused, 3)
+
+    async def test_repeated_disconnects_stop_connection_reuse(self) -> None:
+        session = AsyncMock(spec=ClientSession)
+        session.post.side_effect = ServerDisconnectedError()
+        client = SoftQLinkMuxClient("waterbox", session, retry_policy=NO_BACKOFF)
+
+        with self.assertRaises(SoftQLinkResponseError):
+            await client.get_values(["D_A_1_1"])
+
+        self.assertEqual(client.metrics.server_disconnects, 5)
+        headers = session.post.call_args.kwargs["headers"]
+        self.assertEqual(headers["Connection"], "close")
+
+
+class SoftQLinkSetupTests(unittest.IsolatedAsyncioTestCase):
+    """Tests covering config-entry setup against a fake device."""
+
+    async def asyncSetUp(self) -> None:
+        self.device = FakeSoftQLinkDevice()
+        self.host = await self.device.start()
+        self.tasks: list[asyncio.Task[None]] = []
+        self.device_registry = Mock()
+        self.enterContext(
+            patch(
+                "custom_components.gruenbeck_softliQ_SC.dr.async_get",
+                return_value=self.device_registry,
+            )
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self.device.stop()
+
+    async def _setup(self, data: dict[str, Any]) -> Any:
+        def update_entry(entry: Any, data: dict[str, Any]) -> None:
+            entry.data = data
+
+        hass = cast(
+            HomeAssistant,
+            SimpleNamespace(
+                loop=asyncio.get_running_loop(),
+                data={},
+                config_entries=SimpleNamespace(
+                    async_forward_entry_setups=AsyncMock(),
+                    async_update_entry=Mock(side_effect=update_entry),
+                ),
+            ),
+        )
+        entry: Any = SimpleNamespace(
+            entry_id="setup-entry",
+            title="Softener",
+            data={CONF_HOST: self.host, **data},
+            options={},
+            state=ConfigEntryState.SETUP_IN_PROGRESS,
+            pref_disable_polling=False,
+            async_on_unload=Mock(),
+            add_update_listener=Mock(),
+            async_create_background_task=Mock(
+                side_effect=lambda hass, target, name: self.tasks.append(
+                    asyncio.ensure_future(target)
+                )
+            ),
+        )
+        # The consumption store needs a running Home Assistant.
+        store = Mock(async_load=AsyncMock(return_value=None))
+        with patch("custom_components.gruenbeck_softliQ_SC.Store", return_value=store):
+            self.assertTrue(await async_setup_entry(hass, entry))
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+        self.addAsyncCleanup(coordinator.client.async_close)
+        return entry
+
+    async def test_cold_setup_fetches_and_caches_the_identity(self) -> None:
+        entry = await self._setup({})
+
+        # Two round trips each for the identity and the first refresh.
+        self.assertEqual(self.device.request_count, 4)
+        self.assertEqual(entry.data[CONF_MODEL], "softliQ:SC18")
+        self.assertEqual(entry.data[CONF_SW_VERSION], "V02.02.00")
+        self.assertEqual(self.tasks, [])
+
+    async def test_warm_setup_refreshes_the_identity_in_the_background(self) -> None:
+        entry = await self._setup({CONF_MODEL: "softliQ:SC18", CONF_SW_VERSION: "V01"})
+
+        self.assertEqual(self.device.request_count, 2)
+        self.assertEqual(entry.data[CONF_SW_VERSION], "V01")
+
+        await asyncio.gather(*self.tasks)
+        self.assertEqual(self.device.request_count, 4)
+        self.assertEqual(entry.data[CONF_SW_VERSION], "V02.02.00")
+        self.device_registry.async_update_device.assert_called_once_with(
+            self.device_registry.async_get_device.return_value.id,
+            model="softliQ:SC18",
+            sw_version="V02.02.00",
+        )
+
+    async def test_warm_setup_keeps_an_unchanged_identity(self) -> None:
+        entry = await self._setup(
+            {CONF_MODEL: "softliQ:SC18", CONF_SW_VERSION: "V02.02.00"}
+        )
+
+        await asyncio.gather(*self.tasks)
+        self.assertEqual(self.device.request_count, 4)
+        self.assertEqual(entry.data[CONF_SW_VERSION], "V02.02.00")
+        self.device_registry.async_get_device.assert_not_called()
+
+
+class SoftQLinkProbeTests(unittest.IsolatedAsyncioTestCase):
+    """Tests covering the single-attempt identity probe."""
+
+    async def test_probe_identifies_device_without_retries(self) -> None:
+        device = FakeSoftQLinkDevice()
+        client = SoftQLinkMuxClient(await device.start())
+        try:
+            identity = await client.async_probe()
+        finally:
+            await client.async_close()
+            await device.stop()
+
+        self.assertEqual(identity, SoftQLinkIdentity("softliQ:SC18", "V02.02.00"))
+        # One request for the software version, one unlocking the model.
+        self.assertEqual(device.request_count, 2)
+        self.assertTrue(client.connected)
+
+    async def test_probe_fails_fast_without_retries(self) -> None:
+        device = FakeSoftQLinkDevice(conditions=LinkConditions(drop_rate=1))
+        client = SoftQLinkMuxClient(
+            await device.start(),
+            circuit_breaker=SoftQLinkCircuitBreaker(failure_threshold=1),
+        )
+        started = time.monotonic()
+        try:
+            with self.assertRaises(SoftQLinkTimeoutError):
+                await client.async_probe(timeout=0.05)
+        finally:
+            await client.async_close()
+            await device.stop()
+
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(device.request_count, 1)
+        self.assertEqual(client.circuit_breaker.state, CircuitState.CLOSED)
+
+    async def test_config_flow_caches_probed_identity(self) -> None:
+        device = FakeSoftQLinkDevice()
+        host = await device.start()
+        flow = GruenBeckConfigFlow()
+        flow.hass = cast(
+            HomeAssistant,
+            SimpleNamespace(config_entries=SimpleNamespace(async_entries=lambda _: [])),
+        )
+        # The unique id checks need the flow manager of a running Home Assistant.
+        set_unique_id = self.enterContext(
+            patch.object(flow, "async_set_unique_id", AsyncMock())
+        )
+        self.enterContext(patch.object(flow, "_abort_if_unique_id_configured"))
+        try:
+            result = await flow.async_step_manual(
+                {CONF_NAME: "Softener", CONF_HOST: host}
+            )
+        finally:
+            await device.stop()
+
+        set_unique_id.assert_awaited_once_with(host.lower())
+        self.assertEqual(result["type"], "create_entry")
+        self.assertEqual(result["data"][CONF_MODEL], "softliQ:SC18")
+        self.assertEqual(result["data"][CONF_SW_VERSION], "V02.02.00")
+        self.assertEqual(device.request_count, 2)
+
+        result = await flow.async_step_manual({CONF_NAME: "Softener", CONF_HOST: host})
+        self.assertEqual(result["errors"], {"base": "cannot_connect"})
+
+
+class SoftQLinkDiscoveryTests(unittest.IsolatedAsyncioTestCase):
+    """Tests covering the discovery of devices on the loopback network."""
+
+    async def asyncSetUp(self) -> None:
+        # Two SoftQLinks and a silent host share a port, as on a real network.
+        self.devices = [FakeSoftQLinkDevice()]
+        self.port = int((await self.devices[0].start("127.0.0.2")).split(":")[1])
+        for address, conditions in (
+            ("127.0.0.3", LinkConditions()),
+            ("127.0.0.4", LinkConditions(drop_rate=1)),
+        ):
+            device = FakeSoftQLinkDevice(conditions=conditions)
+            await device.start(address, self.port)
+            self.devices.append(device)
+
+    async def asyncTearDown(self) -> None:
+        for device in self.devices:
+            await device.stop()
+
+    async def test_scan_finds_devices_and_skips_known_misses(self) -> None:
+        now = [0.0]
+        discovery = SoftQLinkDiscovery(
+            timeout=0.2, negative_ttl=60, port=self.port, clock=lambda: now[0]
+        )
+        addresses = [f"127.0.0.{index}" for index in range(2, 6)]
+
+        found = await discovery.async_scan(addresses)
+
+        self.assertEqual(
+            sorted(device.host for device in found),
+            [f"127.0.0.2:{self.port}", f"127.0.0.3:{self.port}"],
+        )
+        self.assertEqual(found[0].identity.model, "softliQ:SC18")
+        self.assertEqual(discovery.probes, 4)
+
+        await discovery.async_scan(addresses)
+        self.assertEqual(discovery.probes, 6)
+
+        now[0] = 61
+        await discovery.async_scan(addresses)
+        self.assertEqual(discovery.probes, 10)
+
+    async def test_config_flow_offers_discovered_devices(self) -> None:
+        flow = GruenBeckConfigFlow()
+        flow.hass = cast(
+            HomeAssistant,
+            SimpleNamespace(
+                data={
+                    DOMAIN: {
+                        DATA_DISCOVERY: SoftQLinkDiscovery(timeout=0.2, port=self.port)
+                    }
+                },
+                config_entries=SimpleNamespace(
+                    async_entries=lambda domain: (
+                        [make_config_entry("Garage", f"127.0.0.3:{self.port}")]
+                        if domain == DOMAIN
+                        else []
+                    )
+                ),
+                async_create_task=asyncio.ensure_future,
+            ),
+        )
+        # The unique id checks need the flow manager of a running Home Assistant.
+        set_unique_id = self.enterContext(
+            patch.object(flow, "async_set_unique_id", AsyncMock())
+        )
+        self.enterContext(patch.object(flow, "_abort_if_unique_id_configured"))
+
+        result = await flow.async_step_user()
+        self.assertEqual(result["menu_options"], ["discovery", "manual"])
+
+        with patch(
+            "custom_components.gruenbeck_softliQ_SC.config_flow.async_get_scan_networks",
+            AsyncMock(return_value=[IPv4Network("127.0.0.0/29")]),
+        ):
+            # The scan runs in a task while the flow shows its progress.
+            result = await flow.async_step_discovery()
+            self.assertEqual(result["type"], FlowResultType.SHOW_PROGRESS)
+            await result["progress_task"]
+        result = await flow.async_step_discovery()
+        self.assertEqual(result["type"], FlowResultType.SHOW_PROGRESS_DONE)
+        self.assertEqual(result["step_id"], "pick_device")
+
+        result = await flow.async_step_pick_device()
+        host = f"127.0.0.2:{self.port}"
+        # The configured device is not offered again.
+        self.assertEqual(list(flow._discovered), [host])
+        self.assertEqual(result["step_id"], "pick_device")
+
+        result = await flow.async_step_pick_device(
+            {CONF_HOST: host, CONF_NAME: "Cellar"}
+        )
+        set_unique_id.assert_awaited_once_with(host)
+        self.assertEqual(result["type"], "create_entry")
+        self.assertEqual(result["data"][CONF_HOST], host)
+        self.assertEqual(result["data"][CONF_MODEL], "softliQ:SC18")
+
+
+class SoftQLinkFakeDeviceTests(unittest.IsolatedAsyncioTestCase):
+    """Tests covering the link conditions and traces of the fake device."""
+
+    async def _poll(self, device: FakeSoftQLinkDevice) -> SoftQLinkMuxClient:
+        host = await device.start()
+        client = SoftQLinkMuxClient(
+            host,
+            retry_policy=SoftQLinkRetryPolicy(
+                max_attempts=2, base_delay=0, attempt_timeout=0.05
+            ),
+        )
+        try:
+            with self.assertRaises(SoftQLinkClientError):
+                await client.get_values(["D_A_1_1"])
+        finally:
+            await client.async_close()
+            await device.stop()
+        return client
+
+    async def test_dropped_requests_time_out(self) -> None:
+        device = FakeSoftQLinkDevice(conditions=LinkConditions(drop_rate=1))
+
+        client = await self._poll(device)
+
+        self.assertEqual(device.dropped, 2)
+        self.assertEqual(client.metrics.timeouts, 2)
+
+    async def test_disconnected_requests_are_retried(self) -> None:
+        device = FakeSoftQLinkDevice(conditions=LinkConditions(disconnect_rate=1))
+
+        client = await self._poll(device)
+
+        self.assertEqual(device.disconnected, 2)
+        self.assertEqual(client.metrics.server_disconnects, 2)
+
+    async def test_traces_are_replayed(self) -> None:
+        device = FakeSoftQLinkDevice(
+            flow_trace=MORNING, regeneration_trace=REGENERATION, time_scale=1000
+        )
+        host = await device.start()
+        client = SoftQLinkMuxClient(host)
+        try:
+            # 0.3 s replays five minutes: water flows, brine is drawn in.
+            await asyncio.sleep(0.3)
+            values = await client.get_values(CURRENT_VALUE_KEYS)
+        finally:
+            await client.async_close()
+            await device.stop()
+
+        self.assertGreater(float(values["D_A_1_1"]), 0.5)
+        self.assertEqual((values["D_B_1"], values["D_Y_5"]), ("1", "2"))
+
+
+class SoftQLinkQueryPlanTests(unittest.TestCase):
+    """Tests covering mux query planning."""
+
+    def test_props_are_grouped_by_code(self) -> None:
+        queries = plan_read_queries(["D_A_1_1", "D_K_3", "D_Y_6", "D_K_3", "D_K_2"])
+
+        self.assertEqual(
+            queries,
+            [
+                MuxReadQuery("", ("D_A_1_1", "D_Y_6")),
+                MuxReadQuery("245", ("D_K_3", "D_K_2")),
+            ],
+        )
+
+    def test_different_codes_are_split(self) -> None:
+        queries = plan_read_queries(["D_F_4", "D_K_3"])
+
+        self.assertEqual(
+            queries, [MuxReadQuery("290", ("D_F_4",)), MuxReadQuery("245", ("D_K_3",))]
+        )
+
+    def test_code_free_props_need_no_code(self) -> None:
+        self.assertEqual(plan_read_queries(["D_Y_6"]), [MuxReadQuery("", ("D_Y_6",))])
+        self.assertEqual(plan_read_queries([]), [])
+
+
+class SoftQLinkQueryCompileTests(unittest.TestCase):
+    """Tests covering the pre-encoded request bodies."""
+
+    def test_read_queries_are_compiled_once_per_poll_group(self) -> None:
+        query = MuxReadQuery("245", ("D_A_1_1", "D_K_3"))
+
+        body = compile_read_query(query)
+
+        self.assertEqual(body, b"id=2444&code=245&show=D_A_1_1|D_K_3~")
+        self.assertIs(compile_read_query(MuxReadQuery("245", query.props)), body)
+        self.assertEqual(
+            compile_read_query(MuxReadQuery("", ("D_Y_6",))), b"id=2444&show=D_Y_6~"
+        )
+
+    def test_edit_template_shows_the_edited_property(self) -> None:
+        template = compile_edit_template("D_M_3_3", ("D_M_3_3",), "189")
+
+        self.assertEqual(
+            template.render("1"), b"id=2444&code=189&edit=D_M_3_3>1&show=D_M_3_3~"
+        )
+        self.assertEqual(
+            compile_edit_template("D_C_5_1").render("2"),
+            b"id=2444&edit=D_C_5_1>2&show=D_C_5_1~",
+        )
+
+
+class SoftQLinkMuxParserTests(unittest.TestCase):
+    """Tests covering mux response parsing."""
+
+    def test_fast_path_matches_defusedxml(self) -> None:
+        xml = (
+            b'<?xml version="1.0"?>\n<data><code>ok</code>'
+            b"<D_A_1_1> 0.50 </D_A_1_1>\n<D_Y_5>0</D_Y_5><D_Y_6></D_Y_6></data>"
+        )
+
+        self.assertEqual(parse_mux_response(xml), _parse_with_defusedxml(xml))
+        self.assertEqual(
+            parse_mux_response(xml), {"D_A_1_1": "0.50", "D_Y_5": "0", "D_Y_6": ""}
+        )
+
+    def test_unexpected_documents_fall_back_to_defusedxml(self) -> None:
+        self.assertEqual(
+            parse_mux_response(b"<data><D_Y_6>a &amp; b</D_Y_6><D_Y_5/></data>"),
+            {"D_Y_6": "a & b", "D_Y_5": ""},
+        )
+        self.assertEqual(
+            parse_mux_response("<data><D_Y_6>\u00e4</D_Y_6></data>".encode()),
+            {"D_Y_6": "\u00e4"},
+        )
+        with self.assertRaises(ParseError):
+            parse_mux_response(b"<data><D_Y_6>1</D_Y_5></data>")
+        with self.assertRaises(DefusedXmlException):
+            parse_mux_response(
+                b'<!DOCTYPE data [<!ENTITY x "y">]><data><D_Y_6>&x;</D_Y_6></data>'
+            )
+
+
+class SoftQLinkConsumptionTests(unittest.IsolatedAsyncioTestCase):
+    """Tests covering the total consumption integrator."""
+
+    def test_replayed_traces_match_the_exact_consumption(self) -> None:
+        for name, trace in TRACES.items():
+            for seed in range(5):
+                with self.subTest(trace=name, seed=seed):
+                    integrator = ConsumptionIntegrator()
+                    for seconds, flow in sample(trace, 5, jitter=1, seed=seed):
+                        integrator.add_sample(str(flow), seconds)
+
+                    self.assertAlmostEqual(
+                        float(integrator.total),
+                        exact_consumption(trace),
+                        delta=exact_consumption(trace) * 0.01,
+                    )
+
+    def test_outages_are_not_integrated(self) -> None:
+        integrator = ConsumptionIntegrator(max_gap=120)
+        integrator.add_sample("1.2", 0)
+        integrator.add_sample("1.2", 3600)
+
+        self.assertEqual(integrator.total, 0)
+        self.assertEqual(integrator.gaps, 1)
+
+        integrator.add_sample("0.6", 3660)
+        self.assertEqual(integrator.total, Decimal("0.0150"))
+        integrator.add_sample("-", 3665)
+        integrator.add_sample("0.6", 3670)
+        self.assertEqual(integrator.total, Decimal("0.0167"))
+
+    def test_restore_never_goes_backwards(self) -> None:
+        integrator = ConsumptionIntegrator(total=Decimal("2"))
+
+        integrator.restore({"total": "1.5"})
+        self.assertEqual(integrator.total, Decimal("2"))
+        integrator.restore({"total": "broken"})
+        self.assertEqual(integrator.total, Decimal("2"))
+        integrator.restore({"total": "12.25"})
+        self.assertEqual(integrator.total, Decimal("12.25"))
+
+    async def test_coordinator_restores_and_saves_the_total(self) -> None:
+        session = AsyncMock(spec=ClientSession)
+        session.post.return_value = MockResponse(
+            200, "<data><D_A_1_1>0.6</D_A_1_1></data>"
+        )
+        client = SoftQLinkMuxClient("waterbox", session)
+        entry = make_config_entry("Softener", "waterbox")
+        store = Mock(
+            async_load=AsyncMock(return_value={"total": "12.5"}),
+            async_save=AsyncMock(),
+        )
+        hass = make_hass()
+        coordinator = SoftQLinkDataUpdateCoordinator(
+            hass, entry, client, consumption_store=store
+        )
+
+        await coordinator.async_restore_consumption()
+        data = await coordinator._async_update_data()
+
+        self.assertEqual(data[TOTAL_CONSUMPTION], Decimal("12.5000"))
+        store.async_delay_save.assert_called_once()
+        save = store.async_delay_save.call_args.args[0]
+        self.assertEqual(save(), {"total": "12.5"})
+
+        # Unloading saves right away, so a reload restores the latest total.
+        hass.data = {DOMAIN: {entry.entry_id: coordinator}}
+        hass.config_entries = Mock(async_unload_platforms=AsyncMock(return_value=True))
+        self.assertTrue(await async_unload_entry(hass, entry))
+        store.async_save.assert_awaited_once_with({"total": "12.5"})
+
+
+class SoftQLinkFlowHistoryTests(unittest.IsolatedAsyncioTestCase):
+    """Tests covering the flow history and its rollups."""
+
+    def test_rollups_follow_the_periods(self) -> None:
+        history = FlowHistory()
+        for timestamp, flow, total in (
+            (0, 0.6, 0.0),
+            (30, 0.6, 0.005),
+            (60, 1.2, 0.0125),
+            (90, 0.0, 0.0175),
+        ):
+            history.add_sample(flow, timestamp, total)
+
+        minute = history.current(60)
+        assert minute is not None
+        self.assertEqual((minute.start, minute.samples), (60, 2))
+        self.assertEqual((minute.minimum, minute.maximum, minute.mean), (0, 1.2, 0.6))
+        self.assertAlmostEqual(minute.volume, 0.0125)
+        previous = history.previous(60)
+        assert previous is not None
+        self.assertAlmostEqual(previous.volume, 0.005)
+        hour = history.current(3600)
+        assert hour is not None
+        self.assertEqual((hour.samples, hour.maximum), (4, 1.2))
+        self.assertAlmostEqual(hour.volume, 0.0175)
+
+        # A sample after an outage starts a new hour without adding volume.
+        history.add_sample(0.6, 3690, 0.0175)
+        self.assertEqual(history.current(3600).volume, 0)  # type: ignore[union-attr]
+        self.assertAlmostEqual(history.previous(3600).volume, 0.0175)  # type: ignore[union-attr]
+
+    def test_ring_keeps_the_latest_samples(self) -> None:
+        history = FlowHistory(capacity=3)
+        for timestamp in range(5):
+            history.add_sample(float(timestamp), timestamp, total=timestamp / 10)
+
+        self.assertEqual(len(history), 3)
+        self.assertEqual(
+            [sample[:3] for sample in history.samples()],
+            [(2, 2, 0.2), (3, 3, 0.3), (4, 4, 0.4)],
+        )
+        self.assertTrue(all(math.isnan(sample[3]) for sample in history.samples()))
+
+    def test_idle_samples_only_change_the_rollups_with_a_new_period(self) -> None:
+        history = FlowHistory()
+        history.add_sample(0.0, 0, 1.5)
+        revisions = dict(history.revisions)
+
+        history.add_sample(0.0, 20, 1.5)
+        history.add_sample(0.0, 40, 1.5)
+        self.assertEqual(history.revisions, revisions)
+        # A new minute leaves the hour and the day alone.
+        history.add_sample(0.0, 60, 1.5)
+        self.assertEqual(
+            history.revisions,
+            revisions | {HISTORY_MINUTE: revisions[HISTORY_MINUTE] + 1},
+        )
+
+    def test_volumes_add_up_to_the_total_consumption(self) -> None:
+        integrator = ConsumptionIntegrator(Decimal("100"))
+        history = FlowHistory()
+        for seconds in range(0, 2 * 86400, 7):
+            flow = "0.63" if seconds % 3600 < 300 else "0"
+            integrator.add_sample(flow, seconds)
+            history.add_sample(float(flow), seconds, float(integrator.total))
+
+        today = history.current(HISTORY_DAY)
+        yesterday = history.previous(HISTORY_DAY)
+        assert today is not None and yesterday is not None
+        self.assertEqual(
+            Decimal(str(round(yesterday.volume + today.volume, 4))),
+            integrator.total - 100,
+        )
+
+    async def test_coordinator_feeds_sensors_and_diagnostics(self) -> None:
+        get_values = AsyncMock(return_value={"D_A_1_1": "0.5", "D_K_2": "120"})
+        client = make_client_double(
+            get_values=get_values,
+            model="softliQ:SC18",
+            sw_version="1.0",
+            client_id=2444,
+            circuit_breaker=SoftQLinkCircuitBreaker(),
+        )
+        entry = make_config_entry("Softener", "waterbox")
+        hass = make_hass()
+        coordinator = SoftQLinkDataUpdateCoordinator(hass, entry, client)
+        sensors = {
+            description.key: SoftQLinkHistorySensor(coordinator, description)
+            for description in HISTORY_SENSOR_TYPES
+        }
+        self.assertIsNone(sensors["peak_flow_hour"].native_value)
+
+        coordinator.data = await coordinator._async_update_data()
+        get_values.return_value = {"D_A_1_1": "0.7"}
+        coordinator.data = await coordinator._async_update_data()
+        # The new peak changes the rollups of every resolution.
+        self.assertEqual(
+            coordinator.changed_keys,
+            {"D_A_1_1"}
+            | {rollup_key(resolution) for resolution in HISTORY_RESOLUTIONS},
+        )
+
+        self.assertEqual(len(coordinator.history), 2)
+        self.assertEqual(next(coordinator.history.samples())[3], 120)
+        self.assertEqual(sensors["peak_flow_hour"].native_value, 0.7)
+        self.assertEqual(sensors["mean_flow_hour"].native_value, 0.6)
+        self.assertGreaterEqual(sensors["consumption_today"].native_value, 0)  # type: ignore[operator]
+
+        hass.data = {DOMAIN: {entry.entry_id: coordinator}}
+        diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+        self.assertEqual(diagnostics["history"]["samples"], 2)
+        self.assertEqual(diagnostics["history"]["rollups"][3600]["current"]["max"], 0.7)
+
+    async def test_history_sensor_writes_state_only_when_the_history_changed(
+        self,
+    ) -> None:
+        client = make_client_double(model="softliQ:SC18", sw_version="1.0")
+        coordinator = SoftQLinkDataUpdateCoordinator(
+            make_hass(), make_config_entry("Softener", "waterbox"), client
+        )
+        sensor = SoftQLinkHistorySensor(coordinator, HISTORY_SENSOR_TYPES[0])
+        sensor.async_write_ha_state = Mock()
+        # The first update reports the availability.
+        sensor._handle_coordinator_update()
+        sensor.async_write_ha_state.reset_mock()
+
+        coordinator.changed_keys = frozenset()
+        sensor._handle_coordinator_update()
+        coordinator.changed_keys = frozenset({"D_A_1_1"})
+        sensor._handle_coordinator_update()
+        sensor.async_write_ha_state.assert_not_called()
+
+        # The hour sensor ignores a new minute.
+        coordinator.changed_keys = frozenset({rollup_key(HISTORY_MINUTE)})
+        sensor._handle_coordinator_update()
+        sensor.async_write_ha_state.assert_not_called()
+
+        coordinator.history.add_sample(0.6, 0, 1.0)
+        coordinator.history.add_sample(0.6, 60, 1.01)
+        coordinator.changed_keys = frozenset({rollup_key(HISTORY_HOUR)})
+        sensor._handle_coordinator_update()
+        sensor.async_write_ha_state.assert_called_once()
+
+        # A rollup change that leaves the reported value alone is not written.
+        coordinator.history.add_sample(0.5, 90, 1.01)
+        sensor._handle_coordinator_update()
+        sensor.async_write_ha_state.assert_called_once()
+
+
+class SoftQLinkFlowParseTests(unittest.TestCase):
+    """Tests covering the fixed-point flow parser."""
+
+    def test_parse_flow(self) -> None:
+        self.assertEqual(parse_flow("0.62"), 620_000)
+        self.assertEqual(parse_flow(" 1.2345678 "), 1_234_567)
+        self.assertEqual(parse_flow("3"), 3_000_000)
+        self.assertEqual(parse_flow(".5"), 500_000)
+        for text in ("", "-", ".", "-0.5", "1e3", "٣"):
+            with self.subTest(text=text):
+                self.assertIsNone(parse_flow(text))
+
+
+class SoftQLinkSnapshotTests(unittest.TestCase):
+    """Tests covering the typed coordinator snapshot."""
+
+    def test_merge_converts_measurements_once(self) -> None:
+        snapshot, changed = SoftQLinkSnapshot().merge(
+            {
+                "D_A_1_1": "0.62",
+                "D_A_2_2": "12",
+                "D_A_3_1": "-",
+                "D_C_5_1": "2",
+                "D_K_10_1": "E4",
+                "D_X_9": "raw",
+            }
+        )
+
+        self.assertEqual(snapshot["D_A_1_1"], 0.62)
+        self.assertIsInstance(snapshot["D_A_2_2"], int)
+        self.assertIn("D_A_3_1", snapshot)
+        self.assertIsNone(snapshot["D_A_3_1"])
+        self.assertEqual(snapshot["D_C_5_1"], "2")
+        self.assertEqual(snapshot["D_K_10_1"], "E4")
+        self.assertEqual(snapshot.get("D_X_9"), "raw")
+        self.assertNotIn("D_Y_6", snapshot)
+        self.assertEqual(snapshot.get("D_Y_6", "-"), "-")
+        self.assertEqual(len(snapshot), 6)
+        self.assertEqual(changed, set(snapshot))
+
+    def test_merge_reports_changed_keys_and_keeps_the_previous_snapshot(
+        self,
+    ) -> None:
+        first, _ = SoftQLinkSnapshot().merge({"D_A_1_1": "0.5", "D_X_9": "a"})
+
+        second, changed = first.merge({"D_A_1_1": "0.50", "D_X_9": "b"})
+
+        self.assertEqual(changed, {"D_X_9"})
+        self.assertEqual(first.as_dict(), {"D_A_1_1": 0.5, "D_X_9": "a"})
+        self.assertEqual(second.as_dict(), {"D_A_1_1": 0.5, "D_X_9": "b"})
+
+
 class SoftQLinkCoordinatorTests(unittest.IsolatedAsyncioTestCase):
     """Tests covering coordinator behavior."""
 
     async def test_coordinator_wraps_client_errors(self) -> None:
         client = make_client_double(
-            get_current_values=AsyncMock(side_effect=SoftQLinkResponseError("bad")),
-            get_error_memory_values=AsyncMock(),
+            get_values=AsyncMock(side_effect=SoftQLinkResponseError("bad")),
         )
         entry = make_config_entry("Softener", "waterbox")
         hass = make_hass()
@@ -159,11 +1395,165 @@ class SoftQLinkCoordinatorTests(unittest.IsolatedAsyncioTestCase):
         with self.assertRaises(UpdateFailed):
             await coordinator._async_update_data()
 
-    async def test_set_active_button_action_updates_state_and_notifies(self) -> None:
-        client = make_client_double(
-            get_current_values=AsyncMock(return_value={}),
-            get_error_memory_values=AsyncMock(return_value={}),
+    async def test_coordinator_adapts_interval_to_activity_and_latency(self) -> None:
+        values = {"D_A_1_1": "0", "D_B_1": "0", "D_Y_5": "0"}
+        get_values = AsyncMock(side_effect=lambda *_, **__: dict(values))
+        client = make_client_double(get_values=get_values)
+        entry = make_config_entry(
+            "Softener", "waterbox", {CONF_MIN_INTERVAL: 4, CONF_MAX_INTERVAL: 20}
+        )
+        coordinator = SoftQLinkDataUpdateCoordinator(make_hass(), entry, client)
+
+        intervals = []
+        for _ in range(5):
+            await coordinator._async_update_data()
+            intervals.append(coordinator.update_interval.total_seconds())
+        # Idle: back off towards the upper bound.
+        self.assertEqual(intervals, [6, 9, 13.5, 20, 20])
+
+        values["D_A_1_1"] = "0.62"
+        await coordinator._async_update_data()
+        self.assertTrue(coordinator.device_active)
+        self.assertEqual(coordinator.update_interval.total_seconds(), 4)
+
+        values.update({"D_A_1_1": "0", "D_Y_5": "2"})
+        await coordinator._async_update_data()
+        self.assertEqual(coordinator.update_interval.total_seconds(), 4)
+
+        # A timeout during the refresh backs off even while active.
+        async def timed_out(*_: Any, **__: Any) -> dict[str, str]:
+            client.metrics.timeouts += 1
+            return dict(values)
+
+        get_values.side_effect = timed_out
+        await coordinator._async_update_data()
+        self.assertEqual(coordinator.update_interval.total_seconds(), 8)
+
+        get_values.side_effect = SoftQLinkResponseError("bad")
+        with self.assertRaises(UpdateFailed):
+            await coordinator._async_update_data()
+        self.assertEqual(coordinator.update_interval.total_seconds(), 16)
+
+    async def test_coordinator_applies_options_live(self) -> None:
+        client = make_client_double(retry_policy=NO_BACKOFF)
+        entry = make_config_entry("Softener", "waterbox", {CONF_MAX_ATTEMPTS: 2})
+        coordinator = SoftQLinkDataUpdateCoordinator(make_hass(), entry, client)
+        self.assertEqual(client.retry_policy.max_attempts, 2)
+
+        coordinator.update_interval = timedelta(seconds=40)
+        coordinator.async_apply_options(
+            {
+                CONF_MIN_INTERVAL: 10,
+                CONF_MAX_INTERVAL: 30,
+                CONF_REQUEST_TIMEOUT: 2.5,
+                CONF_MAX_ATTEMPTS: 3,
+                "slow_interval": 300,
+            }
+        )
+
+        self.assertEqual(coordinator.update_interval, timedelta(seconds=10))
+        self.assertEqual((coordinator.min_interval, coordinator.max_interval), (10, 30))
+        self.assertEqual(coordinator.tier_intervals["slow"], 300)
+        self.assertEqual(coordinator.tier_intervals["static"], 3600)
+        self.assertEqual(client.retry_policy.attempt_timeout, 2.5)
+        self.assertEqual(client.retry_policy.max_attempts, 3)
+        # Settings that are no options are kept.
+        self.assertEqual(client.retry_policy.base_delay, 0)
+
+        # Intervals saved before they were capped are capped on load.
+        coordinator.async_apply_options({CONF_MAX_INTERVAL: 120})
+        self.assertEqual(coordinator.max_interval, MAX_POLL_INTERVAL)
+
+    async def test_unchanged_options_keep_the_adapted_interval(self) -> None:
+        client = make_client_double(retry_policy=NO_BACKOFF)
+        entry = make_config_entry("Softener", "waterbox", {CONF_MIN_INTERVAL: 10})
+        coordinator = SoftQLinkDataUpdateCoordinator(make_hass(), entry, client)
+        coordinator.poll_interval = 40
+        coordinator.update_interval = timedelta(seconds=40)
+
+        # Updating the entry data, as the identity refresh does, fires the
+        # update listener with the same options.
+        coordinator.async_apply_options(dict(entry.options))
+
+        self.assertEqual(coordinator.poll_interval, 40)
+        self.assertEqual(coordinator.update_interval, timedelta(seconds=40))
+
+    async def test_coordinator_polls_only_due_tiers(self) -> None:
+        get_values = AsyncMock(
+            return_value={"D_A_1_1": "0.5", "D_K_3": "1.2", "D_Y_6": "2.0"}
         )
+        client = make_client_double(get_values=get_values)
+        entry = make_config_entry("Softener", "waterbox")
+        hass = make_hass()
+        coordinator = SoftQLinkDataUpdateCoordinator(
+            hass, entry, client, tier_intervals={"slow": 600}
+        )
+
+        keys, tiers = coordinator._due_poll_keys(100.0)
+        self.assertIn("D_K_10_1", keys)
+        self.assertEqual(tiers, ["fast", "normal", "slow", "static"])
+
+        await coordinator._async_update_data()
+        polled_at = coordinator._tier_polled_at["slow"]
+        coordinator.async_add_poll_key("D_A_1_1", "fast")
+        coordinator.async_add_poll_key("D_K_3", "slow")
+        coordinator.async_add_poll_key("D_Y_6", "static")
+        coordinator.async_add_poll_key("D_Y_6", "slow")
+
+        self.assertEqual(
+            coordinator._due_poll_keys(polled_at + 61),
+            (["D_A_1_1"], ["fast", "normal"]),
+        )
+        self.assertEqual(
+            coordinator._due_poll_keys(polled_at + 601)[0],
+            ["D_A_1_1", "D_K_3", "D_Y_6"],
+        )
+        self.assertEqual(coordinator.datacache["D_A_1_1"], 0.5)
+
+    async def test_coordinator_applies_edit_echo_without_polling(self) -> None:
+        get_values = AsyncMock(return_value={"D_C_5_1": "0", "D_K_3": "1.2"})
+        client = make_client_double(get_values=get_values)
+        entry = make_config_entry("Softener", "waterbox")
+        coordinator = SoftQLinkDataUpdateCoordinator(make_hass(), entry, client)
+        await coordinator._async_update_data()
+        coordinator.async_add_poll_key("D_K_3", "slow")
+        listener = Mock()
+        coordinator.async_add_listener(listener)
+
+        coordinator.async_apply_values({"D_C_5_1": "2"}, ["D_K_3", "D_K_2"])
+
+        self.assertEqual(coordinator.data.as_dict(), {"D_C_5_1": "2", "D_K_3": 1.2})
+        listener.assert_called_once()
+        get_values.assert_awaited_once()
+        # The invalidated error memory is fetched again with the next poll.
+        polled_at = coordinator._tier_polled_at["slow"]
+        self.assertEqual(coordinator._due_poll_keys(polled_at + 1)[0], ["D_K_3"])
+
+    async def test_coordinator_polls_only_keys_of_added_entities(self) -> None:
+        get_values = AsyncMock(return_value={"D_A_1_1": "0.5"})
+        client = make_client_double(get_values=get_values)
+        entry = make_config_entry("Softener", "waterbox")
+        coordinator = SoftQLinkDataUpdateCoordinator(make_hass(), entry, client)
+        await coordinator._async_update_data()
+
+        remove_flow = coordinator.async_add_poll_key("D_A_1_1", "fast")
+        remove_salt = coordinator.async_add_poll_key("D_Y_3", "slow")
+        await coordinator._async_update_data()
+
+        # A key enabled after the first refresh is fetched once right away.
+        self.assertEqual(get_values.await_args.args[0], ["D_A_1_1", "D_Y_3"])
+
+        await coordinator._async_update_data()
+        self.assertEqual(get_values.await_args.args[0], ["D_A_1_1"])
+
+        remove_salt()
+        remove_flow()
+        self.assertEqual(coordinator.poll_tiers, {})
+        await coordinator._async_update_data()
+        self.assertEqual(get_values.await_args.args[0], [])
+
+    async def test_set_active_button_action_updates_state_and_notifies(self) -> None:
+        client = make_client_double(get_values=AsyncMock(return_value={}))
         entry = make_config_entry("Softener", "waterbox")
         hass = make_hass()
         coordinator = SoftQLinkDataUpdateCoordinator(hass, entry, client)
@@ -232,13 +1622,162 @@ class SoftQLinkConfigFlowTests(unittest.IsolatedAsyncioTestCase):
             FlowResultType.SHOW_PROGRESS_DONE,
         )
 
+    async def test_options_flow_validates_interval_bounds(self) -> None:
+        entry = make_config_entry("Softener", "waterbox", {CONF_MIN_INTERVAL: 5})
+        # Built the way Home Assistant builds options flows.
+        flow = GruenBeckConfigFlow.async_get_options_flow(entry)
+        flow.hass = cast(
+            HomeAssistant,
+            SimpleNamespace(
+                config_entries=SimpleNamespace(
+                    async_get_known_entry=lambda entry_id: entry
+                )
+            ),
+        )
+        flow.handler = entry.entry_id
+
+        result = await flow.async_step_init()
+        self.assertEqual(result["step_id"], "init")
+        self.assertEqual(
+            result["data_schema"]({}),
+            {
+                CONF_MIN_INTERVAL: 5,
+                CONF_MAX_INTERVAL: 60,
+                CONF_REQUEST_TIMEOUT: 5,
+                CONF_MAX_ATTEMPTS: 5,
+                "normal_interval": 60,
+                "slow_interval": 900,
+                "static_interval": 3600,
+            },
+        )
+
+        result = await flow.async_step_init(
+            {CONF_MIN_INTERVAL: 30, CONF_MAX_INTERVAL: 10}
+        )
+        self.assertEqual(result["errors"], {"base": "invalid_interval_bounds"})
+        # Polling any slower would lose consumption to the integration gap.
+        with self.assertRaises(vol.Invalid):
+            result["data_schema"]({CONF_MAX_INTERVAL: MAX_POLL_INTERVAL + 1})
+
+        result = await flow.async_step_init(
+            {CONF_MIN_INTERVAL: 10, CONF_MAX_INTERVAL: 30}
+        )
+        self.assertEqual(result["type"], "create_entry")
+        self.assertEqual(result["data"], {CONF_MIN_INTERVAL: 10, CONF_MAX_INTERVAL: 30})
+
 
 class SoftQLinkEntityTests(unittest.IsolatedAsyncioTestCase):
     """Tests covering entity state updates and identifiers."""
 
-    async def test_select_refreshes_and_tracks_option(self) -> None:
-        set_mode = AsyncMock()
+    async def test_sensor_writes_state_only_when_its_value_changes(self) -> None:
+        get_values = AsyncMock(return_value={"D_A_1_1": "0.5", "D_A_1_2": "2.0"})
+        client = make_client_double(
+            get_values=get_values, model="softliQ:SC18", sw_version="1.0"
+        )
+        entry = make_config_entry("Softener", "waterbox")
+        coordinator = SoftQLinkDataUpdateCoordinator(make_hass(), entry, client)
+        coordinator.data = await coordinator._async_update_data()
+        sensor = SoftQLinkSensor(coordinator, SENSOR_TYPES[0])
+        write_state = Mock()
+        sensor.async_write_ha_state = write_state
+        sensor._handle_coordinator_update()
+        self.assertEqual(write_state.call_count, 1)
+
+        get_values.return_value = {"D_A_1_1": "0.5", "D_A_1_2": "1.9"}
+        coordinator.data = await coordinator._async_update_data()
+        sensor._handle_coordinator_update()
+
+        self.assertEqual(coordinator.changed_keys, {"D_A_1_2"})
+        self.assertEqual(write_state.call_count, 1)
+        self.assertEqual(coordinator.skipped_state_writes, 1)
+
+        get_values.return_value = {"D_A_1_1": "0.7"}
+        coordinator.data = await coordinator._async_update_data()
+        sensor._handle_coordinator_update()
+
+        self.assertEqual(write_state.call_count, 2)
+        self.assertEqual(sensor.native_value, 0.7)
+        self.assertEqual(coordinator.skipped_state_writes, 0)
+
+        # Losing the connection is written even though no value changed.
+        get_values.side_effect = SoftQLinkResponseError("bad")
+        with self.assertRaises(UpdateFailed):
+            await coordinator._async_update_data()
+        coordinator.last_update_success = False
+        sensor._handle_coordinator_update()
+
+        self.assertEqual(write_state.call_count, 3)
+
+    async def test_sensor_holds_back_changes_within_its_deadband(self) -> None:
+        get_values = AsyncMock(return_value={"D_A_1_1": "0.50"})
+        client = make_client_double(
+            get_values=get_values, model="softliQ:SC18", sw_version="1.0"
+        )
+        entry = make_config_entry("Softener", "waterbox")
+        coordinator = SoftQLinkDataUpdateCoordinator(make_hass(), entry, client)
+        coordinator.data = await coordinator._async_update_data()
+        sensor = SoftQLinkSensor(coordinator, SENSOR_TYPES[0])
+        sensor.async_write_ha_state = Mock()
+        sensor._handle_coordinator_update()
+
+        async def poll(flow: str) -> object:
+            get_values.return_value = {"D_A_1_1": flow}
+            coordinator.data = await coordinator._async_update_data()
+            sensor._handle_coordinator_update()
+            return sensor.native_value
+
+        self.assertEqual(await poll("0.51"), 0.5)
+        self.assertEqual(coordinator.skipped_state_writes, 1)
+        self.assertEqual(await poll("0.60"), 0.6)
+        self.assertEqual(await poll("0.00"), 0)
+        self.assertEqual(await poll("0.01"), 0.01)
+        self.assertEqual(await poll("0.02"), 0.01)
+
+        # A held back change is reported once the heartbeat is due.
+        assert sensor._reported_at is not None
+        sensor._reported_at -= SENSOR_TYPES[0].max_silence
+        self.assertEqual(await poll("0.025"), 0.025)
+        self.assertEqual(sensor.async_write_ha_state.call_count, 5)
+
+    async def test_held_back_value_is_reported_while_it_stays_steady(self) -> None:
+        get_values = AsyncMock(return_value={"D_A_1_1": "0.50"})
+        client = make_client_double(
+            get_values=get_values, model="softliQ:SC18", sw_version="1.0"
+        )
+        entry = make_config_entry("Softener", "waterbox")
+        coordinator = SoftQLinkDataUpdateCoordinator(make_hass(), entry, client)
+        coordinator.data = await coordinator._async_update_data()
+        sensor = SoftQLinkSensor(coordinator, SENSOR_TYPES[0])
+        sensor.async_write_ha_state = Mock()
+        sensor._handle_coordinator_update()
+        sensor.async_write_ha_state.reset_mock()
+
+        get_values.return_value = {"D_A_1_1": "0.51"}
+        for _ in range(2):
+            coordinator.data = await coordinator._async_update_data()
+            sensor._handle_coordinator_update()
+        self.assertEqual(sensor.native_value, 0.5)
+        assert coordinator.changed_keys is not None
+        self.assertNotIn("D_A_1_1", coordinator.changed_keys)
+
+        assert sensor._reported_at is not None
+        sensor._reported_at -= SENSOR_TYPES[0].max_silence
+        coordinator.data = await coordinator._async_update_data()
+        sensor._handle_coordinator_update()
+
+        self.assertEqual(sensor.native_value, 0.51)
+        sensor.async_write_ha_state.assert_called_once()
+
+        # Once reported, the steady value is not written again.
+        sensor._reported_at -= SENSOR_TYPES[0].max_silence
+        coordinator.data = await coordinator._async_update_data()
+        sensor._handle_coordinator_update()
+        sensor.async_write_ha_state.assert_called_once()
+
+    async def test_select_applies_echo_and_tracks_option(self) -> None:
+        set_mode = AsyncMock(return_value={"D_C_5_1": "1"})
         request_refresh = AsyncMock()
+        apply_values = Mock()
         coordinator = make_coordinator_double(
             data={"D_C_5_1": "2"},
             config_entry=make_config_entry("Softener", "waterbox"),
@@ -248,6 +1787,7 @@ class SoftQLinkEntityTests(unittest.IsolatedAsyncioTestCase):
                 set_mode=set_mode,
             ),
             async_request_refresh=request_refresh,
+            async_apply_values=apply_values,
         )
         entity = SoftQLinkSelectEntity(coordinator, SELECT_DESCRIPTIONS[0])
 
@@ -256,7 +1796,8 @@ class SoftQLinkEntityTests(unittest.IsolatedAsyncioTestCase):
         await entity.async_select_option("1")
 
         set_mode.assert_awaited_once_with("1")
-        request_refresh.assert_awaited_once()
+        apply_values.assert_called_once_with({"D_C_5_1": "1"})
+        request_refresh.assert_not_awaited()
 
     async def test_button_and_select_keep_legacy_unique_ids(self) -> None:
         coordinator = make_coordinator_double(
@@ -290,8 +1831,19 @@ class SoftQLinkEntityTests(unittest.IsolatedAsyncioTestCase):
             ("gruenbeck_softliq_sc", "Friendly Name"),
         )
 
-    async def test_button_press_sets_busy_state_and_clears_it_after_refresh(self) -> None:
-        start_manual_regeneration = AsyncMock()
+    async def test_button_press_sets_busy_state_and_clears_it_after_the_edit(
+        self,
+    ) -> None:
+        edit_started = asyncio.Event()
+        allow_edit_to_finish = asyncio.Event()
+
+        async def blocking_edit() -> dict[str, str]:
+            edit_started.set()
+            await allow_edit_to_finish.wait()
+            return {"D_B_1": "1"}
+
+        start_manual_regeneration = AsyncMock(side_effect=blocking_edit)
+        apply_values = Mock()
         update_listeners = Mock()
         coordinator = make_coordinator_double(
             data={"D_B_1": "0"},
@@ -301,7 +1853,7 @@ class SoftQLinkEntityTests(unittest.IsolatedAsyncioTestCase):
                 sw_version="1.0",
                 start_manual_regeneration=start_manual_regeneration,
             ),
-            async_request_refresh=AsyncMock(),
+            async_apply_values=apply_values,
             button_action_in_progress=False,
             active_button_key=None,
             last_update_success=True,
@@ -335,26 +1887,18 @@ class SoftQLinkEntityTests(unittest.IsolatedAsyncioTestCase):
             ),
         )
 
-        refresh_started = asyncio.Event()
-        allow_refresh_to_finish = asyncio.Event()
-
-        async def blocking_refresh() -> None:
-            refresh_started.set()
-            await allow_refresh_to_finish.wait()
-
-        coordinator.async_request_refresh.side_effect = blocking_refresh
-
         press_task = asyncio.create_task(entity.async_press())
-        await refresh_started.wait()
+        await edit_started.wait()
 
         self.assertTrue(coordinator.button_action_in_progress)
         self.assertFalse(entity.available)
         self.assertFalse(other_button.available)
         start_manual_regeneration.assert_awaited_once()
 
-        allow_refresh_to_finish.set()
+        allow_edit_to_finish.set()
         await press_task
 
+        apply_values.assert_called_once_with({"D_B_1": "1"})
         self.assertFalse(coordinator.button_action_in_progress)
         self.assertIsNone(coordinator.active_button_key)
         self.assertTrue(entity.available)
@@ -402,9 +1946,42 @@ class SoftQLinkEntityTests(unittest.IsolatedAsyncioTestCase):
         self.assertIsNone(coordinator.active_button_key)
         self.assertTrue(entity.available)
 
-    async def test_button_press_clears_busy_state_when_refresh_fails(self) -> None:
-        start_manual_regeneration = AsyncMock()
-        request_refresh = AsyncMock(side_effect=RuntimeError("refresh failed"))
+    async def test_reset_error_memory_marks_error_values_stale(self) -> None:
+        reset_error_memory = AsyncMock(return_value={"D_M_3_3": "0"})
+        apply_values = Mock()
+        coordinator = make_coordinator_double(
+            data={"D_B_1": "0"},
+            config_entry=make_config_entry("Softener", "waterbox"),
+            client=make_client_double(
+                model="softliQ:SC18",
+                sw_version="1.0",
+                reset_error_memory=reset_error_memory,
+            ),
+            async_apply_values=apply_values,
+            button_action_in_progress=False,
+            active_button_key=None,
+            last_update_success=True,
+            async_update_listeners=Mock(),
+            set_active_button_action=Mock(),
+        )
+        entity = SoftQLinkButtonEntity(
+            coordinator,
+            cast(
+                SoftQLinkButtonEntityDescription,
+                SimpleNamespace(
+                    key="reset_error_memory",
+                    translation_key="reset_error_memory",
+                ),
+            ),
+        )
+
+        await entity.async_press()
+
+        apply_values.assert_called_once_with({"D_M_3_3": "0"}, ERROR_MEMORY_KEYS)
+
+    async def test_button_press_clears_busy_state_when_applying_fails(self) -> None:
+        start_manual_regeneration = AsyncMock(return_value={"D_B_1": "1"})
+        apply_values = Mock(side_effect=RuntimeError("apply failed"))
         coordinator = make_coordinator_double(
             data={"D_B_1": "0"},
             config_entry=make_config_entry("Softener", "waterbox"),
@@ -413,7 +1990,7 @@ class SoftQLinkEntityTests(unittest.IsolatedAsyncioTestCase):
                 sw_version="1.0",
                 start_manual_regeneration=start_manual_regeneration,
             ),
-            async_request_refresh=request_refresh,
+            async_apply_values=apply_values,
             button_action_in_progress=False,
             active_button_key=None,
             last_update_success=True,
@@ -441,7 +2018,7 @@ class SoftQLinkEntityTests(unittest.IsolatedAsyncioTestCase):
             await entity.async_press()
 
         start_manual_regeneration.assert_awaited_once()
-        request_refresh.assert_awaited_once()
+        apply_values.assert_called_once()
         self.assertFalse(coordinator.button_action_in_progress)
         self.assertIsNone(coordinator.active_button_key)
         self.assertTrue(entity.available)